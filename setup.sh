@@ -7,6 +7,12 @@ set -euo pipefail
 export HOST_UID="$(id -u)"
 export HOST_GID="$(id -g)"
 
+# One run id shared by all suites (JSONL results + run history / regression gate)
+export RUN_ID="${RUN_ID:-$(date +%Y%m%dT%H%M%S)}"
+
+# Regression gate (step 6): enforce (default: a regression fails this script) | advisory (warn only)
+REGRESSION_GATE="${REGRESSION_GATE:-enforce}"
+
 # ==============================================================================
 # Docker Exam Pipeline Runner
 # - Project: docker-exam
@@ -19,6 +25,8 @@ export HOST_GID="$(id -g)"
 # 4) Prints auth test logs to the terminal (for quick verification)
 # 5) Copies the aggregated shared log to ./log.txt (exam requirement)
 # 6) Shuts everything down again (avoids port/container conflicts on rerun)
+# 7) Regression gate: fails on a latency/error-rate regression vs. the marked baseline run
+#    (REGRESSION_GATE=advisory => warning only)
 # ==============================================================================
 
 PROJECT_NAME="docker-exam"
@@ -76,6 +84,31 @@ make snapshot-log
 # ------------------------------------------------------------------------------
 make stop-all
 
+# ------------------------------------------------------------------------------
+# 6) Regression gate (run history)
+# - loads shared/results.jsonl into shared/history.sqlite
+# - fails (exit 1) if p95 latency / error rate regressed vs. the marked baseline
+#   (make history-baseline RUN_ID=...; no baseline => skipped)
+# - runs on the host (needs python3)
+# - REGRESSION_GATE=advisory: a regression (or no python3) only prints a warning
+# ------------------------------------------------------------------------------
+if [ "${REGRESSION_GATE}" = "advisory" ]; then
+  if command -v python3 >/dev/null 2>&1; then
+    make history-check || printf '# WARN: regression gate reported a regression (see above) - advisory mode, not failing.\n'
+  else
+    printf '# WARN: skipping regression gate: python3 not found on the host (advisory mode).\n'
+  fi
+elif [ "${REGRESSION_GATE}" = "enforce" ]; then
+  if ! command -v python3 >/dev/null 2>&1; then
+    printf '# ERROR: regression gate needs python3 on the host (or run with REGRESSION_GATE=advisory).\n' >&2
+    exit 1
+  fi
+  make history-check
+else
+  printf '# ERROR: unknown REGRESSION_GATE=%s (expected: enforce | advisory).\n' "${REGRESSION_GATE}" >&2
+  exit 1
+fi
+
 printf '========================================================================================\n'
 printf '   *** Docker Exam Pipeline (project: %s) — END   %s ***\n' "${PROJECT_NAME}" "$(date "${TIMESTAMP_FMT}")"
 printf '========================================================================================\n\n'
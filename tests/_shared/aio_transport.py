@@ -0,0 +1,276 @@
+# tests/_shared/aio_transport.py
+"""
+asyncio-streams HTTP/1.1 transport (HTTP_TRANSPORT=asyncio)
+----------------------------------------------------------
+A deliberately small HTTP/1.1 GET client: no Session, no PreparedRequest, no cookie jar,
+no header case-insensitive dicts - a request is one pre-built bytes string, a response
+is a status line, a few headers of interest and the body.
+
+- keep-alive:  up to pool_size connections per host, reused across requests; a request
+               waits at most its timeout for a free one (then ConnectTimeout)
+- pipelining:  with HTTP_PIPELINE=N, up to N requests are written to a connection before
+               their responses arrive; responses are read strictly in order (HTTP/1.1)
+- bodies:      Content-Length, chunked transfer encoding, or read-until-close
+- failures:    a timeout or error breaks the connection (its position in the response
+               stream is lost) and fails the pipelined requests queued behind it.
+               Nothing is retried here (same as the other backends: that's the resilience
+               layer's job); idle connections the server already closed are not reused
+
+The event loop runs in a daemon thread, so the transport has the same blocking
+get/timed_get interface as the other backends (worker threads of the runner call it);
+coroutines already running on that loop can await request(...) directly.
+"""
+from __future__ import annotations # Keep type hints as strings (lazy evaluation) to avoid forward-ref/circular-import issues.
+
+import asyncio
+import threading
+import time
+from typing import Optional
+from urllib.parse import urlsplit
+
+from requests import exceptions as rex
+
+from .transport import ConnectionStats, TransportResponse
+from .types import Timing
+
+# Max. header line length / number of header lines accepted per response
+MAX_LINE = 65536
+MAX_HEADERS = 100
+
+class _Connection:
+    __slots__ = ("reader", "writer", "tail", "in_flight", "broken")
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.reader = reader
+        self.writer = writer
+        # Resolves (True/False = ok/failed) once the LAST pipelined response has been read
+        self.tail: Optional[asyncio.Future[bool]] = None
+        self.in_flight = 0
+        self.broken = False
+
+    def close(self) -> None:
+        self.broken = True
+        self.writer.close()
+
+class _HostPool:
+    __slots__ = ("connections", "size", "changed")
+
+    def __init__(self) -> None:
+        self.connections: list[_Connection] = []
+        self.size = 0  # open + opening connections
+        self.changed = asyncio.Condition()
+
+    def pick(self, pipeline: int) -> Optional[_Connection]:
+        # Least loaded usable connection (idle ones first)
+        best = None
+        for conn in self.connections:
+            if conn.broken or conn.in_flight >= pipeline or conn.reader.at_eof() or conn.writer.is_closing():
+                continue
+            if best is None or conn.in_flight < best.in_flight:
+                best = conn
+                if conn.in_flight == 0:
+                    break
+        return best
+
+async def _read_response(reader: asyncio.StreamReader) -> tuple[int, bytes, float, bool]:
+    # => (status, body, perf_counter when the headers were read, keep connection open?)
+    while True:
+        line = await reader.readline()
+        if not line:
+            raise rex.ConnectionError("Remote end closed connection without response")
+        parts = line.split(None, 2)
+        if len(parts) < 2 or not parts[0].startswith(b"HTTP/"):
+            raise rex.ConnectionError(f"Invalid HTTP status line: {line[:100]!r}")
+        status = int(parts[1])
+        keep_alive = parts[0] == b"HTTP/1.1"
+        length = None
+        chunked = False
+        for _ in range(MAX_HEADERS + 1):
+            header = await reader.readline()
+            if header in (b"\r\n", b"\n"):
+                break
+            if not header:
+                raise rex.ConnectionError("Connection closed while reading response headers")
+            name, _, value = header.partition(b":")
+            name = name.strip().lower()
+            if name == b"content-length":
+                length = int(value)
+            elif name == b"transfer-encoding":
+                chunked = b"chunked" in value.lower()
+            elif name == b"connection":
+                value = value.strip().lower()
+                keep_alive = value == b"keep-alive" or (keep_alive and value != b"close")
+        else:
+            raise rex.ConnectionError(f"More than {MAX_HEADERS} response headers")
+        if status >= 200 or status == 101:
+            break
+        # 1xx interim response (e.g. 100 Continue): the real response follows
+
+    headers_at = time.perf_counter()
+    if chunked:
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b";", 1)[0], 16)
+            if size == 0:
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass  # trailers
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)  # CRLF after each chunk
+        body = b"".join(chunks)
+    elif length is not None:
+        body = await reader.readexactly(length)
+    elif status in (204, 304):
+        body = b""
+    else:
+        body = await reader.read()  # delimited by connection close
+        keep_alive = False
+    return status, body, headers_at, keep_alive
+
+class AsyncioTransport:
+    """HTTP/1.1 client on asyncio streams with keep-alive + optional pipelining (see module docstring)."""
+
+    def __init__(self, timeout: float, pool_size: int, keep_alive: bool = True, pipeline: int = 1) -> None:
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.keep_alive = keep_alive
+        self.pipeline = max(1, pipeline) if keep_alive else 1
+        # Ask the server to close after each response => one connection per request
+        self._extra_headers = "" if keep_alive else "Connection: close\r\n"
+
+        self._pools: dict[tuple[str, str, int], _HostPool] = {}
+        # Counters (only updated on the loop thread)
+        self._opened = 0
+        self._requests = 0
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="http-asyncio", daemon=True)
+        self._thread.start()
+
+    # --------------------------------------------------------------------------
+    # Blocking interface (same as the other transports)
+    # --------------------------------------------------------------------------
+    def get(self, url: str, timeout: Optional[float] = None) -> TransportResponse:
+        return self.timed_get(url, timeout)[0]
+
+    def timed_get(self, url: str, timeout: Optional[float] = None) -> tuple[TransportResponse, Timing]:
+        return asyncio.run_coroutine_threadsafe(self.request(url, timeout), self._loop).result()
+
+    def connection_stats(self) -> ConnectionStats:
+        return ConnectionStats(opened=self._opened, reused=max(0, self._requests - self._opened), requests=self._requests)
+
+    def close(self) -> None:
+        async def close_all() -> None:
+            for pool in self._pools.values():
+                for conn in pool.connections:
+                    conn.close()
+            self._pools.clear()
+
+        if self._loop.is_running():
+            asyncio.run_coroutine_threadsafe(close_all(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+
+    # --------------------------------------------------------------------------
+    # Coroutines (run on the transport's loop)
+    # --------------------------------------------------------------------------
+    async def request(self, url: str, timeout: Optional[float] = None) -> tuple[TransportResponse, Timing]:
+        timeout = timeout or self.timeout
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise rex.InvalidURL(f"Invalid URL {url!r}")
+        https = parts.scheme == "https"
+        host_key = (parts.scheme, parts.hostname, parts.port or (443 if https else 80))
+        target = parts.path or "/"
+        if parts.query:
+            target = f"{target}?{parts.query}"
+        request = f"GET {target} HTTP/1.1\r\nHost: {parts.netloc}\r\nAccept: */*\r\n{self._extra_headers}\r\n".encode("latin-1")
+
+        pool = self._pools.get(host_key)
+        if pool is None:
+            pool = self._pools[host_key] = _HostPool()
+
+        started = time.perf_counter()
+        connect_s, conn = await self._acquire(pool, host_key, timeout)
+        status, body, headers_at, _ = await self._exchange(pool, conn, request, timeout)
+        finished = time.perf_counter()
+        return TransportResponse(status, body), Timing(
+            connect_ms=connect_s * 1000,
+            ttfb_ms=(headers_at - started) * 1000,
+            total_ms=(finished - started) * 1000,
+            size_bytes=len(body),
+        )
+
+    async def _acquire(self, pool: _HostPool, host_key: tuple[str, str, int], timeout: float) -> tuple[float, _Connection]:
+        # => (connect seconds, connection with a reserved request slot)
+        scheme, host, port = host_key
+        async with pool.changed:
+            try:
+                # Waiting for a free slot is bounded like the request (pool_size connections all busy)
+                async with asyncio.timeout(timeout):
+                    while True:
+                        conn = pool.pick(self.pipeline) if self.keep_alive else None
+                        if conn is not None:
+                            conn.in_flight += 1
+                            return 0.0, conn
+                        if pool.size < self.pool_size:
+                            pool.size += 1  # reserve, then connect outside the lock
+                            break
+                        await pool.changed.wait()
+            except TimeoutError:
+                raise rex.ConnectTimeout(
+                    f"No free connection to {host}:{port} within {timeout}s (pool_size={self.pool_size})"
+                ) from None
+
+        connect_started = time.perf_counter()
+        try:
+            async with asyncio.timeout(timeout):
+                reader, writer = await asyncio.open_connection(host, port, ssl=scheme == "https" or None, limit=MAX_LINE)
+        except BaseException as e:
+            async with pool.changed:
+                pool.size -= 1
+                pool.changed.notify()
+            if isinstance(e, TimeoutError):
+                raise rex.ConnectTimeout(f"Connection to {host}:{port} timed out (connect timeout={timeout})") from None
+            if isinstance(e, OSError):
+                raise rex.ConnectionError(f"Failed to connect to {host}:{port}: {e}") from None
+            raise
+        conn = _Connection(reader, writer)
+        conn.in_flight = 1
+        pool.connections.append(conn)
+        self._opened += 1
+        return time.perf_counter() - connect_started, conn
+
+    async def _exchange(
+        self, pool: _HostPool, conn: _Connection, request: bytes, timeout: float
+    ) -> tuple[int, bytes, float, bool]:
+        # Write now (pipelined behind earlier requests), read once the response before ours is read
+        previous = conn.tail
+        done: asyncio.Future[bool] = self._loop.create_future()
+        conn.tail = done
+        ok = False
+        keep_alive = False
+        try:
+            async with asyncio.timeout(timeout):
+                conn.writer.write(request)
+                self._requests += 1
+                if previous is not None and not await asyncio.shield(previous):
+                    raise rex.ConnectionError("An earlier pipelined request on this connection failed")
+                status, body, headers_at, keep_alive = await _read_response(conn.reader)
+            ok = True
+            return status, body, headers_at, keep_alive
+        except TimeoutError:
+            raise rex.ReadTimeout(f"Read timed out (read timeout={timeout})") from None
+        except rex.RequestException:
+            raise  # already the right error (RequestException is an OSError: keep it out of the clause below)
+        except (asyncio.IncompleteReadError, OSError, ValueError) as e:
+            raise rex.ConnectionError(f"Connection broken: {e!r}") from None
+        finally:
+            done.set_result(ok)
+            if not (ok and keep_alive and self.keep_alive):
+                conn.close()  # position in the response stream is lost (or the server closes)
+            conn.in_flight -= 1
+            async with pool.changed:
+                if conn.broken and conn.in_flight == 0 and conn in pool.connections:
+                    pool.connections.remove(conn)
+                    pool.size -= 1
+                pool.changed.notify()
@@ -0,0 +1,122 @@
+# tests/_shared/async_runner.py
+from __future__ import annotations # Keep type hints as strings (lazy evaluation) to avoid forward-ref/circular-import issues.
+
+import contextvars
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Iterable, Optional
+
+from .config import Config
+from .plan import compile_case
+from .runner import run_test_case
+from .types import TestCase, TestResult
+
+# asyncio is imported where it's used: it costs tens of ms at start-up, and importing a
+# suite (e.g. to list its test cases) shouldn't pay for it
+
+# Called once per finished test case - ALWAYS in the order the cases were given
+# (test-number order 1, 2, 3, ..., unless the caller reorders them - see case_cache.py)
+ResultCallback = Callable[[int, TestCase, TestResult], None]
+
+# How many test cases may be "scheduled ahead" of the next one to report,
+# expressed as a multiple of cfg.concurrency. A slow test case blocks reporting
+# (not execution) - the lookahead keeps the workers busy meanwhile while
+# still bounding memory for huge (streamed) case lists.
+LOOKAHEAD_FACTOR = 4
+
+async def _run_test_cases_async(
+    cfg: Config,
+    numbered_cases: Iterable[tuple[int, TestCase]],
+    on_result: ResultCallback,
+    deadline: Optional[float],
+    fail_fast: bool,
+) -> bool:
+    import asyncio
+
+    window = cfg.concurrency * LOOKAHEAD_FACTOR
+
+    # run_test_case is blocking (requests) => execute it on a bounded thread pool.
+    # The pool size IS the concurrency limit (no extra semaphore needed).
+    with ThreadPoolExecutor(max_workers=cfg.concurrency, thread_name_prefix="testcase") as pool:
+        cases = iter(numbered_cases)
+        # In submission order (test numbers may have gaps, e.g. for a shard).
+        # Pool futures (not asyncio ones): only those can tell "cancelled before it started"
+        in_flight: dict[int, tuple[int, TestCase, Future[TestResult]]] = {}
+        submitted = 0
+        exhausted = False
+        all_assertions_met = True
+
+        while True:
+            # 1) Top up the scheduling window (consumes the iterable lazily)
+            while not exhausted and len(in_flight) < window:
+                try:
+                    test_no, test_case = next(cases)
+                except StopIteration:
+                    exhausted = True
+                    break
+                # Compile step: the worker gets a ready-to-send request (see plan.py);
+                # it runs in this context (e.g. the suite's request counters, see traffic.py)
+                future = pool.submit(
+                    contextvars.copy_context().run, run_test_case, cfg, compile_case(cfg, test_case), deadline
+                )
+                in_flight[submitted] = (test_no, test_case, future)
+                submitted += 1
+
+            if not in_flight:
+                break
+
+            # 2) Report strictly in submission order: wait for the NEXT test case only,
+            #    results that finished earlier simply wait in `in_flight`.
+            test_no, test_case, future = in_flight.pop(next(iter(in_flight)))
+            test_result = await asyncio.wrap_future(future)
+            on_result(test_no, test_case, test_result)
+
+            # Track global suite status (keep running to produce a full report)
+            if not test_result.is_success:
+                all_assertions_met = False
+                if fail_fast and not exhausted:
+                    # FAIL_FAST: schedule nothing new and drop queued cases that haven't started;
+                    # the ones already running finish and are reported
+                    exhausted = True
+                    for key in [key for key, (_, _, queued) in in_flight.items() if queued.cancel()]:
+                        del in_flight[key]
+
+    return all_assertions_met
+
+def run_test_cases(
+    cfg: Config,
+    test_cases: Iterable[TestCase],
+    on_result: ResultCallback,
+) -> bool:
+    """
+    Runs all test cases of a suite concurrently (up to cfg.concurrency at a time)
+    and returns True only if EVERY test case succeeded.
+
+    Why this exists:
+    - Running the cases one after another makes the suite runtime the sum of all round-trips.
+    - Executing them in parallel brings that down to roughly (round-trips / concurrency).
+
+    Guarantees:
+    - on_result(test_no, test_case, test_result) is called in test-number order,
+      so stdout + the shared log look exactly like a sequential run.
+    - `test_cases` may be any iterable (incl. generators); it is consumed lazily.
+    - cfg.concurrency == 1 => strictly sequential execution.
+    """
+    return run_numbered_test_cases(cfg, enumerate(test_cases, start=1), on_result)
+
+def run_numbered_test_cases(
+    cfg: Config,
+    numbered_cases: Iterable[tuple[int, TestCase]],
+    on_result: ResultCallback,
+    deadline: Optional[float] = None,
+    fail_fast: bool = False,
+) -> bool:
+    """
+    Like run_test_cases(...), but with caller-assigned test numbers: (test_no, test_case) pairs,
+    e.g. a shard's cases with their GLOBAL numbers (see sharding.py); reported in the given order.
+    deadline (time.monotonic() value) => suite time budget, see resilience.py.
+    fail_fast => stop at the first failed case: nothing new is scheduled, queued cases are
+    dropped (not reported), cases already running still finish and are reported.
+    """
+    import asyncio
+
+    return asyncio.run(_run_test_cases_async(cfg, numbered_cases, on_result, deadline, fail_fast))
@@ -0,0 +1,191 @@
+# tests/_shared/case_cache.py
+"""
+Incremental test runs (INCREMENTAL=1)
+-------------------------------------
+A local cache of the last outcome of every test case, so a rerun against the SAME API
+build doesn't resend what already passed:
+
+- case key:   blake2b(endpoint + canonical query + expected code + expected score) -
+              any change to a case (params, expectations) makes it a new case
+- build key:  blake2b(API_IMAGE + GET /status body + GET /openapi.json body) - the image
+              identity plus a fingerprint of what the running API reports about itself
+              (the OpenAPI document changes with its routes/models/version).
+              In replay mode: the cassette file (path, size, mtime) instead.
+              No answer from the API => unknown build: nothing is skipped
+- a rerun:    skips cases that passed against the same build, runs cases that failed last
+              time (against any build) first, then the rest in test-number order
+
+The plan streams (a CORPUS_PATH run stays constant-memory): cases are looked up in batches
+of LOOKUP_BATCH while the suite runs, and only the previously failed cases are held in
+memory - found by one extra pass over the cases, which only happens when the cache has
+failed cases at all and the cases can be read twice (a list, or a corpus file - see
+corpus.CorpusCases). A one-shot iterator keeps its order (failed cases aren't moved up).
+
+Set API_IMAGE to the image id (`docker inspect -f '{{.Image}}' <api container>`, see
+`make incremental`) - a tag like datascientest/fastapi:1.0.0 can point to a new build.
+FAIL_FAST=1 (see async_runner.py) complements this: stop at the first failure.
+"""
+from __future__ import annotations # Keep type hints as strings (lazy evaluation) to avoid forward-ref/circular-import issues.
+
+import atexit
+import hashlib
+import itertools
+import os
+import sqlite3
+import threading
+import time
+from typing import Iterable, Iterator, Optional
+
+from .config import Config
+from .params import canonical_query
+from .types import TestCase, TestResult
+
+# Pending outcomes are committed in batches (one transaction per batch)
+COMMIT_EVERY = 500
+# Case keys looked up per query (WHERE key IN (...); below SQLite's 999-variable limit)
+LOOKUP_BATCH = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cases (
+    key         BLOB PRIMARY KEY,   -- blake2b(endpoint + sorted query + expectations), 16 bytes
+    build       BLOB,               -- build key of the last run (NULL => unknown build)
+    passed      INTEGER NOT NULL,   -- outcome of the last run: 1 | 0
+    run_id      TEXT NOT NULL,
+    updated_at  REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+class IncrementalPlan:
+    """What to run - a lazy iterator; `scheduled` and `skipped` count up as it is consumed."""
+
+    def __init__(self, failed_first: int) -> None:
+        self.cases: Iterator[tuple[int, TestCase]] = iter(())  # previously failed first, then the rest
+        self.failed_first = failed_first  # failed last time => moved to the front
+        self.scheduled = 0                # handed out to run (incl. failed_first)
+        self.skipped = 0                  # passed against the same build => not run
+
+def case_key(test_case: TestCase) -> bytes:
+    identity = (
+        f"{test_case.api_url}?{canonical_query(test_case.params)}"
+        f"\n{test_case.expected_code}\n{test_case.expected_score}"
+    )
+    return hashlib.blake2b(identity.encode("utf-8"), digest_size=16).digest()
+
+def build_fingerprint(cfg: Config) -> Optional[bytes]:
+    # None => the build can't be identified (API unreachable, cassette missing, ...)
+    digest = hashlib.blake2b(cfg.api_image.encode("utf-8"), digest_size=16)
+    if cfg.http_mode == "replay":
+        try:
+            stat = os.stat(cfg.cassette_path)
+        except OSError:
+            return None
+        digest.update(f"\0replay\0{os.path.abspath(cfg.cassette_path)}\0{stat.st_size}\0{stat.st_mtime_ns}".encode("utf-8"))
+        return digest.digest()
+
+    from requests.exceptions import RequestException  # deferred (see Config.http)
+
+    # API_TARGETS: every replica is part of the build (a mixed deployment is a build of its own)
+    for base_url in cfg.base_urls:
+        try:
+            status = cfg.http.get(f"{base_url}/status")
+            openapi = cfg.http.get(f"{base_url}/openapi.json")
+        except RequestException:
+            return None
+        if status.status_code != 200:
+            return None
+        digest.update(b"\0status\0" + status.content)
+        if openapi.status_code == 200:  # optional: not every API publishes one
+            digest.update(b"\0openapi\0" + openapi.content)
+    return digest.digest()
+
+class CaseCache:
+    """
+    Last outcome per test case (SQLite, one file), for one API build.
+
+    - plan(...)   => which cases to run and in which order (see module docstring)
+    - record(...) => store one outcome (last one wins)
+
+    Thread-safe: one connection guarded by a lock (suites of a pipeline share the cache).
+    Shard processes may share the file: WAL mode, writes are short batches.
+    """
+
+    def __init__(self, path: str, build: Optional[bytes], run_id: str) -> None:
+        self.path = path
+        self.build = build
+        self.run_id = run_id
+        cache_dir = os.path.dirname(path)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    def plan(self, numbered_cases: Iterable[tuple[int, TestCase]], failed_first: bool = True) -> IncrementalPlan:
+        """
+        Streams `numbered_cases` (see module docstring). failed_first=False keeps test-number
+        order (e.g. for shards: their merge step expects each shard's results in test-number order).
+        """
+        failed: list[tuple[int, TestCase]] = []
+        if failed_first and not isinstance(numbered_cases, Iterator):
+            with self._lock:
+                failed_keys = {row[0] for row in self._conn.execute("SELECT key FROM cases WHERE passed = 0")}
+            if failed_keys:  # extra pass: in-memory key checks only, no queries
+                failed = [(test_no, tc) for test_no, tc in numbered_cases if case_key(tc) in failed_keys]
+        plan = IncrementalPlan(len(failed))
+        plan.scheduled = len(failed)
+        moved = {test_no for test_no, _ in failed}
+        plan.cases = itertools.chain(failed, self._stream(numbered_cases, moved, plan))
+        return plan
+
+    def _stream(
+        self, numbered_cases: Iterable[tuple[int, TestCase]], moved: set[int], plan: IncrementalPlan
+    ) -> Iterator[tuple[int, TestCase]]:
+        # Everything not skipped and not already moved to the front, in the given order
+        cases = iter(numbered_cases)
+        while batch := list(itertools.islice(cases, LOOKUP_BATCH)):
+            keys = [case_key(test_case) for _, test_case in batch]
+            with self._lock:
+                rows = {
+                    key: (build, passed) for key, build, passed in self._conn.execute(
+                        f"SELECT key, build, passed FROM cases WHERE key IN ({', '.join('?' * len(keys))})", keys
+                    )
+                }
+            for (test_no, test_case), key in zip(batch, keys):
+                if test_no in moved:
+                    continue
+                row = rows.get(key)
+                if row is not None and row[1] and self.build is not None and row[0] == self.build:
+                    plan.skipped += 1
+                    continue
+                plan.scheduled += 1
+                yield test_no, test_case
+
+    def record(self, test_case: TestCase, test_result: TestResult) -> None:
+        if test_result.attempts == 0:  # never sent (suite deadline): no outcome to remember
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cases VALUES (?, ?, ?, ?, ?)",
+                (case_key(test_case), self.build, int(test_result.is_success), self.run_id, time.time()),
+            )
+            self._pending += 1
+            if self._pending >= COMMIT_EVERY:
+                self._conn.commit()
+                self._pending = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
+
+def open_case_cache(cfg: Config) -> Optional[CaseCache]:
+    # INCREMENTAL=1 => the cache at CASE_CACHE_PATH for the build currently answering
+    # (call once the API is ready: the fingerprint is read from it)
+    if not cfg.incremental:
+        return None
+    cache = CaseCache(cfg.case_cache_path, build_fingerprint(cfg), cfg.run_id)
+    atexit.register(cache.close)  # commit the last (partial) batch of outcomes
+    return cache
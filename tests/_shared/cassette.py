@@ -0,0 +1,108 @@
+# tests/_shared/cassette.py
+from __future__ import annotations # Keep type hints as strings (lazy evaluation) to avoid forward-ref/circular-import issues.
+
+import atexit
+import hashlib
+import os
+import sqlite3
+import threading
+from typing import NamedTuple, Optional
+
+from .types import Timing
+
+# Pending recorded interactions are committed in batches (one transaction per batch)
+COMMIT_EVERY = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS interactions (
+    key         BLOB PRIMARY KEY,   -- blake2b(path + sorted query), 16 bytes
+    path        TEXT NOT NULL,
+    query       TEXT NOT NULL,
+    status      INTEGER NOT NULL,
+    body        BLOB NOT NULL,
+    connect_ms  REAL NOT NULL,
+    ttfb_ms     REAL NOT NULL,
+    total_ms    REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+class RecordedResponse(NamedTuple):
+    status_code: int
+    body: bytes
+    timing: Timing  # as measured while recording
+
+class CassetteMiss(LookupError):
+    """Replay mode: the cassette has no recorded response for this request."""
+
+def interaction_key(path: str, query: str) -> bytes:
+    """
+    Key = hash of endpoint path + canonical query (params.canonical_query: sorted, so param
+    order doesn't matter - the plan compiler computes it once per case).
+    The host is deliberately NOT part of the key: a cassette recorded inside compose
+    (http://api:8000) replays fine on the host (http://localhost:8000).
+    """
+    return hashlib.blake2b(f"{path}?{query}".encode("utf-8"), digest_size=16).digest()
+
+class Cassette:
+    """
+    Compact, indexed store of request/response pairs (SQLite, one file).
+
+    - record(...) stores one interaction (last one wins for repeated requests)
+    - lookup(...) is a single primary-key probe on a fixed-size binary key
+      (WITHOUT ROWID => the row lives in the key's B-tree leaf: one index walk, no second lookup),
+      so replay cost stays flat even for cassettes with millions of entries.
+
+    Thread-safe: one connection guarded by a lock (lookups/inserts are microseconds).
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        cassette_dir = os.path.dirname(path)
+        if cassette_dir:
+            os.makedirs(cassette_dir, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    def record(self, path: str, query: str, status_code: int, body: bytes, timing: Timing) -> None:
+        key = interaction_key(path, query)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO interactions VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, path, query, status_code, body, timing.connect_ms, timing.ttfb_ms, timing.total_ms),
+            )
+            self._pending += 1
+            if self._pending >= COMMIT_EVERY:
+                self._conn.commit()
+                self._pending = 0
+
+    def lookup(self, path: str, query: str) -> RecordedResponse:
+        key = interaction_key(path, query)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, body, connect_ms, ttfb_ms, total_ms FROM interactions WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            raise CassetteMiss(f"{path}?{query}")
+        status_code, body, connect_ms, ttfb_ms, total_ms = row
+        return RecordedResponse(status_code, bytes(body), Timing(connect_ms, ttfb_ms, total_ms, len(body)))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
+
+def open_cassette(mode: str, path: str) -> Optional[Cassette]:
+    # live => no cassette; record/replay => the cassette file at `path`
+    if mode == "live":
+        return None
+    if mode not in ("record", "replay"):
+        raise ValueError(f"Unknown HTTP_MODE: {mode!r} (expected live | record | replay)")
+    if mode == "replay" and not os.path.exists(path):
+        raise FileNotFoundError(f"HTTP_MODE=replay, but no cassette at {path}")
+    cassette = Cassette(path)
+    atexit.register(cassette.close)  # commit the last (partial) batch of recordings
+    return cassette
@@ -1,6 +1,46 @@
 # tests/_shared/config.py
+from __future__ import annotations # Keep type hints as strings (lazy evaluation) to avoid forward-ref/circular-import issues.
+
+import datetime
 import os
-from dataclasses import dataclass
+import threading
+from dataclasses import dataclass, replace
+from typing import TYPE_CHECKING, Any, Callable, Optional
+from urllib.parse import urlsplit
+
+from . import startup
+
+if TYPE_CHECKING:  # imported on first use instead (requests alone takes ~100ms+ to import)
+    from .case_cache import CaseCache
+    from .cassette import Cassette
+    from .metrics import Metrics
+    from .replicas import ReplicaSet
+    from .resilience import HedgeDelays, HedgePool
+    from .transport import Transport
+
+class shared_resource:
+    """
+    Like functools.cached_property, but thread-safe: the resource (HTTP pool, cassette, ...)
+    is created exactly once per Config, even if several worker threads touch it first.
+    The value is stored in the instance __dict__, so this also works on frozen dataclasses.
+    """
+
+    def __init__(self, factory: Callable[[Any], Any]) -> None:
+        self.factory = factory
+        self.name = factory.__name__
+        self.lock = threading.Lock()
+
+    def __get__(self, instance: Any, owner: type) -> Any:
+        if instance is None:
+            return self
+        try:
+            return instance.__dict__[self.name]
+        except KeyError:
+            pass
+        with self.lock:
+            if self.name not in instance.__dict__:
+                instance.__dict__[self.name] = self.factory(instance)
+            return instance.__dict__[self.name]
 
 @dataclass(frozen=True)
 class Config:
@@ -8,19 +48,219 @@ class Config:
     api_address: str
     # API port (container port, usually 8000)
     api_port: int
+    # API_TARGETS="host:port,..." => several API replicas as base URLs (api_address/api_port = the first);
+    # () => just api_address:api_port. Requests are spread over them by BALANCE (see replicas.py)
+    api_targets: tuple[str, ...]
+    balance: str
     # LOG="1" => write to shared log file; anything else => console-only
     log: str
     # Shared log file path (bind-mounted via ./shared:/shared)
     log_path: str
+    # Buffered log writer: flush when the buffer exceeds this size (bytes) ...
+    log_buffer_bytes: int
+    # ... or at the latest after this many seconds
+    log_flush_interval: float
+    # Optional JSONL/CSV corpus streamed INSTEAD of a suite's built-in test cases ("" => built-in)
+    corpus_path: str
+    # JSONL file for machine-readable per-test results ("" => disabled)
+    results_path: str
+    # Sharding: this process runs shard SHARD_INDEX (0-based) of SHARD_COUNT (1 => unsharded) ...
+    shard_index: int
+    shard_count: int
+    # ... and writes its partial results to SHARD_DIR/<run_id>/ for the merge step (see sharding.py)
+    shard_dir: str
+    # STARTUP_PROFILE="1" => print the start-up phase breakdown when an entry point finishes
+    startup_profile: bool
+    # Live OpenMetrics/Prometheus exporter: serve http://METRICS_ADDRESS:METRICS_PORT/metrics while running
+    # (0 => disabled; -1 => collect only, used by load worker processes - see metrics.py)
+    metrics_port: int
+    metrics_address: str
+    # PROFILE="cpu,stacks,alloc" (any subset) => profile entry points, files to PROFILE_DIR/<run_id>/
+    # (see profiling.py); stack samples per second for "stacks"
+    profile: tuple[str, ...]
+    profile_dir: str
+    profile_sample_hz: float
+    # Identifies one pipeline run across all suites (JSONL records + run history)
+    run_id: str
+    # Max. seconds to wait for GET /status => "1" before a suite aborts
+    readiness_timeout: float
+    # Readiness marker written to /shared once the API is ready (trusted by later suites) ...
+    readiness_marker: str
+    # ... for this many seconds (0 => always poll)
+    readiness_ttl: float
+    # HTTP_MODE: "live" (default) | "record" (live + save to cassette) | "replay" (cassette only, no network)
+    http_mode: str
+    # Cassette file used by record/replay
+    cassette_path: str
     # HTTP request timeout (seconds) for requests.get(...)
     timeout: float
+    # Resilience layer (opt-in, see resilience.py): RETRIES extra attempts for network errors/5xx ...
+    retries: int
+    # ... with "full jitter" backoff: uniform(0, min(RETRY_BACKOFF_MAX, RETRY_BACKOFF * 2^retry)) seconds
+    retry_backoff: float
+    retry_backoff_max: float
+    # HEDGE="1" => send a 2nd request when the 1st is slower than the endpoint's recent p95
+    hedge: bool
+    # Total time budget per suite in seconds (0 => none)
+    suite_deadline: float
+    # FAIL_FAST="1" => stop scheduling test cases after the first failure
+    fail_fast: bool
+    # INCREMENTAL="1" => skip cases that passed against the same API build, run failed ones first
+    # (outcomes cached in CASE_CACHE_PATH; API_IMAGE = image id of the API, see case_cache.py)
+    incremental: bool
+    case_cache_path: str
+    api_image: str
+    # Max. number of test cases executed in parallel (1 => strictly sequential)
+    concurrency: int
+    # Max. number of pooled (keep-alive) connections per API host
+    pool_size: int
+    # HTTP_KEEP_ALIVE="1" => reuse connections; anything else => close after each request
+    keep_alive: bool
+    # HTTP client backend: requests | urllib3 | asyncio (see transport.py)
+    http_transport: str
+    # asyncio transport: max. requests in flight per connection (1 => no pipelining)
+    http_pipeline: int
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.api_address}:{self.api_port}"
+
+    @property
+    def base_urls(self) -> tuple[str, ...]:
+        # Every API replica (readiness is checked for each of them)
+        return self.api_targets or (self.base_url,)
+
+    # Shared HTTP transport (connection pool) - created on first use and then reused by
+    # the readiness check, the runner and all suites for the lifetime of this Config.
+    @shared_resource
+    def http(self) -> Transport:
+        from .transport import open_transport  # deferred: only entry points that send requests pay for it
+        client = open_transport(
+            self.http_transport, timeout=self.timeout, pool_size=self.pool_size,
+            keep_alive=self.keep_alive, pipeline=self.http_pipeline,
+        )
+        startup.mark("http client")
+        return client
+
+    # Recent latencies per endpoint (hedge delay) + the threads that run hedged attempts
+    @shared_resource
+    def hedge_delays(self) -> HedgeDelays:
+        from .resilience import HedgeDelays
+        return HedgeDelays()
+
+    @shared_resource
+    def hedge_pool(self) -> HedgePool:
+        from .resilience import HedgePool
+        # Primary + hedge attempt for every concurrent test case (never queues, see HedgePool)
+        return HedgePool(max_workers=2 * self.concurrency)
+
+    # Live metrics registry (None unless METRICS_PORT is set) - the exporter starts on first use
+    @shared_resource
+    def metrics(self) -> Optional[Metrics]:
+        if not self.metrics_port:
+            return None
+        from .metrics import open_metrics
+        return open_metrics(self.metrics_address, self.metrics_port)
+
+    # Client-side balancer over API_TARGETS (None for a single target) - shared like the HTTP client
+    @shared_resource
+    def replicas(self) -> Optional[ReplicaSet]:
+        if len(self.api_targets) < 2:
+            return None
+        from .replicas import ReplicaSet
+        return ReplicaSet(self.api_targets, self.balance)
+
+    # Record/replay cassette (None in live mode) - opened once, shared like the HTTP client
+    @shared_resource
+    def cassette(self) -> Optional[Cassette]:
+        from .cassette import open_cassette
+        return open_cassette(self.http_mode, self.cassette_path)
+
+    # Incremental-run cache (None unless INCREMENTAL=1) - fingerprints the API on first use,
+    # so touch it only once the API is ready
+    @shared_resource
+    def case_cache(self) -> Optional[CaseCache]:
+        from .case_cache import open_case_cache
+        return open_case_cache(self)
+
+def open_loop_config(cfg: Config, max_in_flight: int) -> Config:
+    """
+    Config for the open-loop modes (load.py, soak.py): one pooled connection per possible
+    in-flight request - with fewer, requests wait inside the client for a free connection
+    (the pool blocks) and that wait is counted as API latency.
+    """
+    sized = replace(cfg, concurrency=max_in_flight, pool_size=max_in_flight)
+    # ... but the same metrics registry/exporter (one per process, see Config.metrics)
+    sized.__dict__["metrics"] = cfg.metrics
+    return sized
+
+def _parse_targets(value: str) -> tuple[str, ...]:
+    # "api-1:8000, http://api-2:8000/" => ("http://api-1:8000", "http://api-2:8000")
+    targets = []
+    for target in value.split(","):
+        target = target.strip().rstrip("/")
+        if target:
+            targets.append(target if "://" in target else f"http://{target}")
+    return tuple(targets)
 
 def load_config() -> Config:
     # Keep all suites consistent by reading env vars in ONE place.
+    concurrency = max(1, int(os.environ.get("CONCURRENCY", "8")))
+    shard_index = int(os.environ.get("SHARD_INDEX", "0"))
+    shard_count = int(os.environ.get("SHARD_COUNT", "1"))
+    hedge = os.environ.get("HEDGE", "0") == "1"
+    api_targets = _parse_targets(os.environ.get("API_TARGETS", ""))
+    api_address = os.environ.get("API_ADDRESS", "api")
+    api_port = int(os.environ.get("API_PORT", "8000"))
+    if api_targets:
+        # The first replica doubles as THE API for single-target code (e.g. benchmarks)
+        primary = urlsplit(api_targets[0])
+        if not primary.hostname:
+            raise ValueError(f"Invalid API_TARGETS entry: {api_targets[0]!r} (expected host:port)")
+        api_address, api_port = primary.hostname, primary.port or 80
+    if not 0 <= shard_index < shard_count:
+        raise ValueError(f"Invalid sharding: SHARD_INDEX={shard_index}, SHARD_COUNT={shard_count} (expected 0 <= index < count)")
     return Config(
-        api_address=os.environ.get("API_ADDRESS", "api"),
-        api_port=int(os.environ.get("API_PORT", "8000")),
+        api_address=api_address,
+        api_port=api_port,
+        api_targets=api_targets if len(api_targets) > 1 else (),
+        balance=os.environ.get("BALANCE", "round_robin"),
         log=os.environ.get("LOG", "0"),
         log_path=os.environ.get("LOG_PATH", "/shared/api_test.log"),
+        log_buffer_bytes=int(os.environ.get("LOG_BUFFER_BYTES", str(64 * 1024))),
+        log_flush_interval=float(os.environ.get("LOG_FLUSH_INTERVAL", "1")),
+        corpus_path=os.environ.get("CORPUS_PATH", ""),
+        results_path=os.environ.get("RESULTS_PATH", ""),
+        shard_index=shard_index,
+        shard_count=shard_count,
+        shard_dir=os.environ.get("SHARD_DIR", "/shared/shards"),
+        startup_profile=os.environ.get("STARTUP_PROFILE", "0") == "1",
+        metrics_port=int(os.environ.get("METRICS_PORT", "0")),
+        metrics_address=os.environ.get("METRICS_ADDRESS", "0.0.0.0"),
+        profile=tuple(mode.strip() for mode in os.environ.get("PROFILE", "").split(",") if mode.strip()),
+        profile_dir=os.environ.get("PROFILE_DIR", "/shared/profiles"),
+        profile_sample_hz=float(os.environ.get("PROFILE_SAMPLE_HZ", "99")),
+        # setup.sh/Makefile export ONE RUN_ID for all suites; host runs fall back to a timestamp
+        run_id=os.environ.get("RUN_ID") or datetime.datetime.now().strftime("%Y%m%dT%H%M%S"),
+        readiness_timeout=float(os.environ.get("READINESS_TIMEOUT", "40")),
+        readiness_marker=os.environ.get("READINESS_MARKER", "/shared/api_ready.json"),
+        readiness_ttl=float(os.environ.get("READINESS_TTL", "120")),
+        http_mode=os.environ.get("HTTP_MODE", "live"),
+        cassette_path=os.environ.get("CASSETTE_PATH", "/shared/cassette.sqlite"),
         timeout=float(os.environ.get("HTTP_TIMEOUT", "5")),
+        retries=max(0, int(os.environ.get("RETRIES", "0"))),
+        retry_backoff=float(os.environ.get("RETRY_BACKOFF", "0.1")),
+        retry_backoff_max=float(os.environ.get("RETRY_BACKOFF_MAX", "2")),
+        hedge=hedge,
+        suite_deadline=float(os.environ.get("SUITE_DEADLINE", "0")),
+        fail_fast=os.environ.get("FAIL_FAST", "0") == "1",
+        incremental=os.environ.get("INCREMENTAL", "0") == "1",
+        case_cache_path=os.environ.get("CASE_CACHE_PATH", "/shared/case_cache.sqlite"),
+        api_image=os.environ.get("API_IMAGE", ""),
+        concurrency=concurrency,
+        # Default: one pooled connection per concurrent worker (two with hedging: primary + hedge)
+        pool_size=max(1, int(os.environ.get("HTTP_POOL_SIZE", str(concurrency * (2 if hedge else 1))))),
+        keep_alive=os.environ.get("HTTP_KEEP_ALIVE", "1") == "1",
+        http_transport=os.environ.get("HTTP_TRANSPORT", "requests"),
+        http_pipeline=max(1, int(os.environ.get("HTTP_PIPELINE", "1"))),
     )
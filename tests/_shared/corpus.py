@@ -0,0 +1,167 @@
+# tests/_shared/corpus.py
+from __future__ import annotations # Keep type hints as strings (lazy evaluation) to avoid forward-ref/circular-import issues.
+
+import csv
+import gzip
+import json
+from dataclasses import MISSING, fields, is_dataclass
+from typing import IO, Any, Iterable, Iterator, Mapping, Optional
+
+from .config import Config
+from .types import TestCase
+
+# Accepted spellings for the expected sentiment column (the TestCase field is `expected_score`)
+SENTIMENT_KEYS = ("expected_sentiment", "expected_score")
+
+def _open_text(path: str) -> IO[str]:
+    # *.gz corpora are decompressed on the fly (still streamed line by line)
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    return open(path, encoding="utf-8", newline="")
+
+def _corpus_format(path: str) -> str:
+    name = path[:-3] if path.endswith(".gz") else path
+    if name.endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    if name.endswith(".csv"):
+        return "csv"
+    raise ValueError(f"Unsupported corpus format (expected .jsonl/.ndjson/.csv[.gz]): {path}")
+
+def _iter_records(path: str) -> Iterator[tuple[int, Mapping[str, Any]]]:
+    # Yields (line_no, record) - never holds more than one record in memory
+    fmt = _corpus_format(path)
+    with _open_text(path) as f:
+        if fmt == "csv":
+            reader = csv.DictReader(f)
+            for record in reader:
+                yield reader.line_num, record
+        else:
+            for line_no, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"{path}:{line_no}: invalid JSON ({e})") from e
+                yield line_no, record
+
+def record_to_test_case(record: Mapping[str, Any], params_cls: type, default_endpoint: Optional[str] = None) -> TestCase:
+    """
+    Build ONE TestCase from a corpus record:
+    - endpoint (api_url), expected_code, expected_sentiment ("positive" | "negative" | empty)
+    - every remaining column that is a field of `params_cls` (e.g. username/password/sentence)
+      becomes part of the suite's TestParams - so iter_params/params_dict keep working unchanged.
+      Fields with a dataclass default may be omitted.
+    """
+    if not is_dataclass(params_cls):
+        raise TypeError(f"params_cls must be a dataclass, got {params_cls!r}")
+
+    endpoint = record.get("endpoint") or default_endpoint
+    if not endpoint:
+        raise ValueError("missing 'endpoint'")
+
+    # Fields with a default (e.g. benchmark credentials) may be omitted from the record
+    param_values = {f.name: str(record[f.name]) for f in fields(params_cls) if record.get(f.name) not in (None, "")}
+    missing = [
+        f.name for f in fields(params_cls)
+        if f.name not in param_values and f.default is MISSING and f.default_factory is MISSING
+    ]
+    if missing:
+        raise ValueError(f"missing params: {', '.join(missing)}")
+
+    expected_score = next((record[k] for k in SENTIMENT_KEYS if record.get(k)), None)
+    return TestCase(
+        api_url=str(endpoint),
+        params=params_cls(**param_values),
+        expected_code=int(record.get("expected_code") or 200),
+        expected_score=str(expected_score).strip().lower() if expected_score else None,
+    )
+
+def _expects_sentiment(record: Mapping[str, Any]) -> bool:
+    return any(record.get(k) for k in SENTIMENT_KEYS)
+
+def iter_corpus(
+    path: str,
+    params_cls: type,
+    endpoints: Optional[Iterable[str]] = None,
+    default_endpoint: Optional[str] = None,
+    suite: Optional[str] = None,
+    sentiment: Optional[bool] = None,
+) -> Iterator[TestCase]:
+    """
+    Stream TestCase records from a (possibly huge) JSONL or CSV corpus file - constant memory.
+
+    Columns/keys: endpoint, username, password, sentence, expected_code, expected_sentiment,
+    suite (only the columns the suite's TestParams declares are required).
+
+    - endpoints: if given, records for other endpoints are skipped (lets one corpus feed several suites)
+    - default_endpoint: used when a record has no endpoint
+    - suite: if given, records whose `suite` column names ANOTHER suite are skipped
+    - sentiment: if given, records WITHOUT a `suite` column are kept only if they have an
+      expected sentiment (True) / have none (False) - see suite_test_cases
+
+    JSONL example:
+        {"endpoint": "/v1/sentiment", "username": "alice", "password": "wonderland",
+         "sentence": "life is beautiful", "expected_code": 200, "expected_sentiment": "positive"}
+    """
+    allowed = None if endpoints is None else set(endpoints)
+    suite = None if suite is None else suite.lower()
+    for line_no, record in _iter_records(path):
+        endpoint = record.get("endpoint") or default_endpoint
+        if allowed is not None and endpoint not in allowed:
+            continue
+        record_suite = record.get("suite")
+        if record_suite:
+            if suite is not None and str(record_suite).strip().lower() != suite:
+                continue
+        elif sentiment is not None and _expects_sentiment(record) != sentiment:
+            continue
+        try:
+            yield record_to_test_case(record, params_cls, default_endpoint)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"{path}:{line_no}: invalid corpus record ({e})") from e
+
+class CorpusCases:
+    """
+    Re-iterable view of a corpus file: every iter() streams the file again (constant memory),
+    so callers that need two passes (the incremental plan, see case_cache.py) get them.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        params_cls: type,
+        endpoints: Optional[Iterable[str]] = None,
+        suite: Optional[str] = None,
+        sentiment: Optional[bool] = None,
+    ) -> None:
+        self.path = path
+        self.params_cls = params_cls
+        self.endpoints = None if endpoints is None else frozenset(endpoints)
+        self.suite = suite
+        self.sentiment = sentiment
+
+    def __iter__(self) -> Iterator[TestCase]:
+        return iter_corpus(self.path, self.params_cls, self.endpoints, suite=self.suite, sentiment=self.sentiment)
+
+def suite_test_cases(cfg: Config, test_cases: list[TestCase], params_cls: type, suite: str) -> Iterable[TestCase]:
+    """
+    The cases a suite should run: its built-in `test_cases` - or, if CORPUS_PATH is set,
+    the streamed corpus records for the suite (re-iterable, see CorpusCases). Every record
+    goes to exactly ONE suite, even where suites share endpoints (authorization + content
+    both call /v1 and /v2/sentiment):
+
+    - a `suite` column (e.g. "content") names the suite explicitly
+    - otherwise records are split like the built-in cases: on the suite's endpoints, a record
+      with an expected sentiment belongs to a suite whose built-in cases check the
+      sentiment (content), one without to a suite whose cases don't (authorization)
+    """
+    if not cfg.corpus_path:
+        return test_cases
+    return CorpusCases(
+        cfg.corpus_path,
+        params_cls,
+        endpoints={tc.api_url for tc in test_cases},
+        suite=suite,
+        sentiment=any(tc.expected_score is not None for tc in test_cases),
+    )
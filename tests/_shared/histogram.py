@@ -0,0 +1,110 @@
+# tests/_shared/histogram.py
+"""
+Mergeable latency histogram (HDR-style)
+---------------------------------------
+Records latencies into a FIXED set of log-linear buckets instead of keeping every sample:
+
+- Values are recorded in microseconds. Below SUB_BUCKET_COUNT µs every value has its own
+  bucket (exact); above, each power-of-two range is split into SUB_BUCKET_HALF linear
+  buckets => a bucket is at most 1/SUB_BUCKET_HALF (< 0.8%) of its values wide, so a
+  value reported as its bucket midpoint is off by at most half that (< 0.4%).
+- Memory is fixed (~3.3k counters for 1µs .. 1h, whatever the number of samples).
+- Two histograms merge by adding their counters - lossless: percentiles of the merged
+  histogram are exactly those of one histogram that recorded all samples
+  (e.g. several load worker processes => one cluster-wide p99).
+
+count, mean and max are tracked exactly; percentiles are bucket midpoints (nearest rank).
+"""
+from __future__ import annotations # Keep type hints as strings (lazy evaluation) to avoid forward-ref/circular-import issues.
+
+import math
+from array import array
+from typing import Iterable
+
+from .stats import LatencySummary
+
+# 2^8 = 256 => 128 linear buckets per power of two above 256µs => relative bucket width <= 1/128
+SUB_BUCKET_BITS = 8
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+SUB_BUCKET_HALF = SUB_BUCKET_COUNT // 2
+# Highest trackable value (1 hour); larger values are counted in the last bucket (max stays exact)
+MAX_VALUE_US = 3600 * 1_000_000
+
+def _bucket_index(value_us: int) -> int:
+    if value_us < SUB_BUCKET_COUNT:
+        return value_us
+    shift = value_us.bit_length() - SUB_BUCKET_BITS
+    return SUB_BUCKET_COUNT + (shift - 1) * SUB_BUCKET_HALF + ((value_us >> shift) - SUB_BUCKET_HALF)
+
+def _bucket_midpoint_us(index: int) -> float:
+    if index < SUB_BUCKET_COUNT:
+        return float(index)
+    shift, offset = divmod(index - SUB_BUCKET_COUNT, SUB_BUCKET_HALF)
+    shift += 1
+    lowest = (offset + SUB_BUCKET_HALF) << shift
+    return lowest + ((1 << shift) - 1) / 2
+
+NUM_BUCKETS = _bucket_index(MAX_VALUE_US) + 1
+
+class LatencyHistogram:
+    """Fixed-memory latency histogram; record(ms), merge(other), summary()."""
+
+    def __init__(self) -> None:
+        self.counts = array("Q", bytes(8 * NUM_BUCKETS))
+        self.count = 0
+        self.sum_ms = 0.0
+        self.max_ms = -math.inf
+
+    def record(self, value_ms: float) -> None:
+        value_us = min(MAX_VALUE_US, max(0, int(value_ms * 1000)))
+        self.counts[_bucket_index(value_us)] += 1
+        self.count += 1
+        self.sum_ms += value_ms
+        if value_ms > self.max_ms:
+            self.max_ms = value_ms
+
+    def merge(self, other: LatencyHistogram) -> None:
+        # Lossless: same bucket layout everywhere => add counters bucket by bucket
+        counts = self.counts
+        for index, n in enumerate(other.counts):
+            if n:
+                counts[index] += n
+        self.count += other.count
+        self.sum_ms += other.sum_ms
+        self.max_ms = max(self.max_ms, other.max_ms)
+
+    def percentiles(self, qs: Iterable[float]) -> list[float]:
+        """Nearest-rank percentiles (q in 0..100) in ms - one pass over the buckets for all qs."""
+        qs = list(qs)
+        if not self.count:
+            return [math.nan for _ in qs]
+        ranks = sorted((max(1, math.ceil(q / 100 * self.count)), i) for i, q in enumerate(qs))
+        values = [math.nan] * len(ranks)
+        seen = 0
+        pending = iter(ranks)
+        rank, slot = next(pending)
+        for index, n in enumerate(self.counts):
+            if not n:
+                continue
+            seen += n
+            while seen >= rank:
+                # Never report more than the exact max (the top bucket may be wider)
+                values[slot] = min(_bucket_midpoint_us(index) / 1000, self.max_ms)
+                try:
+                    rank, slot = next(pending)
+                except StopIteration:
+                    return values
+        return values
+
+    def summary(self) -> LatencySummary:
+        if not self.count:
+            return LatencySummary(0, math.nan, math.nan, math.nan, math.nan, math.nan)
+        p50, p90, p99 = self.percentiles([50, 90, 99])
+        return LatencySummary(
+            count=self.count,
+            mean_ms=self.sum_ms / self.count,
+            p50_ms=p50,
+            p90_ms=p90,
+            p99_ms=p99,
+            max_ms=self.max_ms,
+        )
@@ -0,0 +1,248 @@
+# tests/_shared/history.py
+"""
+Run history + regression gate
+-----------------------------
+Loads the JSONL result records (RESULTS_PATH, see results.py) into a local, indexed
+SQLite database and compares a run against a stored baseline per (suite, endpoint).
+
+The compare step exits with 1 when, for any (suite, endpoint):
+- p95 latency grew by more than --max-p95-regression (relative, 0.2 => +20%), or
+- the error rate grew by more than --max-error-rate-increase (absolute, 0.01 => +1 point).
+So a slower/flakier API image fails the pipeline even if every functional check passes.
+
+The gate only runs against an explicitly marked baseline (`baseline`, or --baseline): no
+marked baseline => skipped, not "compare with whatever ran last". p95 is only compared
+where both runs have at least --min-samples timed responses for the endpoint - the p95 of
+a handful of requests is one outlier, not a trend.
+
+Usage:
+    python3 -m tests._shared.history ingest   --db shared/history.sqlite --results shared/results.jsonl
+    python3 -m tests._shared.history baseline --db shared/history.sqlite [--run RUN_ID]
+    python3 -m tests._shared.history compare  --db shared/history.sqlite [--run RUN_ID] [--baseline RUN_ID]
+"""
+from __future__ import annotations # Keep type hints as strings (lazy evaluation) to avoid forward-ref/circular-import issues.
+
+import argparse
+import datetime
+import json
+import os
+import sqlite3
+from typing import Iterator, NamedTuple, Optional
+
+from .stats import percentile
+
+# Timed responses per (suite, endpoint) needed in BOTH runs before their p95s are compared
+MIN_SAMPLES = 30
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id      TEXT PRIMARY KEY,
+    ingested_at TEXT NOT NULL,
+    is_baseline INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id         TEXT NOT NULL,
+    suite          TEXT NOT NULL,
+    test_no        INTEGER NOT NULL,
+    endpoint       TEXT NOT NULL,
+    params         TEXT NOT NULL,
+    expected_code  INTEGER,
+    expected_score TEXT,
+    status_code    INTEGER,
+    test_status    TEXT,
+    is_success     INTEGER NOT NULL,
+    score          REAL,
+    connect_ms     REAL,
+    ttfb_ms        REAL,
+    total_ms       REAL,
+    size_bytes     INTEGER,
+    ts             TEXT,
+    PRIMARY KEY (run_id, suite, test_no)
+);
+CREATE INDEX IF NOT EXISTS idx_results_suite_endpoint ON results (suite, endpoint, run_id);
+"""
+
+RESULT_COLUMNS = (
+    "run_id", "suite", "test_no", "endpoint", "params", "expected_code", "expected_score",
+    "status_code", "test_status", "is_success", "score", "connect_ms", "ttfb_ms", "total_ms",
+    "size_bytes", "ts",
+)
+
+class EndpointStats(NamedTuple):
+    count: int
+    error_rate: float       # share of results with is_success = 0
+    timed: int              # results with a total_ms (the p95 sample size)
+    p95_ms: Optional[float] # None => no timed responses
+
+class Regression(NamedTuple):
+    suite: str
+    endpoint: str
+    metric: str             # "p95" | "error_rate"
+    baseline: float
+    current: float
+
+def connect(db_path: str) -> sqlite3.Connection:
+    db_dir = os.path.dirname(db_path)
+    if db_dir:
+        os.makedirs(db_dir, exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.executescript(SCHEMA)
+    return conn
+
+def _iter_records(results_path: str) -> Iterator[dict]:
+    # Streams the JSONL file line by line (constant memory for big runs)
+    with open(results_path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                print(f"WARN: Skipping malformed results line {line_no} in {results_path}: {e}")
+
+def ingest(conn: sqlite3.Connection, results_path: str) -> int:
+    """Load all JSONL records into the history (idempotent: re-ingesting replaces rows). Returns the row count."""
+    now = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds")
+    placeholders = ", ".join("?" for _ in RESULT_COLUMNS)
+    count = 0
+    with conn:
+        for record in _iter_records(results_path):
+            conn.execute("INSERT OR IGNORE INTO runs (run_id, ingested_at) VALUES (?, ?)", (record["run_id"], now))
+            row = dict(record, params=json.dumps(record.get("params", {}), sort_keys=True), is_success=int(bool(record["is_success"])))
+            conn.execute(
+                f"INSERT OR REPLACE INTO results ({', '.join(RESULT_COLUMNS)}) VALUES ({placeholders})",
+                tuple(row.get(col) for col in RESULT_COLUMNS),
+            )
+            count += 1
+    return count
+
+def mark_baseline(conn: sqlite3.Connection, run_id: str) -> None:
+    with conn:
+        if conn.execute("SELECT 1 FROM runs WHERE run_id = ?", (run_id,)).fetchone() is None:
+            raise ValueError(f"Unknown run: {run_id!r}")
+        conn.execute("UPDATE runs SET is_baseline = (run_id = ?)", (run_id,))
+
+def latest_run(conn: sqlite3.Connection, exclude: Optional[str] = None) -> Optional[str]:
+    row = conn.execute(
+        "SELECT run_id FROM runs WHERE run_id IS NOT ? ORDER BY ingested_at DESC, run_id DESC LIMIT 1",
+        (exclude,),
+    ).fetchone()
+    return None if row is None else row[0]
+
+def baseline_run(conn: sqlite3.Connection, exclude: Optional[str] = None) -> Optional[str]:
+    # Explicitly marked baseline only (None => no gate): the previous run may itself be a bad one
+    row = conn.execute("SELECT run_id FROM runs WHERE is_baseline = 1 AND run_id IS NOT ?", (exclude,)).fetchone()
+    return None if row is None else row[0]
+
+def endpoint_stats(conn: sqlite3.Connection, run_id: str) -> dict[tuple[str, str], EndpointStats]:
+    stats: dict[tuple[str, str], EndpointStats] = {}
+    groups = conn.execute(
+        "SELECT suite, endpoint, COUNT(*), SUM(1 - is_success) FROM results WHERE run_id = ? GROUP BY suite, endpoint",
+        (run_id,),
+    ).fetchall()
+    for suite, endpoint, count, errors in groups:
+        latencies = [
+            r[0] for r in conn.execute(
+                "SELECT total_ms FROM results WHERE run_id = ? AND suite = ? AND endpoint = ? "
+                "AND total_ms IS NOT NULL ORDER BY total_ms",
+                (run_id, suite, endpoint),
+            )
+        ]
+        stats[(suite, endpoint)] = EndpointStats(
+            count=count,
+            error_rate=errors / count,
+            timed=len(latencies),
+            p95_ms=percentile(latencies, 95) if latencies else None,
+        )
+    return stats
+
+def compare(
+    conn: sqlite3.Connection,
+    run_id: str,
+    baseline_id: str,
+    max_p95_regression: float,
+    max_error_rate_increase: float,
+    min_samples: int = MIN_SAMPLES,
+) -> tuple[list[Regression], list[tuple[str, str]]]:
+    # => (regressions, (suite, endpoint) pairs whose p95 wasn't compared: too few samples)
+    current = endpoint_stats(conn, run_id)
+    baseline = endpoint_stats(conn, baseline_id)
+    regressions: list[Regression] = []
+    too_few: list[tuple[str, str]] = []
+
+    # Only (suite, endpoint) pairs present in BOTH runs are comparable
+    for key in sorted(current.keys() & baseline.keys()):
+        cur, base = current[key], baseline[key]
+        if min(cur.timed, base.timed) < max(min_samples, 1):
+            too_few.append(key)
+        elif cur.p95_ms > base.p95_ms * (1 + max_p95_regression):
+            regressions.append(Regression(*key, "p95", base.p95_ms, cur.p95_ms))
+        if cur.error_rate - base.error_rate > max_error_rate_increase:
+            regressions.append(Regression(*key, "error_rate", base.error_rate, cur.error_rate))
+    return regressions, too_few
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Test run history (SQLite) + regression gate.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_ingest = sub.add_parser("ingest", help="load a results JSONL file into the history")
+    p_ingest.add_argument("--results", default=os.environ.get("RESULTS_PATH", "shared/results.jsonl"))
+
+    p_base = sub.add_parser("baseline", help="mark a run as the baseline")
+    p_base.add_argument("--run", default=os.environ.get("RUN_ID"), help="default: latest ingested run")
+
+    p_cmp = sub.add_parser("compare", help="compare a run against the baseline (exit 1 on regression)")
+    p_cmp.add_argument("--run", default=os.environ.get("RUN_ID"), help="default: latest ingested run")
+    p_cmp.add_argument("--baseline", default=None, help="default: the marked baseline (none => gate skipped)")
+    p_cmp.add_argument("--max-p95-regression", type=float, default=0.2, help="relative, 0.2 => +20%%")
+    p_cmp.add_argument("--max-error-rate-increase", type=float, default=0.01, help="absolute, 0.01 => +1 point")
+    p_cmp.add_argument("--min-samples", type=int, default=MIN_SAMPLES, help="timed responses per endpoint (both runs) to compare p95")
+
+    for p in (p_ingest, p_base, p_cmp):
+        p.add_argument("--db", default=os.environ.get("HISTORY_DB", "shared/history.sqlite"))
+    args = parser.parse_args(argv)
+
+    conn = connect(args.db)
+    try:
+        if args.command == "ingest":
+            if not os.path.exists(args.results):
+                print(f"# No results file at {args.results} (RESULTS_PATH unset?) - nothing to ingest.")
+                return 0
+            count = ingest(conn, args.results)
+            print(f"# Ingested {count} result record(s) from {args.results} into {args.db}")
+            return 0
+
+        run_id = args.run or latest_run(conn)
+        if run_id is None:
+            print(f"# No runs in {args.db} yet.")
+            return 0
+
+        if args.command == "baseline":
+            mark_baseline(conn, run_id)
+            print(f"# Baseline run is now: {run_id}")
+            return 0
+
+        baseline_id = args.baseline or baseline_run(conn, exclude=run_id)
+        if baseline_id is None:
+            print(f"# No baseline marked (make history-baseline) - skipping regression gate for run {run_id}.")
+            return 0
+
+        regressions, too_few = compare(
+            conn, run_id, baseline_id, args.max_p95_regression, args.max_error_rate_increase, args.min_samples
+        )
+        print(f"# Regression gate: run {run_id} vs. baseline {baseline_id}")
+        for suite, endpoint in too_few:
+            print(f"# SKIPPED p95 {suite} {endpoint}: fewer than {args.min_samples} timed responses in one of the runs")
+        for r in regressions:
+            if r.metric == "p95":
+                print(f"# REGRESSION {r.suite} {r.endpoint}: p95 {r.baseline:.1f}ms -> {r.current:.1f}ms")
+            else:
+                print(f"# REGRESSION {r.suite} {r.endpoint}: error rate {r.baseline:.1%} -> {r.current:.1%}")
+        print("# ==> " + ("FAILED" if regressions else "OK (no regressions)"))
+        return 1 if regressions else 0
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,82 @@
+# tests/_shared/http_client.py
+from __future__ import annotations # Keep type hints as strings (lazy evaluation) to avoid forward-ref/circular-import issues.
+
+import time
+from typing import Any, Mapping, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .transport import MAX_HOST_POOLS, TIMED_POOL_CLASSES, ConnectionStats, _connect_timing, pool_stats
+from .types import Timing
+
+class HttpClient:
+    """
+    Pooled HTTP client shared by the readiness check, the runner and all suites
+    (the default "requests" transport, see transport.py).
+
+    Why this exists:
+    - Module-level requests.get(...) opens a NEW TCP connection for every call.
+    - Against the `api` container, connection setup is most of the client-side cost
+      and skews the recorded latencies.
+    - One requests.Session with a sized urllib3 pool reuses keep-alive connections instead.
+
+    Thread-safe for concurrent GETs (the urllib3 pool hands out one connection per request).
+    """
+
+    def __init__(self, timeout: float, pool_size: int, keep_alive: bool = True) -> None:
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.keep_alive = keep_alive
+
+        self.session = requests.Session()
+        # pool_block=True => never open more than pool_size connections per host;
+        # extra concurrent requests wait for a free connection instead of opening
+        # throw-away connections that would be discarded afterwards.
+        self._adapter = HTTPAdapter(
+            pool_connections=MAX_HOST_POOLS,
+            pool_maxsize=pool_size,
+            pool_block=True,
+        )
+        # Swap in pool classes whose connections record their connect time
+        self._adapter.poolmanager.pool_classes_by_scheme = TIMED_POOL_CLASSES
+        self.session.mount("http://", self._adapter)
+        self.session.mount("https://", self._adapter)
+
+        if not keep_alive:
+            # Ask the server to close after each response => one connection per request
+            self.session.headers["Connection"] = "close"
+
+    def get(self, url: str, params: Optional[Mapping[str, Any]] = None, **kwargs: Any) -> requests.Response:
+        # Same semantics as requests.get(...), but over the shared connection pool
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.get(url, params=params, **kwargs)
+
+    def timed_get(
+        self, url: str, params: Optional[Mapping[str, Any]] = None, **kwargs: Any
+    ) -> tuple[requests.Response, Timing]:
+        """
+        Like get(...), but also returns the Timing breakdown of this request.
+
+        stream=True splits "headers received" (TTFB) from "body fully read" (total);
+        reading .content afterwards makes the response behave like a normal one.
+        """
+        _connect_timing.seconds = 0.0
+        started = time.perf_counter()
+        response = self.get(url, params=params, stream=True, **kwargs)
+        headers_at = time.perf_counter()
+        body = response.content
+        finished = time.perf_counter()
+
+        return response, Timing(
+            connect_ms=_connect_timing.seconds * 1000,
+            ttfb_ms=(headers_at - started) * 1000,
+            total_ms=(finished - started) * 1000,
+            size_bytes=len(body),
+        )
+
+    def connection_stats(self) -> ConnectionStats:
+        return pool_stats(self._adapter.poolmanager.pools)
+
+    def close(self) -> None:
+        self.session.close()
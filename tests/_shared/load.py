@@ -0,0 +1,402 @@
+# tests/_shared/load.py
+"""
+Open-loop constant-rate load mode
+---------------------------------
+Replays a suite's existing test cases (the same `TestCase`/`TestParams` definitions
+the pass/fail suites use - with CORPUS_PATH set, its corpus records, up to
+suites.MAX_REPLAY_CASES) at a fixed target rate (RPS) for a fixed duration.
+
+Open-loop scheduling:
+- Request i is due at `start + i / rps` - independent of how long earlier requests take.
+- A slow response therefore does NOT delay the next request (a closed loop would
+  silently lower the rate and hide the API's queueing delay).
+- Latency is measured from the SCHEDULED send time, so client-side backlog is
+  included instead of being "coordinated away".
+
+Warm-up (--warmup S): the schedule first runs S seconds at the same rate whose requests are
+sent but kept out of every reported figure (rates, counts, statuses, latency) - the first
+requests after a deploy (model loading, cold caches, new connections) don't distort the
+steady-state percentiles.
+
+Worker fleet (--workers N):
+- One Python process (one GIL) caps the achievable rate. With N workers, the schedule is
+  split over N spawned processes (request i goes to worker i % N, same due times), so
+  together they send exactly the single-process sequence.
+- Each worker records latencies in a fixed-memory histogram (see histogram.py); the
+  parent merges them losslessly into cluster-wide percentiles.
+- With METRICS_PORT set, the parent exports live metrics for the whole fleet: every worker
+  pushes a snapshot of its counters every METRICS_PUSH_INTERVAL_S (see metrics.py).
+
+Reports achieved vs. target rate, responses by status code and latency percentiles -
+with API_TARGETS also per replica (requests, rps, errors, latency; see replicas.py), e.g.
+to check that adding replicas adds throughput. Per-replica latency is the HTTP request
+time (not from the scheduled send); warm-up responses arriving after the warm-up count.
+
+Usage:
+    API_ADDRESS=localhost API_PORT=8000 \
+    python3 -m tests._shared.load --suite content --rps 50 --duration 30 [--endpoint /v2/sentiment] [--workers 4] [--warmup 10]
+"""
+from __future__ import annotations # Keep type hints as strings (lazy evaluation) to avoid forward-ref/circular-import issues.
+
+import argparse
+import asyncio
+import dataclasses
+import math
+import multiprocessing
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterable, NamedTuple, Optional
+
+from .config import Config, load_config, open_loop_config
+from .logging import ensure_log_dir, log_api_not_ready, log_load_report, log_load_start
+from .readiness import wait_for_api
+from .histogram import LatencyHistogram
+from .plan import CompiledCase, compile_plan
+from .profiling import profiling
+from .replicas import ReplicaSummary, ReplicaTotals, merge_totals, summarize_replicas
+from .runner import run_test_case
+from .stats import LatencySummary
+from .suites import SUITE_MODULES, load_suite, replay_cases
+from .types import TestCase, TestResult
+
+# Upper bound for requests in flight at the same time (= worker threads + pooled connections).
+# Beyond that, due requests queue on the client - which shows up in the latencies.
+DEFAULT_MAX_IN_FLIGHT = 256
+
+# Worker fleet (--workers N): max. time for all worker processes to start (imports + pool),
+# and how far in the future the common start time is set once they are all ready
+WORKER_READY_TIMEOUT_S = 60.0
+WORKER_START_DELAY_S = 0.1
+# Worker fleet + METRICS_PORT: how often each worker pushes its metrics to the parent's exporter
+METRICS_PUSH_INTERVAL_S = 1.0
+
+class LoadReport(NamedTuple):
+    suite_name: str
+    endpoint: Optional[str]     # None => all endpoints of the suite
+    target_rps: float
+    duration_s: float           # measured phase (after the warm-up)
+    warmup_s: float
+    warmup_sent: int            # warm-up requests (excluded from everything below)
+    max_in_flight: int          # total, across all workers
+    workers: int                # load generator processes
+    sent: int
+    completed: int
+    failed: int                 # completed, but the test case expectations were not met
+    dispatch_rps: float         # rate at which requests were actually sent
+    throughput_rps: float       # completed requests / total wall time (incl. drain)
+    max_dispatch_lag_ms: float  # how far the scheduler fell behind its plan
+    status_counts: dict[str, int]
+    latency: LatencySummary
+    replicas: list[ReplicaSummary]  # per API replica (API_TARGETS), [] => single target
+
+def status_key(test_result: TestResult) -> str:
+    # HTTP status code - or the error name when no HTTP response was received
+    return str(test_result.status_code) if test_result.status_code else test_result.test_status
+
+def select_cases(test_cases: Iterable[TestCase], endpoint: Optional[str] = None) -> list[TestCase]:
+    cases = [tc for tc in test_cases if endpoint is None or tc.api_url == endpoint]
+    if not cases:
+        raise ValueError(f"No test cases for endpoint {endpoint!r}" if endpoint else "No test cases (none in CORPUS_PATH for this suite?)")
+    return cases
+
+class WorkerResult(NamedTuple):
+    warmup_sent: int
+    sent: int
+    failed: int                   # completed, but the test case expectations were not met
+    dispatch_elapsed_s: float     # from the end of the warm-up
+    total_elapsed_s: float        # incl. drain
+    max_lag_s: float
+    status_counts: Counter[str]
+    latency: LatencyHistogram     # fixed memory, however many requests were sent
+    replicas: list[ReplicaTotals]  # [] => single target
+
+async def _run_load_async(
+    cfg: Config,
+    cases: list[TestCase],
+    rps: float,
+    duration_s: float,
+    max_in_flight: int,
+    worker_index: int = 0,
+    workers: int = 1,
+    start_at: Optional[float] = None,
+    warmup_s: float = 0.0,
+) -> WorkerResult:
+    loop = asyncio.get_running_loop()
+    interval = 1.0 / rps
+    # Requests 0 .. warmup_total-1 are the warm-up, then the measured ones
+    warmup_total = int(rps * warmup_s)
+    total = warmup_total + int(rps * duration_s)
+    # Compiled once, resent for the whole run (see plan.py)
+    plan = compile_plan(cfg, cases)
+
+    latency = LatencyHistogram()
+    status_counts: Counter[str] = Counter()
+    failed = 0
+    warmup_sent = 0
+    sent = 0
+    max_lag_s = 0.0
+    in_flight: set[asyncio.Task[None]] = set()
+    # API_TARGETS: the per-replica stats restart with the first measured request
+    replicas = cfg.replicas
+    reset_replicas = replicas is not None and warmup_total > 0
+
+    with ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="load") as pool:
+
+        async def _send(test_case: CompiledCase, scheduled_at: float, measured: bool) -> None:
+            nonlocal failed
+            test_result = await loop.run_in_executor(pool, run_test_case, cfg, test_case)
+            if not measured:
+                return
+            latency.record((time.perf_counter() - scheduled_at) * 1000)
+            status_counts[status_key(test_result)] += 1
+            if not test_result.is_success:
+                failed += 1
+
+        start = time.perf_counter() if start_at is None else start_at
+        measure_start = start + warmup_total * interval
+        # This worker's share of the global schedule: requests worker_index, worker_index + workers, ...
+        # (all workers together send exactly the single-process sequence, interleaved)
+        for i in range(worker_index, total, workers):
+            test_case = plan[i % len(plan)]
+            scheduled_at = start + i * interval
+            delay = scheduled_at - time.perf_counter()
+            measured = i >= warmup_total
+            if delay > 0:
+                await asyncio.sleep(delay)
+            elif measured:
+                # Behind schedule => send immediately (catch up), never skip requests
+                max_lag_s = max(max_lag_s, -delay)
+            if measured and reset_replicas:
+                replicas.reset()
+                reset_replicas = False
+
+            # Fire and forget: the scheduler never awaits a response
+            task = asyncio.create_task(_send(test_case, scheduled_at, measured))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+            if measured:
+                sent += 1
+            else:
+                warmup_sent += 1
+
+        dispatch_elapsed = time.perf_counter() - measure_start
+
+        # Drain: wait for the remaining responses (each one is bounded by cfg.timeout)
+        if in_flight:
+            await asyncio.gather(*in_flight)
+        total_elapsed = time.perf_counter() - measure_start
+
+    return WorkerResult(
+        warmup_sent, sent, failed, dispatch_elapsed, total_elapsed, max_lag_s, status_counts, latency,
+        replicas.totals() if replicas is not None else [],
+    )
+
+def _worker_main(
+    worker_index: int,
+    workers: int,
+    cases: list[TestCase],
+    rps: float,
+    duration_s: float,
+    warmup_s: float,
+    max_in_flight: int,
+    ready: Any,
+    go: Any,
+    start_wall: Any,
+    results: Any,
+    metrics_queue: Any,
+) -> None:
+    # Runs in a separate (spawned) process: own interpreter, own GIL, own connection pool
+    stop_push = threading.Event()
+    try:
+        # Only the parent serves METRICS_PORT; workers collect and push (-1) - or skip metrics (0)
+        cfg = dataclasses.replace(load_config(), metrics_port=0 if metrics_queue is None else -1)
+        cfg = open_loop_config(cfg, max_in_flight)
+        cfg.http  # create the pool before the start signal (not on the clock)
+        ready.wait()
+        go.wait()
+        if metrics_queue is not None:
+            threading.Thread(
+                target=_push_metrics, args=(cfg, worker_index, metrics_queue, stop_push), name="metrics-push", daemon=True
+            ).start()
+        # Common start time for all workers: wall clock => this process's perf_counter()
+        start_at = time.perf_counter() + (start_wall.value - time.time())
+        with profiling(cfg, f"load-worker-{worker_index}"):
+            result = asyncio.run(
+                _run_load_async(cfg, cases, rps, duration_s, max_in_flight, worker_index, workers, start_at, warmup_s)
+            )
+        stop_push.set()
+        results.put((worker_index, result))
+    except BaseException as e:
+        stop_push.set()
+        results.put((worker_index, f"{type(e).__name__}: {e}"))
+        raise
+
+def _push_metrics(cfg: Config, worker_index: int, metrics_queue: Any, stop: threading.Event) -> None:
+    # Worker side: cumulative snapshots (the parent keeps the latest one per worker) + a final one
+    while not stop.wait(METRICS_PUSH_INTERVAL_S):
+        metrics_queue.put((worker_index, cfg.metrics.snapshot()))
+    metrics_queue.put((worker_index, cfg.metrics.snapshot()))
+
+def _collect_metrics(cfg: Config, metrics_queue: Any) -> None:
+    # Parent side: merge the workers' snapshots into the exported registry until None arrives
+    while (item := metrics_queue.get()) is not None:
+        worker_index, snapshot = item
+        cfg.metrics.merge_remote(("load-worker", worker_index), snapshot)
+
+def _run_fleet(
+    cfg: Config, cases: list[TestCase], rps: float, duration_s: float, warmup_s: float, max_in_flight: int, workers: int
+) -> list[WorkerResult]:
+    ctx = multiprocessing.get_context("spawn")  # no fork: the parent may already run threads
+    ready = ctx.Barrier(workers + 1)
+    go = ctx.Event()
+    start_wall = ctx.Value("d", 0.0)
+    results = ctx.Queue()
+    per_worker = math.ceil(max_in_flight / workers)
+    metrics_queue = None
+    collector: Optional[threading.Thread] = None
+    if cfg.metrics is not None:
+        metrics_queue = ctx.Queue()
+        collector = threading.Thread(target=_collect_metrics, args=(cfg, metrics_queue), name="metrics-collect", daemon=True)
+        collector.start()
+
+    processes = [
+        ctx.Process(
+            target=_worker_main,
+            args=(i, workers, cases, rps, duration_s, warmup_s, per_worker, ready, go, start_wall, results, metrics_queue),
+            name=f"load-worker-{i}",
+            daemon=True,
+        )
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    try:
+        # All workers started (imports + connection pool) => start them together, shortly in the future
+        try:
+            ready.wait(timeout=WORKER_READY_TIMEOUT_S)
+        except threading.BrokenBarrierError:
+            raise RuntimeError(f"Load workers not ready within {WORKER_READY_TIMEOUT_S}s") from None
+        start_wall.value = time.time() + WORKER_START_DELAY_S
+        go.set()
+
+        collected: dict[int, WorkerResult] = {}
+        deadline = warmup_s + duration_s + cfg.timeout + WORKER_READY_TIMEOUT_S
+        for _ in range(workers):
+            worker_index, result = results.get(timeout=deadline)
+            if isinstance(result, str):
+                raise RuntimeError(f"Load worker {worker_index} failed: {result}")
+            collected[worker_index] = result
+        return [collected[i] for i in range(workers)]
+    finally:
+        for process in processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        if collector is not None:
+            # Workers have exited => their final snapshots are queued ahead of the sentinel
+            metrics_queue.put(None)
+            collector.join(timeout=5)
+
+def run_load(
+    cfg: Config,
+    suite_name: str,
+    test_cases: Iterable[TestCase],
+    rps: float,
+    duration_s: float,
+    endpoint: Optional[str] = None,
+    max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+    workers: int = 1,
+    warmup_s: float = 0.0,
+) -> LoadReport:
+    """
+    Sends the given test cases round-robin at `rps` requests/second for `duration_s` seconds
+    (open-loop, see module docstring) and returns the aggregated LoadReport.
+
+    workers > 1 => the schedule is split over that many processes (max_in_flight is shared
+    between them); their latency histograms are merged into one cluster-wide distribution.
+    warmup_s > 0 => first a warm-up phase at the same rate, excluded from the report.
+    """
+    if rps <= 0 or duration_s <= 0:
+        raise ValueError("rps and duration must be > 0")
+    if warmup_s < 0:
+        raise ValueError("warmup must be >= 0")
+    if workers < 1:
+        raise ValueError("workers must be >= 1")
+    cases = select_cases(test_cases, endpoint)
+
+    if workers == 1:
+        load_cfg = open_loop_config(cfg, max_in_flight)
+        results = [asyncio.run(_run_load_async(load_cfg, cases, rps, duration_s, max_in_flight, warmup_s=warmup_s))]
+    else:
+        results = _run_fleet(cfg, cases, rps, duration_s, warmup_s, max_in_flight, workers)
+
+    # Merge the workers: counters add up, histograms merge losslessly, elapsed = slowest worker
+    latency = LatencyHistogram()
+    status_counts: Counter[str] = Counter()
+    for result in results:
+        latency.merge(result.latency)
+        status_counts.update(result.status_counts)
+    sent = sum(result.sent for result in results)
+    dispatch_elapsed = max(result.dispatch_elapsed_s for result in results)
+    total_elapsed = max(result.total_elapsed_s for result in results)
+
+    return LoadReport(
+        suite_name=suite_name,
+        endpoint=endpoint,
+        target_rps=rps,
+        duration_s=duration_s,
+        warmup_s=warmup_s,
+        warmup_sent=sum(result.warmup_sent for result in results),
+        max_in_flight=max_in_flight,
+        workers=workers,
+        sent=sent,
+        completed=latency.count,
+        failed=sum(result.failed for result in results),
+        dispatch_rps=sent / dispatch_elapsed if dispatch_elapsed > 0 else 0.0,
+        throughput_rps=latency.count / total_elapsed if total_elapsed > 0 else 0.0,
+        max_dispatch_lag_ms=max(result.max_lag_s for result in results) * 1000,
+        status_counts=dict(status_counts),
+        latency=latency.summary(),
+        replicas=summarize_replicas(merge_totals(result.replicas for result in results), total_elapsed),
+    )
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Open-loop constant-rate load against a suite's test cases.")
+    parser.add_argument("--suite", required=True, choices=sorted(SUITE_MODULES))
+    parser.add_argument("--rps", type=float, required=True, help="target requests per second")
+    parser.add_argument("--duration", type=float, required=True, help="run duration in seconds")
+    parser.add_argument("--endpoint", default=None, help="only send cases for this api_url (e.g. /v2/sentiment)")
+    parser.add_argument("--max-in-flight", type=int, default=DEFAULT_MAX_IN_FLIGHT, help="total, split across workers")
+    parser.add_argument("--workers", type=int, default=1, help="load generator processes (e.g. one per CPU core)")
+    parser.add_argument("--warmup", type=float, default=0.0, help="seconds at the same rate before measuring (excluded from the report)")
+    args = parser.parse_args(argv)
+
+    cfg = load_config()
+    ensure_log_dir(cfg)
+    suite = load_suite(args.suite)
+
+    log_load_start(cfg, suite.TEST_TYPE, args.rps, args.duration, args.endpoint)
+    if not wait_for_api(cfg):
+        log_api_not_ready(cfg, suite.TEST_TYPE)
+        return 1
+
+    with profiling(cfg, "load"):
+        report = run_load(
+            cfg,
+            suite.TEST_TYPE,
+            replay_cases(cfg, args.suite),
+            rps=args.rps,
+            duration_s=args.duration,
+            endpoint=args.endpoint,
+            max_in_flight=args.max_in_flight,
+            workers=args.workers,
+            warmup_s=args.warmup,
+        )
+    log_load_report(cfg, report)
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,145 @@
+# tests/_shared/log_sink.py
+from __future__ import annotations # Keep type hints as strings (lazy evaluation) to avoid forward-ref/circular-import issues.
+
+import atexit
+import signal
+import threading
+from typing import IO, Optional
+
+try:  # advisory file locks (POSIX only); without fcntl we still buffer, just don't lock
+    import fcntl
+except ImportError:  # pragma: no cover - e.g. Windows host runs
+    fcntl = None  # type: ignore[assignment]
+
+class LogSink:
+    """
+    Buffered, lock-safe writer for ONE shared log file.
+
+    Why this exists:
+    - Opening/appending/closing the log file per log block costs far more than the
+      formatting once a run reaches tens of thousands of test cases.
+    - Several suite containers (and worker threads) may write the same bind-mounted
+      /shared/api_test.log - blocks must never interleave.
+
+    How:
+    - Blocks are collected in a bounded in-memory buffer (flushed when it exceeds
+      max_buffer_bytes, or at the latest every flush_interval_s by a background thread).
+    - The file is opened ONCE (append mode) and each flush writes all buffered blocks
+      under an exclusive advisory lock (fcntl.flock) => whole blocks, never partial ones.
+    - Registered sinks are flushed on interpreter exit (incl. unhandled exceptions) and SIGTERM.
+    """
+
+    def __init__(self, path: str, max_buffer_bytes: int = 64 * 1024, flush_interval_s: float = 1.0) -> None:
+        self.path = path
+        self.max_buffer_bytes = max_buffer_bytes
+        self.flush_interval_s = flush_interval_s
+
+        self._buffer: list[str] = []
+        self._buffered_bytes = 0
+        self._lock = threading.Lock()        # guards the buffer
+        self._file_lock = threading.Lock()   # serializes flushes within this process
+        self._file: Optional[IO[str]] = None
+        self._closed = threading.Event()
+
+        # Time-based flushing (daemon => never keeps the process alive)
+        self._flusher: Optional[threading.Thread] = None
+        if flush_interval_s > 0:
+            self._flusher = threading.Thread(target=self._flush_periodically, name="log-sink", daemon=True)
+            self._flusher.start()
+
+    def write(self, text: str) -> None:
+        # Size-based flushing: the buffer never grows beyond max_buffer_bytes (+ one block)
+        with self._lock:
+            self._buffer.append(text)
+            self._buffered_bytes += len(text)
+            should_flush = self._buffered_bytes >= self.max_buffer_bytes
+        if should_flush:
+            self.flush()
+
+    def flush(self) -> None:
+        with self._file_lock:
+            with self._lock:
+                if not self._buffer:
+                    return
+                data = "".join(self._buffer)
+                self._buffer.clear()
+                self._buffered_bytes = 0
+            self._write_locked(data)
+
+    def close(self) -> None:
+        self._closed.set()
+        self.flush()
+        with self._file_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _flush_periodically(self) -> None:
+        while not self._closed.wait(self.flush_interval_s):
+            self.flush()
+
+    def _write_locked(self, data: str) -> None:
+        # Caller holds self._file_lock
+        try:
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8")
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+            try:
+                self._file.write(data)
+                self._file.flush()
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        except PermissionError as e:
+            print(
+                f'WARN: Could not write log file (permission denied): "{self.path}". '
+                f"Details: {e}"
+            )
+        except OSError as e:
+            print(
+                f'WARN: Could not write log file (OS error): "{self.path}". '
+                f"Details: {e}"
+            )
+
+# ------------------------------------------------------------------------------
+# Process-wide registry: one sink per log path (shared by all suites/threads)
+# ------------------------------------------------------------------------------
+_sinks: dict[str, LogSink] = {}
+_sinks_lock = threading.Lock()
+_exit_hooks_installed = False
+
+def get_log_sink(path: str, max_buffer_bytes: int, flush_interval_s: float) -> LogSink:
+    with _sinks_lock:
+        sink = _sinks.get(path)
+        if sink is None:
+            sink = _sinks[path] = LogSink(path, max_buffer_bytes, flush_interval_s)
+            _install_exit_hooks()
+        return sink
+
+def close_log_sinks() -> None:
+    # Flush + close all sinks (idempotent; registered via atexit)
+    with _sinks_lock:
+        sinks = list(_sinks.values())
+        _sinks.clear()
+    for sink in sinks:
+        sink.close()
+
+def _handle_sigterm(signum: int, frame: object) -> None:
+    # `docker stop` sends SIGTERM (default: die WITHOUT atexit). Turning it into SystemExit
+    # unwinds normally (releasing any held locks) and then runs atexit => buffers get flushed.
+    raise SystemExit(128 + signum)
+
+def _install_exit_hooks() -> None:
+    # Caller holds _sinks_lock
+    global _exit_hooks_installed
+    if _exit_hooks_installed:
+        return
+    _exit_hooks_installed = True
+
+    # atexit also runs after an unhandled exception ("crash") ends the main thread
+    atexit.register(close_log_sinks)
+
+    # Only take over SIGTERM if nobody else did (and only from the main thread)
+    if threading.current_thread() is threading.main_thread() and signal.getsignal(signal.SIGTERM) == signal.SIG_DFL:
+        signal.signal(signal.SIGTERM, _handle_sigterm)
@@ -1,12 +1,30 @@
 # tests/_shared/logging.py
+import contextlib
 import datetime
+import json
 import os
+import tempfile
 import textwrap
+import threading
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Iterator, Optional
 from .config import Config
+from .log_sink import get_log_sink
 from .params import iter_params
+from .results import write_result
+from .startup import phases
+from .stats import AttemptOutcomes, EndpointLatencies, format_summary
 
 from tests._shared.types import TestCase, TestResult
 
+if TYPE_CHECKING:  # type-only imports (load.py / soak.py import this module)
+    from .case_cache import IncrementalPlan
+    from .load import LoadReport
+    from .profiling import ProfileReport
+    from .replicas import ReplicaSummary
+    from .soak import SoakReport, SoakWindow
+    from .traffic import SuiteTraffic
+
 def ensure_log_dir(cfg: Config) -> None:
     # Only create directories when file logging is enabled
     if cfg.log != "1":
@@ -16,49 +34,167 @@ def ensure_log_dir(cfg: Config) -> None:
         os.makedirs(log_dir, exist_ok=True)
 
 def log_to_file(cfg: Config, output: str, prepend_lb: bool = False) -> None:
-    # Append to the shared log file only when LOG="1"
-    if cfg.log != "1":
+    # Append to the shared log file only when LOG="1" - and not from a shard
+    # (the merge step writes the shard results as one report, see sharding.py)
+    if cfg.log != "1" or cfg.shard_count > 1:
         return
 
     prefix = "\n" if prepend_lb else ""
 
+    # Buffered + flock-protected writer (one open file per process, see log_sink.py).
+    # Write errors are reported by the sink as WARN lines - they never fail a suite.
+    sink = get_log_sink(cfg.log_path, cfg.log_buffer_bytes, cfg.log_flush_interval)
+    sink.write(prefix + output + "\n\n")
+
+# A captured suite's blocks stay in memory up to this size, then spill to a temp file
+CAPTURE_SPOOL_BYTES = 1 << 20
+
+class CapturedOutput:
+    """
+    Log blocks held back for an ordered replay (see capture_output()), spooled to an
+    anonymous temp file once they exceed CAPTURE_SPOOL_BYTES - a suite streaming a big
+    corpus must not keep its whole log in memory until it's its turn to be reported.
+    One JSON line per block. Thread-safe: a suite emits from its worker threads.
+    """
+
+    def __init__(self) -> None:
+        self._file = tempfile.SpooledTemporaryFile(max_size=CAPTURE_SPOOL_BYTES, mode="w+", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def append(self, output: str, prepend_lb: bool) -> None:
+        line = json.dumps([output, prepend_lb]) + "\n"
+        with self._lock:
+            self._file.write(line)
+
+    def __iter__(self) -> Iterator[tuple[str, bool]]:
+        with self._lock:
+            self._file.seek(0)
+            for line in self._file:
+                output, prepend_lb = json.loads(line)
+                yield output, prepend_lb
+
+    def close(self) -> None:
+        self._file.close()
+
+# Captured log blocks of the current context (None => emit immediately), see capture_output()
+_captured: ContextVar[Optional[CapturedOutput]] = ContextVar("captured_log_blocks", default=None)
+
+def emit(cfg: Config, output: str, prepend_lb: bool = False) -> None:
+    # Every log block goes to stdout and (if LOG="1") to the shared log file -
+    # unless it is being captured for later, ordered replay.
+    captured = _captured.get()
+    if captured is not None:
+        captured.append(output, prepend_lb)
+        return
+    print(("\n" if prepend_lb else "") + output, end="\n\n")
+    log_to_file(cfg, output, prepend_lb=prepend_lb)
+
+@contextlib.contextmanager
+def capture_output() -> Iterator[CapturedOutput]:
+    """
+    Collect all log blocks emitted in this context (thread / asyncio tasks started from it)
+    instead of writing them right away - replay them later via replay_output(...).
+
+    Why: suites running in parallel in ONE process would otherwise interleave their
+    blocks; capturing per suite keeps each suite's report contiguous and in a fixed order.
+    """
+    blocks = CapturedOutput()
+    token = _captured.set(blocks)
     try:
-        with open(cfg.log_path, "a", encoding="utf-8") as f:
-            f.write(prefix + output + "\n\n")
-    except PermissionError as e:
-        print(
-            f'WARN: Could not write log file (permission denied): "{cfg.log_path}". '
-            f"Details: {e}"
-        )
-    except OSError as e:
-        print(
-            f'WARN: Could not write log file (OS error): "{cfg.log_path}". '
-            f"Details: {e}"
-        )
+        yield blocks
+    finally:
+        _captured.reset(token)
+
+def replay_output(cfg: Config, blocks: CapturedOutput) -> None:
+    # Emits the captured blocks in order, then drops them (closes the spool file)
+    try:
+        for output, prepend_lb in blocks:
+            emit(cfg, output, prepend_lb=prepend_lb)
+    finally:
+        blocks.close()
 
-def log_suite_start(cfg: Config, suite_name: str, num_cases: int) -> None:
+def log_suite_start(cfg: Config, suite_name: str, num_cases: Optional[int]) -> None:
+    # num_cases=None => cases are streamed (e.g. from a corpus file), count unknown upfront
     start_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     output = textwrap.dedent(f"""
     ...............................................................
     >>> RUNNING TEST-SUITE '{suite_name}'
     >>> Start: {start_time}
-    >>> No. of Test Cases: {num_cases}
+    >>> No. of Test Cases: {"streamed" if num_cases is None else num_cases}
     ...............................................................
     """).strip()
 
-    print("\n" + output, end="\n\n")
-    log_to_file(cfg, output, prepend_lb=True)
+    emit(cfg, output, prepend_lb=True)
 
-def log_suite_finished(cfg: Config, suite_name: str, success: bool) -> None:
+def format_connection_stats(traffic: Optional["SuiteTraffic"]) -> str:
+    # Only report when the suite actually sent requests (not in replay mode).
+    # Counted per suite (traffic.py): the pipeline's suites share ONE HTTP client
+    if traffic is None or not traffic.requests:
+        return ""
+    stats = traffic.connection_stats()
+    return (
+        f"\n>>> HTTP connections: opened={stats.opened}, reused={stats.reused} "
+        f"({stats.requests} requests)"
+    )
+
+def format_replicas(summaries: list["ReplicaSummary"]) -> str:
+    # One line per API replica (API_TARGETS): share, throughput, errors, latency
+    lines = []
+    for replica in summaries:
+        statuses = ", ".join(f"{k}={v}" for k, v in sorted(replica.status_counts.items())) or "none"
+        lines.append(
+            f"\n>>> Replica {replica.base_url}: {replica.requests} requests ({replica.share:.0%}), "
+            f"{replica.rps:.1f} rps, errors={replica.errors} ({statuses}) | {format_summary(replica.latency)}"
+        )
+    return "".join(lines)
+
+def format_replica_stats(cfg: Config, traffic: Optional["SuiteTraffic"]) -> str:
+    # Only with API_TARGETS - and (like the connection stats) only this suite's requests
+    if traffic is None:
+        return ""
+    summaries = traffic.replica_summaries()
+    order = {base_url: i for i, base_url in enumerate(cfg.base_urls)}
+    return format_replicas(sorted(summaries, key=lambda replica: order.get(replica.base_url, len(order))))
+
+def format_endpoint_latencies(latencies: Optional[EndpointLatencies]) -> str:
+    # One line per endpoint: total request latency percentiles of this suite run
+    if latencies is None:
+        return ""
+    return "".join(
+        f"\n>>> Latency {endpoint}: {format_summary(summary)}"
+        for endpoint, summary in latencies.summaries().items()
+    )
+
+def format_attempt_outcomes(outcomes: Optional[AttemptOutcomes]) -> str:
+    # Only with the resilience layer enabled (RETRIES / HEDGE / SUITE_DEADLINE)
+    if outcomes is None or not outcomes.total:
+        return ""
+    return (
+        f"\n>>> Outcomes: first attempt {outcomes.first_passed}/{outcomes.total} passed, "
+        f"final {outcomes.final_passed}/{outcomes.total} passed "
+        f"(retried: {outcomes.retried}, hedged: {outcomes.hedged}, deadline exceeded: {outcomes.deadline_exceeded})"
+    )
+
+def log_suite_finished(
+    cfg: Config,
+    suite_name: str,
+    success: bool,
+    latencies: Optional[EndpointLatencies] = None,
+    outcomes: Optional[AttemptOutcomes] = None,
+    traffic: Optional["SuiteTraffic"] = None,
+) -> None:
     status_msg = "SUCCESS" if success else "FAILED"
-    output = textwrap.dedent(f"""
-    ...............................................................
-    >>> TEST-SUITE '{suite_name}' FINISHED: {status_msg}
-    ...............................................................
-    """).strip()
+    output = (
+        "...............................................................\n"
+        f">>> TEST-SUITE '{suite_name}' FINISHED: {status_msg}"
+        f"{format_attempt_outcomes(outcomes)}"
+        f"{format_endpoint_latencies(latencies)}"
+        f"{format_connection_stats(traffic)}"
+        f"{format_replica_stats(cfg, traffic)}\n"
+        "..............................................................."
+    )
 
-    print(output, end="\n\n")
-    log_to_file(cfg, output)
+    emit(cfg, output)
 
 def log_api_not_ready(cfg: Config, suite_name: str) -> None:
     output = textwrap.dedent(f"""
@@ -70,12 +206,163 @@ def log_api_not_ready(cfg: Config, suite_name: str) -> None:
     ==> TEST STATUS: FAILURE
     """).strip()
 
-    print(output, end="\n\n")
-    log_to_file(cfg, output)
+    emit(cfg, output)
+
+def log_incremental_plan(cfg: Config, suite_name: str, plan: "IncrementalPlan", build: Optional[bytes]) -> None:
+    build_label = f"API build {build.hex()[:12]}" if build is not None else "UNKNOWN API build (nothing skipped)"
+    output = (
+        f">>> INCREMENTAL '{suite_name}' against {build_label}: {plan.scheduled} run, "
+        f"{plan.skipped} skipped (passed against this build), {plan.failed_first} previously failed run first"
+    )
+
+    emit(cfg, output)
+
+def log_fail_fast(cfg: Config, suite_name: str, cases_run: int, num_cases: Optional[int]) -> None:
+    # num_cases=None => streamed cases, count unknown
+    of_total = "" if num_cases is None else f" of {num_cases}"
+    emit(cfg, f">>> FAIL_FAST '{suite_name}': stopped at the first failure - {cases_run}{of_total} test cases run")
+
+def log_suite_skipped(cfg: Config, suite_name: str, failed_dependencies: list[str]) -> None:
+    output = textwrap.dedent(f"""
+    ==========================================
+        TEST-SUITE '{suite_name}' SKIPPED
+    ==========================================
+    Dependency FAILED: {", ".join(failed_dependencies)}
+    ==> TEST STATUS: FAILURE
+    """).strip()
+
+    emit(cfg, output)
+
+def log_pipeline_finished(cfg: Config, suite_status: dict[str, str], elapsed_s: float) -> None:
+    success = all(status == "SUCCESS" for status in suite_status.values())
+    lines = "\n".join(f">>> {name}: {status}" for name, status in suite_status.items())
+    output = (
+        "===============================================================\n"
+        f">>> PIPELINE FINISHED: {'SUCCESS' if success else 'FAILED'} ({elapsed_s:.1f}s)\n"
+        f"{lines}\n"
+        "==============================================================="
+    )
+
+    emit(cfg, output)
+
+def log_load_start(cfg: Config, suite_name: str, rps: float, duration_s: float, endpoint: Optional[str]) -> None:
+    start_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    output = textwrap.dedent(f"""
+    ...............................................................
+    >>> LOAD RUN '{suite_name}' ({endpoint or "all endpoints"})
+    >>> Start: {start_time}
+    >>> Target: {rps:g} rps for {duration_s:g}s (open-loop)
+    ...............................................................
+    """).strip()
+
+    emit(cfg, output, prepend_lb=True)
+
+def log_load_report(cfg: Config, report: "LoadReport") -> None:
+    statuses = ", ".join(f"{k}={v}" for k, v in sorted(report.status_counts.items())) or "none"
+    warmup = ""
+    if report.warmup_s > 0:
+        warmup = f"\n    >>> Warm-up:       {report.warmup_s:g}s, {report.warmup_sent} requests (excluded from all figures)"
+    # (indented like the template lines, so dedent still applies)
+    replicas = format_replicas(report.replicas).replace("\n", "\n    ")
+    output = textwrap.dedent(f"""
+    ...............................................................
+    >>> LOAD RUN '{report.suite_name}' ({report.endpoint or "all endpoints"}) FINISHED
+    >>> Target rate:   {report.target_rps:g} rps for {report.duration_s:g}s (max. in flight: {report.max_in_flight}, workers: {report.workers}){warmup}
+    >>> Achieved rate: {report.dispatch_rps:.1f} rps dispatched, {report.throughput_rps:.1f} rps completed
+    >>> Requests:      sent={report.sent}, completed={report.completed}, failed expectations={report.failed}
+    >>> Max. scheduler lag: {report.max_dispatch_lag_ms:.1f}ms
+    >>> Responses by status: {statuses}
+    >>> Latency (from scheduled send): {format_summary(report.latency)}{replicas}
+    ...............................................................
+    """).strip()
+
+    emit(cfg, output)
+
+def log_soak_start(cfg: Config, title: str, num_cases: int, rps: float, duration_s: float, window_s: float) -> None:
+    start_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    duration = f"{duration_s:g}s" if duration_s > 0 else "until interrupted"
+    output = textwrap.dedent(f"""
+    ...............................................................
+    >>> {title} ({num_cases} test cases in a loop)
+    >>> Start: {start_time}
+    >>> Target: {rps:g} rps, {duration}, {window_s:g}s windows (open-loop)
+    ...............................................................
+    """).strip()
+
+    emit(cfg, output, prepend_lb=True)
+
+def log_soak_window(cfg: Config, window: "SoakWindow") -> None:
+    # One line per window (grep-friendly over hours); alerts on their own lines below it
+    elapsed = str(datetime.timedelta(seconds=round(window.end_s)))
+    trend = f"{window.p99_trend_ms_per_h:+.1f}ms/h" if window.p99_trend_ms_per_h is not None else "n/a"
+    statuses = " ".join(f"{k}={v}" for k, v in sorted(window.status_counts.items())) or "none"
+    line = (
+        f"[{elapsed}] window {window.index}{' (baseline)' if window.baseline else ''}: "
+        f"{window.throughput_rps:.1f} rps, errors {window.error_rate:.2%}, "
+        f"p50={window.latency.p50_ms:.1f}ms p99={window.latency.p99_ms:.1f}ms (trend {trend}), "
+        f"lag={window.max_lag_ms:.0f}ms, rss={window.max_rss_mb:.0f}MB, statuses: {statuses}"
+    )
+    if window.flips:
+        line += ", flips: " + " ".join(f"{flip} x{n}" for flip, n in sorted(window.flips.items()))
+    emit(cfg, "\n".join([line, *(f"    ALERT: {alert}" for alert in window.alerts)]))
+
+def log_soak_report(cfg: Config, title: str, report: "SoakReport") -> None:
+    alerts = "\n".join(f">>>   {alert}" for alert in report.alerts) or ">>>   none"
+    output = textwrap.dedent(f"""
+    ...............................................................
+    >>> {title} FINISHED after {datetime.timedelta(seconds=round(report.elapsed_s))} ({report.windows} windows)
+    >>> Target rate: {report.target_rps:g} rps => sent={report.sent}, completed={report.completed}, failed expectations={report.failed}
+    >>> Latency (from scheduled send): {format_summary(report.latency)}
+    >>> Windows with alerts: {report.alert_windows}
+    """).strip() + "\n" + alerts + "\n" + textwrap.dedent(f"""
+    >>> ==> SOAK STATUS: {"FAILURE" if report.alert_windows else "SUCCESS"}
+    ...............................................................
+    """).strip()
+
+    emit(cfg, output)
+
+def log_startup_profile(cfg: Config, entry_point: str) -> None:
+    """
+    Prints the start-up phase breakdown of this process (STARTUP_PROFILE=1, see startup.py).
+    Console only: it describes the container, not the API, so it stays out of the shared log.
+    """
+    if not cfg.startup_profile:
+        return
+    measured = phases()
+    total_ms = sum(phase.duration_ms or 0.0 for phase in measured)
+    lines = [f"# Startup profile '{entry_point}': {total_ms:.1f}ms until {measured[-1].name}"]
+    for phase in measured:
+        duration = "n/a" if phase.duration_ms is None else f"{phase.duration_ms:8.1f}ms"
+        lines.append(f"#   {phase.name:<14}{duration:>10}")
+    print("\n".join(lines))
+
+def log_profile_report(cfg: Config, report: "ProfileReport") -> None:
+    """
+    Prints where the harness spent its time/memory (PROFILE=..., see profiling.py).
+    Console only, like the startup profile: it describes the harness, not the API.
+    """
+    lines = [f"# Profile '{report.name}': {report.elapsed_s:.1f}s profiled"]
+    lines.extend(f"#   {path}" for path in report.files)
+    if report.hot_paths:
+        lines.append(f"#   {'hot path':<11}{'function':<19}{'calls':>8}{'own ms':>10}{'cum ms':>10}{'cum us/call':>13}")
+        for hot_path in report.hot_paths:
+            per_call_us = hot_path.cum_ms * 1000 / max(1, hot_path.calls)
+            lines.append(
+                f"#   {hot_path.area:<11}{hot_path.function:<19}{hot_path.calls:>8}"
+                f"{hot_path.own_ms:>10.1f}{hot_path.cum_ms:>10.1f}{per_call_us:>13.1f}"
+            )
+    if report.stack_samples:
+        lines.append(f"#   stacks: {report.stack_samples} samples (collapsed format, e.g. flamegraph.pl / speedscope)")
+    if report.alloc_snapshots:
+        lines.append(f"#   allocation sites (avg live KiB over {report.alloc_snapshots} snapshots):")
+        for site in report.alloc_sites:
+            lines.append(f"#     {site.area:<11}{site.avg_bytes / 1024:>10.1f}  {site.site}")
+    print("\n".join(lines))
 
 def log_result(cfg: Config, suite_name: str, test_no: int, test_case: TestCase, test_result: TestResult):
     """
     Formats and writes ONE test result to stdout and (if LOG="1") appends it to the shared log file.
+    If RESULTS_PATH is set, the same result is also emitted as one JSONL record (see results.py).
 
     Important: request params are rendered dynamically via iter_params(test_case.params),
     so suites can have different TestParams fields without changing this logger.
@@ -94,7 +381,24 @@ def log_result(cfg: Config, suite_name: str, test_no: int, test_case: TestCase,
             f"\n- Actual score = {actual_score}"
         )
 
-    # 3) Assemble the report block (kept stable across suites for easy scanning)
+    # 3) Optional: request timing breakdown (only if an HTTP response was received)
+    timing_block = ""
+    timing = test_result.timing
+    if timing is not None:
+        timing_block = (
+            f"\nTiming: connect={timing.connect_ms:.1f}ms ttfb={timing.ttfb_ms:.1f}ms "
+            f"total={timing.total_ms:.1f}ms size={timing.size_bytes}B"
+        )
+
+    # 4) Optional: attempts (only if the resilience layer retried/hedged this test case)
+    attempts_block = ""
+    if test_result.attempts != 1 or test_result.hedged:
+        attempts_block = (
+            f"\nAttempts: {test_result.attempts}{' (hedged)' if test_result.hedged else ''}"
+            f" - first attempt: {test_result.first_attempt}"
+        )
+
+    # 5) Assemble the report block (kept stable across suites for easy scanning)
     output = f"""==========================================
     {suite_name} TEST NO. {test_no}
 ==========================================
@@ -103,9 +407,10 @@ Request Params:
 {params_lines}
 Expected vs Actual:
 - Expected status code = {test_case.expected_code}
-- Actual status code = {test_result.status_code}{score_block}
+- Actual status code = {test_result.status_code}{score_block}{timing_block}{attempts_block}
 ==> TEST STATUS: {test_result.test_status}""".strip()
 
     # write log to console and optionally to the shared log file 
-    print(output, end="\n\n")
-    log_to_file(cfg, output)     
\ No newline at end of file
+    emit(cfg, output)
+    # ... plus the machine-readable JSONL record (only if RESULTS_PATH is set)
+    write_result(cfg, suite_name, test_no, test_case, test_result)     
\ No newline at end of file
@@ -0,0 +1,221 @@
+# tests/_shared/metrics.py
+"""
+Live OpenMetrics / Prometheus exporter
+--------------------------------------
+With METRICS_PORT set, the harness serves GET /metrics while it runs (suites, pipeline,
+load modes) - so throughput and errors can be watched live with an existing scraping
+setup instead of reading api_test.log after the run:
+
+- api_test_requests_total{endpoint,status}         finished test case requests (final status:
+                                                   HTTP code or error name, e.g. ConnectTimeout)
+- api_test_request_duration_seconds{endpoint}      histogram (request start -> body read)
+- api_test_requests_in_flight                      gauge
+- api_test_retries_total{endpoint}                 extra attempts (resilience layer)
+- api_test_hedged_requests_total{endpoint}         hedged test cases (resilience layer)
+- api_test_cases_total{suite,result}               finished suite test cases (success/failure)
+- api_test_readiness_wait_seconds                  how long the last readiness check waited
+
+Format: OpenMetrics text when the scraper asks for it (Accept: application/openmetrics-text),
+otherwise Prometheus text format 0.0.4. Stdlib only (no prometheus_client dependency).
+
+Load worker processes (load --workers N) don't serve themselves: they push snapshots of their
+metrics to the parent, which exports the sum of its own and all workers' latest values.
+"""
+from __future__ import annotations # Keep type hints as strings (lazy evaluation) to avoid forward-ref/circular-import issues.
+
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import TYPE_CHECKING, Any
+
+from .types import TestResult
+
+if TYPE_CHECKING:
+    from .plan import CompiledCase
+
+# Histogram bucket upper bounds (seconds) - the Prometheus client defaults
+BUCKETS_S = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Metric family => (type, help)
+FAMILIES = {
+    "api_test_requests": ("counter", "Finished test case requests by endpoint and final status (HTTP code or error name)."),
+    "api_test_request_duration_seconds": ("histogram", "Request duration from request start until the body was read."),
+    "api_test_requests_in_flight": ("gauge", "Test case requests currently in flight."),
+    "api_test_retries": ("counter", "Extra attempts made by the resilience layer."),
+    "api_test_hedged_requests": ("counter", "Test cases for which the resilience layer sent a hedge request."),
+    "api_test_cases": ("counter", "Finished suite test cases by suite and result."),
+    "api_test_readiness_wait_seconds": ("gauge", "Time the last API readiness check waited."),
+}
+
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Labels = tuple[tuple[str, str], ...]
+# (family, labels) => value; histograms: (family, labels) => [bucket counts..., +Inf count, sum]
+Snapshot = tuple[dict[tuple[str, Labels], float], dict[tuple[str, Labels], list[float]]]
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(labels: Labels, extra: str = "") -> str:
+    pairs = [f'{key}="{_escape(value)}"' for key, value in labels]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+def _status_label(test_result: TestResult) -> str:
+    # HTTP status code - or the error name when no HTTP response was received
+    if test_result.status_code:
+        return str(test_result.status_code)
+    return test_result.test_status.removeprefix("ERROR: ")
+
+class Metrics:
+    """Thread-safe metric registry (counters, gauges, histograms) + the harness' update hooks."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._values: dict[tuple[str, Labels], float] = {}
+        self._histograms: dict[tuple[str, Labels], list[float]] = {}
+        self._remote: dict[Any, Snapshot] = {}  # source (e.g. load worker index) => latest snapshot
+
+    # --------------------------------------------------------------------------
+    # Update hooks (called from run_test_case, run_suite, the readiness check)
+    # --------------------------------------------------------------------------
+    def request_started(self) -> None:
+        with self._lock:
+            self._add("api_test_requests_in_flight", (), 1)
+
+    def request_finished(self, test_case: CompiledCase, test_result: TestResult) -> None:
+        endpoint = (("endpoint", test_case.api_url),)
+        with self._lock:
+            self._add("api_test_requests_in_flight", (), -1)
+            self._add("api_test_requests", endpoint + (("status", _status_label(test_result)),), 1)
+            if test_result.timing is not None:
+                self._observe("api_test_request_duration_seconds", endpoint, test_result.timing.total_ms / 1000)
+            if test_result.attempts > 1:
+                self._add("api_test_retries", endpoint, test_result.attempts - 1)
+            if test_result.hedged:
+                self._add("api_test_hedged_requests", endpoint, 1)
+
+    def case_finished(self, suite_name: str, test_result: TestResult) -> None:
+        labels = (("suite", suite_name), ("result", "success" if test_result.is_success else "failure"))
+        with self._lock:
+            self._add("api_test_cases", labels, 1)
+
+    def readiness_waited(self, waited_s: float) -> None:
+        with self._lock:
+            self._values[("api_test_readiness_wait_seconds", ())] = waited_s
+
+    # --------------------------------------------------------------------------
+    # Storage
+    # --------------------------------------------------------------------------
+    def _add(self, family: str, labels: Labels, amount: float) -> None:
+        key = (family, labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def _observe(self, family: str, labels: Labels, value_s: float) -> None:
+        histogram = self._histograms.get((family, labels))
+        if histogram is None:
+            histogram = self._histograms[(family, labels)] = [0.0] * (len(BUCKETS_S) + 2)
+        histogram[bisect_left(BUCKETS_S, value_s)] += 1  # le-bucket (index len(BUCKETS_S) => +Inf)
+        histogram[-1] += value_s
+
+    def snapshot(self) -> Snapshot:
+        with self._lock:
+            return dict(self._values), {key: list(histogram) for key, histogram in self._histograms.items()}
+
+    def merge_remote(self, source: Any, snapshot: Snapshot) -> None:
+        # Latest snapshot per source REPLACES the previous one (snapshots are cumulative)
+        with self._lock:
+            self._remote[source] = snapshot
+
+    def _totals(self) -> Snapshot:
+        # Own values + the latest snapshot of every remote source
+        with self._lock:
+            values = dict(self._values)
+            histograms = {key: list(histogram) for key, histogram in self._histograms.items()}
+            remotes = list(self._remote.values())
+        for remote_values, remote_histograms in remotes:
+            for key, value in remote_values.items():
+                values[key] = values.get(key, 0) + value
+            for key, remote in remote_histograms.items():
+                histogram = histograms.setdefault(key, [0.0] * len(remote))
+                for i, value in enumerate(remote):
+                    histogram[i] += value
+        return values, histograms
+
+    # --------------------------------------------------------------------------
+    # Exposition
+    # --------------------------------------------------------------------------
+    def render(self, openmetrics: bool = False) -> str:
+        values, histograms = self._totals()
+        lines: list[str] = []
+        for family, (kind, help_text) in FAMILIES.items():
+            # Prometheus 0.0.4 names counters with their _total suffix; OpenMetrics names the family
+            name = f"{family}_total" if kind == "counter" and not openmetrics else family
+            lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"# HELP {name} {help_text}")
+            if kind == "histogram":
+                for (hist_family, labels), histogram in sorted(histograms.items()):
+                    if hist_family != family:
+                        continue
+                    cumulative = 0.0
+                    for bound, count in zip((*BUCKETS_S, "+Inf"), histogram):
+                        cumulative += count
+                        le = 'le="+Inf"' if bound == "+Inf" else f'le="{bound!r}"'
+                        lines.append(f"{family}_bucket{_format_labels(labels, le)} {_format_value(cumulative)}")
+                    lines.append(f"{family}_count{_format_labels(labels)} {_format_value(cumulative)}")
+                    lines.append(f"{family}_sum{_format_labels(labels)} {_format_value(histogram[-1])}")
+                continue
+            sample = f"{family}_total" if kind == "counter" else family
+            for (value_family, labels), value in sorted(values.items()):
+                if value_family == family:
+                    lines.append(f"{sample}{_format_labels(labels)} {_format_value(value)}")
+        if openmetrics:
+            lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    server: MetricsServer
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass  # no access log per scrape
+
+    def do_GET(self) -> None:
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        openmetrics = "application/openmetrics-text" in self.headers.get("Accept", "")
+        body = self.server.metrics.render(openmetrics).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", OPENMETRICS_CONTENT_TYPE if openmetrics else PROMETHEUS_CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+class MetricsServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], metrics: Metrics) -> None:
+        super().__init__(address, _MetricsHandler)
+        self.metrics = metrics
+
+def open_metrics(address: str, port: int) -> Metrics:
+    """
+    Registry for this process; port > 0 => also serve it on http://address:port/metrics
+    (background daemon thread). port < 0 => collect only (load workers, see load.py).
+    A port that can't be bound is reported as WARN - metrics never fail a run.
+    """
+    metrics = Metrics()
+    if port > 0:
+        try:
+            server = MetricsServer((address, port), metrics)
+        except OSError as e:
+            print(f"# WARN: metrics exporter could not listen on {address}:{port}: {e}")
+            return metrics
+        threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+        print(f"# Metrics exporter: http://{address}:{port}/metrics")
+    return metrics
@@ -1,8 +1,12 @@
 # tests/_shared/params.py
 from __future__ import annotations # Keep type hints as strings (lazy evaluation) to avoid forward-ref/circular-import issues.
 
-from dataclasses import asdict, is_dataclass
+from dataclasses import fields, is_dataclass
 from typing import Any, Iterable, Mapping
+from urllib.parse import urlencode
+
+# Dataclass type => its field names (looked up once per TestParams class, not once per case)
+_field_names: dict[type, tuple[str, ...]] = {}
 
 def iter_params(params: Any) -> Iterable[tuple[str, Any]]:
     """
@@ -17,7 +21,7 @@ def iter_params(params: Any) -> Iterable[tuple[str, Any]]:
 
     Supported inputs:
     - dict / Mapping: use .items()
-    - dataclass instance: convert via dataclasses.asdict(...)
+    - dataclass instance: its fields, read directly (no dataclasses.asdict: that deep-copies every value)
     - NamedTuple: use ._asdict() if available
     - plain objects: use vars(obj) / obj.__dict__
     """    
@@ -29,9 +33,13 @@ def iter_params(params: Any) -> Iterable[tuple[str, Any]]:
     if isinstance(params, Mapping):
         return params.items()
 
-    # Dataclass: turn into a dict first, then expose .items()
-    if is_dataclass(params):
-        return asdict(params).items()
+    # Dataclass: (field name, attribute) pairs - shallow, values are used as they are
+    cls = type(params)
+    names = _field_names.get(cls)
+    if names is None and is_dataclass(params):
+        names = _field_names[cls] = tuple(f.name for f in fields(params))
+    if names is not None:
+        return [(name, getattr(params, name)) for name in names]
 
     # NamedTuple: _asdict() provides an OrderedDict-like mapping
     if hasattr(params, "_asdict"):  # NamedTuple instances
@@ -55,3 +63,16 @@ def params_dict(params: Any) -> dict[str, Any]:
     - dict(...) turns that stream into the mapping requests needs.
     """
     return dict(iter_params(params))
+
+def encode_query(params: Any) -> str:
+    """
+    URL-encoded query string for `params` - the exact bytes requests would send for
+    requests.get(url, params=params_dict(params)): None values dropped, sequences repeated.
+    Computed once per case by the plan compiler (see plan.py) instead of once per request.
+    """
+    return urlencode([(k, v) for k, v in iter_params(params) if v is not None], doseq=True)
+
+def canonical_query(params: Any) -> str:
+    # Order-independent form of the query (sorted, stringified) - identifies a request
+    # regardless of how a suite orders its params (cassette keys, shard assignment)
+    return urlencode(sorted((str(k), str(v)) for k, v in iter_params(params)))
@@ -0,0 +1,88 @@
+# tests/_shared/plan.py
+"""
+Compiled test plans
+-------------------
+A TestCase is the suite-facing description of a request: endpoint, a params object of
+any shape and the expectations. Sending one used to re-derive everything per request:
+params => dict => URL-encoded query => URL string, plus decoding the score keyword.
+
+compile_case(...) does that work ONCE per case and returns a slotted CompiledCase:
+- url:             full request URL incl. the pre-encoded query string (the same bytes
+                   requests builds from a params dict, see params.encode_query)
+- target:          the same without the base URL (path + query) - with API_TARGETS the
+                   balancer prepends the chosen replica's base URL (see replicas.py)
+- expected_code /
+  expected_sign:   the expectations, decoded (+1 / -1, 0 => unknown keyword, None => no score check)
+- cassette_query:  canonical query for record/replay (None in live mode)
+- test_case:       the original TestCase - only for logs/results, never read per request
+
+The hot path (run_test_case) then only sends the URL and compares the status code
+(and the score sign for content cases).
+
+Where plans are compiled:
+- suites (incl. a streamed corpus): case by case while scheduling (async_runner),
+  so a streamed corpus stays streamed
+- load and soak modes: the whole case list once, then the same records are resent
+  for the entire run
+"""
+from __future__ import annotations # Keep type hints as strings (lazy evaluation) to avoid forward-ref/circular-import issues.
+
+from typing import Iterable, Optional, Union
+
+from .config import Config
+from .params import canonical_query, encode_query
+from .types import TestCase
+
+# Score expectation keyword => required sign of the score
+EXPECTED_SIGNS = {"positive": 1, "negative": -1}
+
+class CompiledCase:
+    """One ready-to-send request + its decoded expectations (see module docstring)."""
+
+    __slots__ = ("test_case", "api_url", "url", "target", "expected_code", "expected_sign", "cassette_query")
+
+    def __init__(
+        self,
+        test_case: TestCase,
+        api_url: str,
+        url: str,
+        target: str,
+        expected_code: int,
+        expected_sign: Optional[int],
+        cassette_query: Optional[str],
+    ) -> None:
+        self.test_case = test_case
+        self.api_url = api_url
+        self.url = url
+        self.target = target
+        self.expected_code = expected_code
+        self.expected_sign = expected_sign
+        self.cassette_query = cassette_query
+
+    def __repr__(self) -> str:
+        return f"CompiledCase({self.url!r}, expected_code={self.expected_code}, expected_sign={self.expected_sign})"
+
+# What run_test_case accepts: a compiled case - or a TestCase, compiled on the fly
+Case = Union[TestCase, CompiledCase]
+
+def compile_case(cfg: Config, test_case: TestCase) -> CompiledCase:
+    query = encode_query(test_case.params)
+    target = f"{test_case.api_url}?{query}" if query else test_case.api_url
+    expected_score = test_case.expected_score
+    return CompiledCase(
+        test_case=test_case,
+        api_url=test_case.api_url,
+        url=f"{cfg.base_url}{target}",
+        target=target,
+        expected_code=test_case.expected_code,
+        # Unknown keyword => 0: no score can match (fails loudly, signals a bad testcase definition)
+        expected_sign=None if expected_score is None else EXPECTED_SIGNS.get(expected_score, 0),
+        cassette_query=None if cfg.http_mode == "live" else canonical_query(test_case.params),
+    )
+
+def compile_plan(cfg: Config, test_cases: Iterable[TestCase]) -> list[CompiledCase]:
+    # Whole case list at once - for modes that resend the same cases many times (load, soak)
+    return [compile_case(cfg, test_case) for test_case in test_cases]
+
+def ensure_compiled(cfg: Config, case: Case) -> CompiledCase:
+    return case if isinstance(case, CompiledCase) else compile_case(cfg, case)
@@ -0,0 +1,327 @@
+# tests/_shared/profiling.py
+"""
+Client-side profiling hooks
+---------------------------
+When a high-rate run stops scaling, is it the API, the network or the harness itself?
+PROFILE wraps an entry point's run (suite, pipeline, load, soak - and every load worker
+process) with opt-in profilers, comma-separated (e.g. PROFILE=cpu,stacks,alloc):
+
+- cpu:     cProfile in EVERY thread started while profiling (runner worker threads, the
+           asyncio transport's loop, ...) plus the calling thread (Python >= 3.12: one
+           interpreter-wide profile, which sees all threads anyway), merged into
+           <name>.pstats (python -m pstats, snakeviz). Times are wall time per thread:
+           with many threads, "cum ms" includes waiting for the GIL and the network
+- stacks:  wall-clock stack sampler over all threads at PROFILE_SAMPLE_HZ, written as
+           collapsed stacks (<name>.collapsed: "thread;outer;...;inner count" per line) -
+           the input format of flamegraph.pl, speedscope and inferno. Idle threads show
+           up too (waiting in threading/selectors/queue): filter them with grep -v
+- alloc:   tracemalloc, sampled every ALLOC_INTERVAL_S: average and peak live bytes per
+           allocation site (<name>.alloc.txt); import-time allocations are excluded
+
+Both the hot-path table (cpu) and the allocation sites (alloc) are additionally broken
+down by the harness' own per-request paths (FOCUS): the runner, params handling
+(iter_params / params_dict / encode_query) and the log_result formatting path.
+
+Files go to PROFILE_DIR/<run_id>/; the summary is printed to the console only (like the
+startup profile, it describes the harness, not the API). Profilers cost time themselves
+(cProfile easily doubles the harness' CPU per request) - compare profiled runs with each
+other, not with unprofiled ones.
+"""
+from __future__ import annotations # Keep type hints as strings (lazy evaluation) to avoid forward-ref/circular-import issues.
+
+import contextlib
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from typing import TYPE_CHECKING, Iterator, NamedTuple, Optional
+
+from .config import Config
+
+if TYPE_CHECKING:
+    import cProfile
+    from types import CodeType
+
+PROFILE_MODES = ("cpu", "stacks", "alloc")
+
+# Harness per-request path => (module file, its functions reported in the hot-path table)
+FOCUS = {
+    "runner": ("runner.py", ("run_test_case", "attempt_test_case", "fetch")),
+    "params": ("params.py", ("iter_params", "params_dict", "encode_query", "canonical_query")),
+    "log_result": ("logging.py", ("log_result", "emit", "log_to_file")),
+}
+FOCUS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# tracemalloc: frames kept per allocation (deep enough to reach the FOCUS functions) ...
+ALLOC_FRAMES = 16
+# ... and seconds between snapshots
+ALLOC_INTERVAL_S = 1.0
+# Rows per table in the files / in the console summary
+TOP_ROWS = 25
+SUMMARY_ROWS = 5
+
+class HotPath(NamedTuple):
+    area: str
+    function: str
+    calls: int
+    own_ms: float   # time in the function itself
+    cum_ms: float   # incl. everything it calls
+
+class AllocSite(NamedTuple):
+    area: str       # FOCUS area, or "all"
+    site: str       # file:line of the allocation (for FOCUS areas: the innermost line in that area)
+    avg_bytes: float
+    peak_bytes: int
+    avg_blocks: float
+
+class ProfileReport(NamedTuple):
+    name: str
+    elapsed_s: float
+    files: list[str]
+    hot_paths: list[HotPath]
+    stack_samples: int
+    alloc_snapshots: int
+    alloc_sites: list[AllocSite]
+
+def _short_path(filename: str) -> str:
+    # Repo files relative to the working directory, everything else (stdlib, site-packages) by name
+    if filename.startswith(os.getcwd() + os.sep):
+        return os.path.relpath(filename)
+    return os.path.basename(filename)
+
+def _focus_area(filename: str) -> Optional[str]:
+    if not filename.startswith(FOCUS_DIR):
+        return None
+    for area, (module_file, _) in FOCUS.items():
+        if filename.endswith(os.sep + module_file):
+            return area
+    return None
+
+# ------------------------------------------------------------------------------
+# cpu: one cProfile.Profile per thread (< 3.12) / per interpreter (>= 3.12)
+# ------------------------------------------------------------------------------
+# From 3.12 on cProfile is built on sys.monitoring: one active profiler per interpreter
+# (enabling a second one raises ValueError), and that one sees every thread
+PROFILE_PER_THREAD = sys.version_info < (3, 12)
+
+class _ThreadProfiles:
+    """
+    Below 3.12, cProfile only sees the thread that enabled it. threading.setprofile(...)
+    installs a bootstrap hook in every thread started afterwards; its first call enables a
+    fresh Profile in that thread (which replaces the hook). Threads keep being profiled
+    until they end - profiling is meant to wrap a whole entry point.
+    From 3.12 on, the calling thread's Profile covers all threads (PROFILE_PER_THREAD).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._profiles: list[cProfile.Profile] = []
+
+    def _enable(self) -> None:
+        import cProfile
+
+        profile = cProfile.Profile()
+        profile.enable()
+        with self._lock:
+            self._profiles.append(profile)
+
+    def _bootstrap(self, frame: object, event: str, arg: object) -> None:
+        try:
+            self._enable()
+        except ValueError:
+            # Another profiler is already active: leave this thread unprofiled - never kill it
+            sys.setprofile(None)
+
+    def start(self) -> None:
+        if PROFILE_PER_THREAD:
+            threading.setprofile(self._bootstrap)
+        self._enable()
+
+    def stop(self, path: str) -> list[HotPath]:
+        import pstats
+
+        threading.setprofile(None)
+        with self._lock:
+            profiles = list(self._profiles)
+        profiles[0].disable()  # this thread's; the others are snapshotted as they are
+        stats = pstats.Stats(*profiles)
+        stats.dump_stats(path)
+
+        hot_paths = []
+        for (filename, _, function), (_, calls, own_s, cum_s, _) in stats.stats.items():  # type: ignore[attr-defined]
+            area = _focus_area(filename)
+            if area is not None and function in FOCUS[area][1]:
+                hot_paths.append(HotPath(area, function, calls, own_s * 1000, cum_s * 1000))
+        return sorted(hot_paths, key=lambda hot_path: (list(FOCUS).index(hot_path.area), -hot_path.cum_ms))
+
+# ------------------------------------------------------------------------------
+# stacks + alloc: one sampler thread
+# ------------------------------------------------------------------------------
+class _AllocSites:
+    def __init__(self) -> None:
+        import tracemalloc
+
+        self.snapshots = 0
+        self._bytes: Counter[tuple[str, str]] = Counter()   # (area, site) => summed over snapshots
+        self._blocks: Counter[tuple[str, str]] = Counter()
+        self._peak: Counter[tuple[str, str]] = Counter()
+        self._filters = [
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>", all_frames=True),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>", all_frames=True),
+            tracemalloc.Filter(False, tracemalloc.__file__, all_frames=True),
+            tracemalloc.Filter(False, __file__, all_frames=True),
+        ]
+
+    def sample(self) -> None:
+        import tracemalloc
+
+        snapshot = tracemalloc.take_snapshot().filter_traces(self._filters)
+        current: Counter[tuple[str, str]] = Counter()
+        for stat in snapshot.statistics("traceback"):
+            frames = stat.traceback  # oldest => most recent
+            keys = [("all", f"{_short_path(frames[-1].filename)}:{frames[-1].lineno}")]
+            seen = set()
+            for frame in reversed(frames):  # innermost line of each FOCUS area
+                area = _focus_area(frame.filename)
+                if area is not None and area not in seen:
+                    seen.add(area)
+                    keys.append((area, f"{_short_path(frame.filename)}:{frame.lineno}"))
+            for key in keys:
+                current[key] += stat.size
+                self._blocks[key] += stat.count
+        self._bytes.update(current)
+        for key, size in current.items():
+            self._peak[key] = max(self._peak[key], size)
+        self.snapshots += 1
+
+    def top(self, area: str, rows: int) -> list[AllocSite]:
+        n = max(1, self.snapshots)
+        keys = [key for key in self._bytes if key[0] == area]
+        keys.sort(key=lambda key: -self._bytes[key])
+        return [
+            AllocSite(area, key[1], self._bytes[key] / n, self._peak[key], self._blocks[key] / n)
+            for key in keys[:rows]
+        ]
+
+class _Sampler(threading.Thread):
+    def __init__(self, stacks_hz: float, alloc: bool) -> None:
+        super().__init__(name="profile-sampler", daemon=True)
+        self.stacks: Optional[Counter[str]] = Counter() if stacks_hz > 0 else None
+        self.stack_samples = 0
+        self.alloc = _AllocSites() if alloc else None
+        self._interval_s = 1 / stacks_hz if stacks_hz > 0 else ALLOC_INTERVAL_S
+        self._labels: dict[CodeType, str] = {}
+        self._stopped = threading.Event()
+
+    def _label(self, code: CodeType) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = f"{code.co_qualname} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+        return label
+
+    def _sample_stacks(self) -> None:
+        assert self.stacks is not None
+        own = threading.get_ident()
+        # Pool threads by name without their number (ThreadPoolExecutor-0_3 => ThreadPoolExecutor-0)
+        names = {thread.ident: re.sub(r"_\d+$", "", thread.name) for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back  # type: ignore[assignment]
+            stack.append(names.get(ident, "thread"))
+            self.stacks[";".join(reversed(stack))] += 1
+        self.stack_samples += 1
+
+    def run(self) -> None:
+        next_alloc_at = time.monotonic() + ALLOC_INTERVAL_S
+        while not self._stopped.wait(self._interval_s):
+            if self.stacks is not None:
+                self._sample_stacks()
+            if self.alloc is not None and time.monotonic() >= next_alloc_at:
+                self.alloc.sample()
+                next_alloc_at += ALLOC_INTERVAL_S
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self.join()
+        if self.alloc is not None:
+            self.alloc.sample()  # at least one snapshot, even for short runs
+
+def _write_collapsed(path: str, stacks: Counter[str]) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        for stack, count in sorted(stacks.items()):
+            f.write(f"{stack} {count}\n")
+
+def _write_alloc(path: str, name: str, alloc: _AllocSites) -> None:
+    lines = [f"# Allocation sites of '{name}': live memory averaged over {alloc.snapshots} tracemalloc snapshot(s)"]
+    for area in ("all", *FOCUS):
+        lines.append("")
+        lines.append(f"[{area}]" if area == "all" else f"[{area}] (innermost {FOCUS[area][0]} line of each allocation)")
+        lines.append(f"{'avg KiB':>10} {'peak KiB':>10} {'avg blocks':>11}  site")
+        for site in alloc.top(area, TOP_ROWS):
+            lines.append(f"{site.avg_bytes / 1024:>10.1f} {site.peak_bytes / 1024:>10.1f} {site.avg_blocks:>11.0f}  {site.site}")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+@contextlib.contextmanager
+def profiling(cfg: Config, name: str) -> Iterator[None]:
+    """
+    Profiles the enclosed block with the PROFILE modes (no-op without PROFILE), then writes
+    the files to PROFILE_DIR/<run_id>/<name>.* and prints the summary.
+    """
+    if not cfg.profile:
+        yield
+        return
+    unknown = set(cfg.profile) - set(PROFILE_MODES)
+    if unknown:
+        raise ValueError(f"Unknown PROFILE mode(s): {', '.join(sorted(unknown))} (expected: {', '.join(PROFILE_MODES)})")
+
+    import tracemalloc
+
+    from .logging import log_profile_report
+
+    directory = os.path.join(cfg.profile_dir, cfg.run_id)
+    os.makedirs(directory, exist_ok=True)
+    base = os.path.join(directory, name)
+
+    cpu = _ThreadProfiles() if "cpu" in cfg.profile else None
+    alloc = "alloc" in cfg.profile
+    sampler = None
+    if alloc or "stacks" in cfg.profile:
+        if alloc:
+            tracemalloc.start(ALLOC_FRAMES)
+        sampler = _Sampler(cfg.profile_sample_hz if "stacks" in cfg.profile else 0.0, alloc)
+        sampler.start()
+    if cpu is not None:
+        cpu.start()
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed_s = time.perf_counter() - started
+        files: list[str] = []
+        hot_paths: list[HotPath] = []
+        if cpu is not None:
+            hot_paths = cpu.stop(base + ".pstats")
+            files.append(base + ".pstats")
+        stack_samples = alloc_snapshots = 0
+        alloc_sites: list[AllocSite] = []
+        if sampler is not None:
+            sampler.stop()
+            if sampler.stacks is not None:
+                _write_collapsed(base + ".collapsed", sampler.stacks)
+                files.append(base + ".collapsed")
+                stack_samples = sampler.stack_samples
+            if sampler.alloc is not None:
+                tracemalloc.stop()
+                _write_alloc(base + ".alloc.txt", name, sampler.alloc)
+                files.append(base + ".alloc.txt")
+                alloc_snapshots = sampler.alloc.snapshots
+                alloc_sites = [site for area in ("all", *FOCUS) for site in sampler.alloc.top(area, SUMMARY_ROWS)]
+        log_profile_report(cfg, ProfileReport(name, elapsed_s, files, hot_paths, stack_samples, alloc_snapshots, alloc_sites))
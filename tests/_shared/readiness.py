@@ -1,30 +1,181 @@
 # tests/_shared/readiness.py
+from __future__ import annotations # Keep type hints as strings (lazy evaluation) to avoid forward-ref/circular-import issues.
+
+import json
+import os
+import threading
 import time
-import requests
+from typing import NamedTuple, Optional
+
+from . import startup
 from .config import Config
 
-def wait_for_api(cfg: Config, timeout_s: int = 40) -> bool:
-    # Compose "depends_on" is NOT a readiness check — we actively poll /status here.
-    url = f"http://{cfg.api_address}:{cfg.api_port}/status"
-    print(f"# Waiting for API readiness at {url} (timeout: {timeout_s}s)")
-  
-    start = time.time()
-    last_msg = 0.0    
+# Poll schedule: start fast (the API is often ready within a few hundred ms), then back off
+# exponentially so a slow-starting API isn't hammered - capped, and bounded by the deadline.
+POLL_INITIAL_S = 0.05
+POLL_BACKOFF = 2.0
+POLL_MAX_S = 1.0
+
+class Readiness(NamedTuple):
+    ready: bool
+    waited_s: float  # how long THIS check took (0.0 when answered from marker/cache)
+    polls: int       # number of GET /status attempts made by this check
+    source: str      # "poll" | "marker" (trusted /shared marker) | "cache" (same process) | "replay"
+
+# In-process cache: target key (see _target_key) => monotonic time when readiness was confirmed
+# (e.g. several suites in one pipeline process only check once)
+_confirmed: dict[str, float] = {}
+_confirmed_lock = threading.Lock()
+
+def _target_key(cfg: Config) -> str:
+    # The API = all its replicas: "http://api:8000" or "http://api-1:8000,http://api-2:8000"
+    return ",".join(cfg.base_urls)
 
-    while time.time() - start < timeout_s:
+def _read_marker(cfg: Config) -> Optional[dict]:
+    # A marker is only trusted for the SAME API (same replicas) and within the configured TTL
+    if cfg.readiness_ttl <= 0:
+        return None
+    try:
+        with open(cfg.readiness_marker, encoding="utf-8") as f:
+            marker = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if marker.get("base_url") != _target_key(cfg):
+        return None
+    if time.time() - float(marker.get("ready_at", 0)) > cfg.readiness_ttl:
+        return None
+    return marker
+
+def _write_marker(cfg: Config, readiness: Readiness) -> None:
+    # Best effort: no /shared (e.g. host run) => simply no cross-suite cache
+    marker_dir = os.path.dirname(cfg.readiness_marker)
+    if marker_dir and not os.path.isdir(marker_dir):
+        return
+    marker = {
+        "base_url": _target_key(cfg),
+        "ready_at": time.time(),
+        "waited_s": round(readiness.waited_s, 3),
+        "polls": readiness.polls,
+    }
+    tmp_path = f"{cfg.readiness_marker}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(marker, f)
+        os.replace(tmp_path, cfg.readiness_marker)  # atomic: readers never see half a marker
+    except OSError as e:
+        print(f'# Note: could not write readiness marker "{cfg.readiness_marker}": {e}')
+
+def _poll(cfg: Config, url: str, timeout_s: float, max_delay_s: float = POLL_MAX_S) -> Readiness:
+    from requests.exceptions import RequestException  # deferred (see Config.http)
+
+    start = time.monotonic()
+    deadline = start + timeout_s
+    delay = min(POLL_INITIAL_S, max_delay_s)
+    polls = 0
+    last_msg = 0.0
+
+    while True:
+        polls += 1
         try:
-            r = requests.get(url, timeout=cfg.timeout)
+            # Never let a single poll outlive the overall deadline
+            remaining = max(0.01, deadline - time.monotonic())
+            r = cfg.http.get(url, timeout=min(cfg.timeout, remaining))
             if r.status_code == 200 and r.text.strip() == "1":
-                return True
-        except requests.exceptions.RequestException:
+                return Readiness(True, time.monotonic() - start, polls, "poll")
+        except RequestException:
             pass
-        time.sleep(1)
-        
+
+        now = time.monotonic()
+        if now >= deadline:
+            return Readiness(False, now - start, polls, "poll")
+        time.sleep(min(delay, deadline - now))
+        delay = min(delay * POLL_BACKOFF, max_delay_s)
+
         # Small heartbeat every ~5s so it doesn't feel frozen
-        elapsed = time.time() - start
+        elapsed = time.monotonic() - start
         if elapsed - last_msg >= 5:
             print(f"# ...still waiting ({int(elapsed)}s)")
             last_msg = elapsed
 
-    print("# API readiness check timed out.")
-    return False
+def _poll_replicas(cfg: Config, timeout_s: float) -> Readiness:
+    # API_TARGETS: every replica is polled on its own (in parallel, one shared deadline);
+    # the API is ready once ALL of them are - a replica that never comes up is named
+    from concurrent.futures import ThreadPoolExecutor
+
+    base_urls = cfg.base_urls
+    with ThreadPoolExecutor(max_workers=len(base_urls), thread_name_prefix="readiness") as pool:
+        results = list(pool.map(lambda base_url: _poll(cfg, f"{base_url}/status", timeout_s), base_urls))
+    for base_url, readiness in zip(base_urls, results):
+        state = f"ready after {readiness.waited_s:.2f}s" if readiness.ready else "NOT ready"
+        print(f"# Replica {base_url}: {state} ({readiness.polls} polls)")
+    return Readiness(
+        all(readiness.ready for readiness in results),
+        max(readiness.waited_s for readiness in results),
+        sum(readiness.polls for readiness in results),
+        "poll",
+    )
+
+def poll_status(cfg: Config, timeout_s: float, interval_s: float) -> Readiness:
+    """
+    Polls /status every interval_s (no backoff, no marker/cache shortcut) - for measuring
+    how long the API takes to come up, e.g. after a restart (bench_cold_start.py).
+    """
+    return _poll(cfg, f"{cfg.base_url}/status", timeout_s, max_delay_s=interval_s)
+
+def check_api_readiness(cfg: Config, timeout_s: Optional[float] = None) -> Readiness:
+    """
+    Readiness gate for the API (GET /status => "1"), in order of cost:
+    0) HTTP_MODE=replay => no API involved at all, always ready => "replay"
+    1) same process already confirmed it => "cache"
+    2) a fresh marker in /shared written by an earlier suite (READINESS_TTL) => "marker"
+    3) poll /status with fast initial polls + capped exponential backoff until the deadline
+       => on success, write the marker for later suites (records how long the API took)
+
+    With METRICS_PORT set, the wait is exported live (api_test_readiness_wait_seconds) -
+    which also starts the exporter before the first test case.
+    """
+    readiness = _check_api_readiness(cfg, timeout_s)
+    metrics = cfg.metrics
+    if metrics is not None:
+        metrics.readiness_waited(readiness.waited_s)
+    return readiness
+
+def _check_api_readiness(cfg: Config, timeout_s: Optional[float]) -> Readiness:
+    # Compose "depends_on" is NOT a readiness check — we actively poll /status here.
+    url = f"{cfg.base_url}/status" if len(cfg.base_urls) == 1 else f"/status of {len(cfg.base_urls)} replicas"
+    target_key = _target_key(cfg)
+    timeout_s = cfg.readiness_timeout if timeout_s is None else timeout_s
+
+    # Responses come from the cassette => nothing to wait for
+    if cfg.http_mode == "replay":
+        return Readiness(True, 0.0, 0, "replay")
+
+    with _confirmed_lock:
+        if target_key in _confirmed:
+            return Readiness(True, 0.0, 0, "cache")
+
+    marker = _read_marker(cfg)
+    if marker is not None:
+        print(
+            f"# API readiness at {url} taken from marker {cfg.readiness_marker} "
+            f"(ready after {marker.get('waited_s', '?')}s, {int(time.time() - marker['ready_at'])}s ago)"
+        )
+        readiness = Readiness(True, 0.0, 0, "marker")
+    else:
+        print(f"# Waiting for API readiness at {url} (timeout: {timeout_s:g}s)")
+        readiness = _poll(cfg, url, timeout_s) if len(cfg.base_urls) == 1 else _poll_replicas(cfg, timeout_s)
+        if not readiness.ready:
+            print("# API readiness check timed out.")
+            return readiness
+        print(f"# API ready after {readiness.waited_s:.2f}s ({readiness.polls} polls)")
+        _write_marker(cfg, readiness)
+
+    with _confirmed_lock:
+        _confirmed[target_key] = time.monotonic()
+    return readiness
+
+def wait_for_api(cfg: Config, timeout_s: Optional[float] = None) -> bool:
+    # Boolean gate used by the suites (see check_api_readiness for the details)
+    ready = check_api_readiness(cfg, timeout_s).ready
+    startup.mark("readiness")
+    return ready
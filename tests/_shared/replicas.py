@@ -0,0 +1,154 @@
+# tests/_shared/replicas.py
+"""
+Multi-replica targets (API_TARGETS)
+-----------------------------------
+API_TARGETS="host:port,host:port,..." (or full http:// base URLs) spreads the requests over
+several API replicas, e.g. scaled `api` containers (`docker compose up --scale api=3` =>
+docker-exam-api-1:8000, docker-exam-api-2:8000, ...), balanced on the client side:
+
+- round_robin         (BALANCE default) replicas in turn - equal share, whatever their speed
+- least_outstanding   the replica with the fewest requests in flight (ties rotate) - a slow
+                      replica keeps requests longer and automatically gets fewer new ones
+
+Every attempt picks a replica (a retry may go to another one). Readiness is checked per
+replica (readiness.py). Per replica the set counts requests, errors (no HTTP response
+or 5xx) and response statuses, and records latency (HDR histogram, mergeable across load
+workers) => throughput, share and percentiles per replica in the suite and load reports:
+does adding replicas add throughput, is one node slower than the others?
+"""
+from __future__ import annotations # Keep type hints as strings (lazy evaluation) to avoid forward-ref/circular-import issues.
+
+import threading
+import time
+from collections import Counter
+from typing import Iterable, NamedTuple, Optional
+
+from .histogram import LatencyHistogram
+from .stats import LatencySummary
+from .types import Timing
+
+BALANCERS = ("round_robin", "least_outstanding")
+
+class ReplicaTotals(NamedTuple):
+    # Raw counters of one replica (picklable: load workers send them to the parent)
+    base_url: str
+    requests: int
+    errors: int
+    status_counts: Counter[str]
+    latency: LatencyHistogram
+
+class ReplicaSummary(NamedTuple):
+    base_url: str
+    requests: int
+    share: float          # of all requests sent to the replica set
+    rps: float
+    errors: int           # no HTTP response or 5xx
+    status_counts: dict[str, int]
+    latency: LatencySummary
+
+class Replica:
+    __slots__ = ("base_url", "outstanding", "requests", "errors", "status_counts", "latency")
+
+    def __init__(self, base_url: str) -> None:
+        self.base_url = base_url
+        self.outstanding = 0
+        self.reset()
+
+    def reset(self) -> None:
+        self.requests = 0
+        self.errors = 0
+        self.status_counts: Counter[str] = Counter()
+        self.latency = LatencyHistogram()
+
+class ReplicaSet:
+    """
+    Client-side load balancer over API_TARGETS + per-replica stats (see module docstring).
+    acquire() => replica for the next request; release(...) once it's answered (or failed).
+    Thread-safe: one lock, held for a few attribute updates per request.
+    """
+
+    def __init__(self, base_urls: Iterable[str], balance: str) -> None:
+        if balance not in BALANCERS:
+            raise ValueError(f"Unknown BALANCE: {balance!r} (expected one of: {', '.join(BALANCERS)})")
+        self.replicas = [Replica(base_url) for base_url in base_urls]
+        self.balance = balance
+        self._lock = threading.Lock()
+        self._next = 0
+        # Window of the recorded requests: first acquire .. last release (perf_counter)
+        self._first_at: Optional[float] = None
+        self._last_at: Optional[float] = None
+
+    def acquire(self) -> Replica:
+        replicas = self.replicas
+        with self._lock:
+            start = self._next
+            self._next = (start + 1) % len(replicas)
+            replica = replicas[start]
+            if self.balance == "least_outstanding":
+                # Scan from the rotating start => ties are spread instead of always hitting replica 0
+                for offset in range(1, len(replicas)):
+                    candidate = replicas[(start + offset) % len(replicas)]
+                    if candidate.outstanding < replica.outstanding:
+                        replica = candidate
+            replica.outstanding += 1
+            if self._first_at is None:
+                self._first_at = time.perf_counter()
+        return replica
+
+    def release(self, replica: Replica, status: str, timing: Optional[Timing]) -> None:
+        # status: HTTP status code - or the exception name when no HTTP response was received
+        with self._lock:
+            replica.outstanding -= 1
+            replica.requests += 1
+            replica.status_counts[status] += 1
+            if timing is None or status.startswith("5"):
+                replica.errors += 1
+            if timing is not None:
+                replica.latency.record(timing.total_ms)
+            self._last_at = time.perf_counter()
+
+    def reset(self) -> None:
+        # Drop the stats so far (e.g. after a load warm-up); requests in flight stay counted as outstanding
+        with self._lock:
+            for replica in self.replicas:
+                replica.reset()
+            self._first_at = self._last_at = None
+
+    def totals(self) -> list[ReplicaTotals]:
+        with self._lock:
+            return [
+                ReplicaTotals(r.base_url, r.requests, r.errors, Counter(r.status_counts), r.latency)
+                for r in self.replicas
+            ]
+
+    def summaries(self) -> list[ReplicaSummary]:
+        # Throughput over this set's own window (first request .. last response)
+        with self._lock:
+            elapsed_s = 0.0 if self._first_at is None or self._last_at is None else self._last_at - self._first_at
+        return summarize_replicas(self.totals(), elapsed_s)
+
+def merge_totals(per_worker: Iterable[list[ReplicaTotals]]) -> list[ReplicaTotals]:
+    # Same replica in several load workers => counters add up, histograms merge losslessly
+    merged: dict[str, ReplicaTotals] = {}
+    for totals in per_worker:
+        for t in totals:
+            into = merged.setdefault(t.base_url, ReplicaTotals(t.base_url, 0, 0, Counter(), LatencyHistogram()))
+            into.status_counts.update(t.status_counts)
+            into.latency.merge(t.latency)
+            merged[t.base_url] = into._replace(requests=into.requests + t.requests, errors=into.errors + t.errors)
+    return list(merged.values())
+
+def summarize_replicas(totals: list[ReplicaTotals], elapsed_s: float) -> list[ReplicaSummary]:
+    all_requests = sum(t.requests for t in totals)
+    return [
+        ReplicaSummary(
+            base_url=t.base_url,
+            requests=t.requests,
+            share=t.requests / all_requests if all_requests else 0.0,
+            rps=t.requests / elapsed_s if elapsed_s > 0 else 0.0,
+            errors=t.errors,
+            status_counts=dict(t.status_counts),
+            latency=t.latency.summary(),
+        )
+        for t in totals
+    ]
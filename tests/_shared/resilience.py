@@ -0,0 +1,175 @@
+# tests/_shared/resilience.py
+"""
+Opt-in resilience layer for run_test_case
+-----------------------------------------
+Without it, one attempt is made and any network error is a permanent `ERROR:` result -
+so one slow cold request can fail a whole suite. Enabled by any of:
+
+- RETRIES=N            up to N extra attempts for retryable outcomes: network errors
+                       (timeouts, refused/reset connections) and unexpected 5xx responses.
+                       Wrong answers (e.g. 403 instead of 200, wrong score sign) are never retried.
+                       Between attempts: "full jitter" backoff, uniform(0, min(RETRY_BACKOFF_MAX,
+                       RETRY_BACKOFF * 2^retry)), so retrying clients don't synchronize.
+- HEDGE=1              if an attempt hasn't answered after the endpoint's recent p95 latency,
+                       a second identical request is sent; the first usable answer wins.
+                       (Needs HEDGE_MIN_SAMPLES observed latencies per endpoint first; skipped
+                       while all hedge threads are busy, see HedgePool.)
+- SUITE_DEADLINE=S     total time budget per suite: attempts get at most the remaining budget
+                       as timeout, and cases not started in time end as ERROR: DeadlineExceeded.
+
+Every result then carries its attempt count, whether it was hedged and the outcome of its
+FIRST attempt - the suite summary reports first-attempt vs. final pass counts, which tells
+"the API was slow/flaky" apart from "the API is broken".
+"""
+from __future__ import annotations # Keep type hints as strings (lazy evaluation) to avoid forward-ref/circular-import issues.
+
+import contextvars
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Optional
+
+from .config import Config
+from .plan import CompiledCase
+from .runner import attempt_test_case, error_result
+from .stats import percentile
+from .types import TestResult
+
+# Hedge delay = this percentile of the endpoint's recent latencies ...
+HEDGE_PERCENTILE = 95
+# ... over the last HEDGE_WINDOW responses, once at least HEDGE_MIN_SAMPLES were observed
+HEDGE_WINDOW = 200
+HEDGE_MIN_SAMPLES = 20
+
+DEADLINE_EXCEEDED = TestResult(
+    is_success=False,
+    status_code=0,
+    test_status="ERROR: DeadlineExceeded",
+    attempts=0,
+    first_attempt="ERROR: DeadlineExceeded",
+)
+
+class HedgeDelays:
+    """Per-endpoint rolling window of recent response latencies => hedge delay (p95)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._latencies: dict[str, deque[float]] = {}
+
+    def observe(self, endpoint: str, total_ms: float) -> None:
+        with self._lock:
+            self._latencies.setdefault(endpoint, deque(maxlen=HEDGE_WINDOW)).append(total_ms)
+
+    def delay_s(self, endpoint: str) -> Optional[float]:
+        with self._lock:
+            window = self._latencies.get(endpoint)
+            if window is None or len(window) < HEDGE_MIN_SAMPLES:
+                return None
+            values = sorted(window)
+        return percentile(values, HEDGE_PERCENTILE) / 1000
+
+class HedgePool:
+    """
+    Threads for hedged attempts. The losing request of a hedge isn't cancelled (a blocking
+    request can't be interrupted): it keeps its thread until it answers or times out. So
+    try_submit never queues - with every thread busy it returns None and the caller doesn't
+    hedge: under a slow API, losers of earlier hedges can't delay later attempts.
+    """
+
+    def __init__(self, max_workers: int) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hedge")
+        self._slots = threading.BoundedSemaphore(max_workers)
+
+    def try_submit(self, fn: Callable[..., Any], *args: Any) -> Optional[Future[Any]]:
+        if not self._slots.acquire(blocking=False):
+            return None
+        # Runs in the caller's context (e.g. the suite's request counters, see traffic.py)
+        future = self._executor.submit(contextvars.copy_context().run, fn, *args)
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+def outcome(test_result: TestResult) -> str:
+    # e.g. "SUCCESS (200)", "FAILURE (503)", "ERROR: ConnectTimeout"
+    if test_result.status_code:
+        return f"{test_result.test_status} ({test_result.status_code})"
+    return test_result.test_status
+
+def _attempt(cfg: Config, test_case: CompiledCase, timeout: float) -> tuple[TestResult, bool]:
+    # ONE request => (result, retryable?)
+    from requests.exceptions import RequestException  # deferred (see Config.http)
+
+    try:
+        test_result = attempt_test_case(cfg, test_case, timeout)
+    except RequestException as e:
+        return error_result(e), True
+    if test_result.timing is not None and cfg.hedge:
+        cfg.hedge_delays.observe(test_case.api_url, test_result.timing.total_ms)
+    retryable = test_result.status_code >= 500 and test_result.status_code != test_case.expected_code
+    return test_result, retryable
+
+def _hedged_attempt(cfg: Config, test_case: CompiledCase, timeout: float) -> tuple[TestResult, bool, bool]:
+    # ONE attempt, plus a hedge request if the first one is slower than the endpoint's p95
+    # => (result, retryable?, hedged?)
+    delay_s = cfg.hedge_delays.delay_s(test_case.api_url) if cfg.hedge else None
+    if delay_s is None or delay_s >= timeout:
+        return (*_attempt(cfg, test_case, timeout), False)
+
+    pool = cfg.hedge_pool
+    primary = pool.try_submit(_attempt, cfg, test_case, timeout)
+    if primary is None:  # hedge threads all busy (e.g. losers of earlier hedges): no hedge this time
+        return (*_attempt(cfg, test_case, timeout), False)
+    done, _ = wait([primary], timeout=delay_s)
+    if done:
+        return (*primary.result(), False)
+
+    hedge = pool.try_submit(_attempt, cfg, test_case, timeout - delay_s)
+    if hedge is None:
+        return (*primary.result(), False)
+    pending = {primary, hedge}
+    while True:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            test_result, retryable = future.result()
+            # First usable answer wins; the loser finishes in the background (bounded by its timeout)
+            if not retryable or not pending:
+                return test_result, retryable, True
+
+def run_resilient(cfg: Config, test_case: CompiledCase, deadline: Optional[float] = None) -> TestResult:
+    """
+    Runs a test case with retries / hedging / deadline (see module docstring) and returns
+    the FINAL result, annotated with attempts, hedged and the first attempt's outcome.
+    """
+    first: Optional[TestResult] = None
+    test_result = DEADLINE_EXCEEDED
+    attempts = 0
+    hedged = False
+
+    while True:
+        timeout = cfg.timeout
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            timeout = min(timeout, remaining)
+
+        test_result, retryable, attempt_hedged = _hedged_attempt(cfg, test_case, timeout)
+        attempts += 1
+        hedged = hedged or attempt_hedged
+        if first is None:
+            first = test_result
+        if not retryable or attempts > cfg.retries:
+            break
+
+        # Full jitter: random point in [0, capped exponential backoff]
+        backoff_s = random.uniform(0, min(cfg.retry_backoff_max, cfg.retry_backoff * 2 ** (attempts - 1)))
+        if deadline is not None and time.monotonic() + backoff_s >= deadline:
+            break
+        time.sleep(backoff_s)
+
+    return test_result._replace(
+        attempts=attempts,
+        first_attempt=outcome(first if first is not None else test_result),
+        hedged=hedged,
+    )
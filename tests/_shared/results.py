@@ -0,0 +1,50 @@
+# tests/_shared/results.py
+from __future__ import annotations # Keep type hints as strings (lazy evaluation) to avoid forward-ref/circular-import issues.
+
+import datetime
+import json
+from typing import Any
+
+from .config import Config
+from .log_sink import get_log_sink
+from .params import params_dict
+from .types import TestCase, TestResult
+
+def result_record(run_id: str, suite_name: str, test_no: int, test_case: TestCase, test_result: TestResult) -> dict[str, Any]:
+    """
+    Flatten ONE test result into a JSON-serializable record (one JSONL line).
+
+    This is the machine-readable twin of the text block rendered by log_result(...):
+    same test, plus endpoint, params, timings and score as separate fields.
+    """
+    timing = test_result.timing
+    return {
+        "run_id": run_id,
+        "suite": suite_name,
+        "test_no": test_no,
+        "endpoint": test_case.api_url,
+        "params": params_dict(test_case.params),
+        "expected_code": test_case.expected_code,
+        "expected_score": test_case.expected_score,
+        "status_code": test_result.status_code,
+        "test_status": test_result.test_status,
+        "is_success": test_result.is_success,
+        "score": test_result.score,
+        "connect_ms": None if timing is None else round(timing.connect_ms, 3),
+        "ttfb_ms": None if timing is None else round(timing.ttfb_ms, 3),
+        "total_ms": None if timing is None else round(timing.total_ms, 3),
+        "size_bytes": None if timing is None else timing.size_bytes,
+        "attempts": test_result.attempts,
+        "first_attempt": test_result.first_attempt,
+        "hedged": test_result.hedged,
+        "ts": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="milliseconds"),
+    }
+
+def write_result(cfg: Config, suite_name: str, test_no: int, test_case: TestCase, test_result: TestResult) -> None:
+    # Only when RESULTS_PATH is set; shares the buffered + flock-safe sink with the text log.
+    # Shards keep their records in their partial result file instead (merged later, see sharding.py)
+    if not cfg.results_path or cfg.shard_count > 1:
+        return
+    record = result_record(cfg.run_id, suite_name, test_no, test_case, test_result)
+    sink = get_log_sink(cfg.results_path, cfg.log_buffer_bytes, cfg.log_flush_interval)
+    sink.write(json.dumps(record, ensure_ascii=False) + "\n")
@@ -1,42 +1,104 @@
 # tests/_shared/runner.py
 from __future__ import annotations # Keep type hints as strings (lazy evaluation) to avoid forward-ref/circular-import issues.
-import requests
+import json
+from typing import Optional
+
+from . import startup
 from .config import Config
-from .params import  params_dict
-from .types import TestCase, TestResult
+from .plan import Case, CompiledCase, ensure_compiled
+from .traffic import suite_traffic
+from .types import TestResult, Timing
+
+# startup.mark("first request") scans the checkpoint list: fetch calls it only once per process
+_first_request_marked = False
 
-def run_test_case(cfg: Config, test_case: TestCase) -> TestResult:
+def _mark_first_request() -> None:
+    global _first_request_marked
+    _first_request_marked = True
+    startup.mark("first request")
+
+def fetch(cfg: Config, case: CompiledCase, timeout: Optional[float] = None) -> tuple[int, bytes, Timing]:
     """
-    Runs ONE HTTP GET test case against the API and evaluates:
+    Executes ONE GET of a compiled case (pre-encoded URL, see plan.py) and returns
+    (status_code, body, timing) - depending on HTTP_MODE:
 
-    - Request params: uses params_dict(test_case.params) so this stays generic for any TestParams shape.
-    - Always checks the expected HTTP status code.
-    - Optionally checks sentiment (score sign) when test_case.expected_score is set ("positive"/"negative").
+    - live:   request against the API (cfg.http = shared keep-alive connection pool) - with
+              API_TARGETS against the replica the balancer picks (cfg.replicas, see replicas.py)
+    - record: like live, plus the interaction is saved to the cassette
+    - replay: answered from the cassette, no network at all (raises CassetteMiss if unknown)
 
-    Returns a TestResult including status_code, SUCCESS/FAILURE, and (if parsed) the score.
+    timeout=None => cfg.timeout (the resilience layer passes less when the suite deadline is near).
     """
-    try: 
-        # 1) Execute request against the API endpoint for this testcase
-        response = requests.get(
-            url=f"http://{cfg.api_address}:{cfg.api_port}{test_case.api_url}",
-            params=params_dict(test_case.params),
-            timeout=cfg.timeout,
-        )  
-        
+    cassette = cfg.cassette
+    if cfg.http_mode == "replay":
+        recorded = cassette.lookup(case.api_url, case.cassette_query)
+        if not _first_request_marked:
+            _mark_first_request()
+        return recorded.status_code, recorded.body, recorded.timing
+
+    replicas = cfg.replicas
+    traffic = suite_traffic.get()  # the running suite's counters (see traffic.py)
+    if replicas is None and traffic is None:
+        response, timing = cfg.http.timed_get(case.url, timeout=timeout or cfg.timeout)
+    else:
+        replica = None if replicas is None else replicas.acquire()
+        base_url = None if replica is None else replica.base_url
+        try:
+            response, timing = cfg.http.timed_get(
+                case.url if base_url is None else base_url + case.target, timeout=timeout or cfg.timeout
+            )
+        except BaseException as e:
+            if replica is not None:
+                replicas.release(replica, type(e).__name__, None)
+            if traffic is not None:
+                traffic.add(base_url, type(e).__name__, None)
+            raise
+        if replica is not None:
+            replicas.release(replica, str(response.status_code), timing)
+        if traffic is not None:
+            traffic.add(base_url, str(response.status_code), timing)
+    body = response.content
+    if cassette is not None:
+        cassette.record(case.api_url, case.cassette_query, response.status_code, body, timing)
+    if not _first_request_marked:
+        _mark_first_request()
+    return response.status_code, body, timing
+
+def error_result(e: BaseException) -> TestResult:
+    # No (usable) HTTP response: network/HTTP-layer failure, non-JSON body, cassette miss, ...
+    return TestResult(
+        is_success=False,
+        status_code=0, # 0 => no (usable) HTTP response received
+        test_status=f"ERROR: {type(e).__name__}",
+        score=None
+    )
+
+def attempt_test_case(cfg: Config, case: CompiledCase, timeout: Optional[float] = None) -> TestResult:
+    """
+    ONE attempt of a test case: request + evaluation (see run_test_case).
+    Network/HTTP-layer failures are NOT converted here - they raise requests' RequestException,
+    so the resilience layer can tell "retry" apart from "the API answered wrongly".
+    """
+    from .cassette import CassetteMiss  # deferred (see run_test_case)
+
+    try:
+        # 1) Execute request against the API endpoint for this testcase (live, record or replay)
+        status_code, body, timing = fetch(cfg, case, timeout)
+
         # 2) Always validate HTTP status code - compare actual HTTP code vs the one defined in the TestCase
-        status_ok = response.status_code == test_case.expected_code   
-        
+        status_ok = status_code == case.expected_code
+
         # 3) Optional: validate sentiment direction (only for CONTENT testcases)
         # Default is "ok" so non-content suites don't need special handling.
-        score_ok = True      
-        score=None    
-      
+        score_ok = True
+        score=None
+
         # Sentiment/score test? Extract score and compare against expectation
-        if test_case.expected_score is not None:
+        if case.expected_sign is not None:
             # API returns JSON like: {"score": <float>}
-            data = response.json()
-            raw_score = data.get("score", None)         
-            
+            data = json.loads(body)
+            raw_score = data.get("score", None) if isinstance(data, dict) else None
+
             # If score is missing/unparseable, treat as failure (content check can't be evaluated)
             try:
                 score = float(raw_score)
@@ -44,29 +106,68 @@ def run_test_case(cfg: Config, test_case: TestCase) -> TestResult:
                 score_ok = False
             else:
                 # Note: score can be any float (e.g. -0.66, +0.75) — we only check the sign.
-                if test_case.expected_score == "positive":
+                # (Unknown expectation keyword => sign 0 => always fails, see plan.py)
+                if case.expected_sign > 0:
                     score_ok = score > 0
-                elif test_case.expected_score == "negative":
+                elif case.expected_sign < 0:
                     score_ok = score < 0
                 else:
-                    # Unknown expectation keyword => fail loudly (signals a bad testcase definition)
                     score_ok = False
 
         # 4) Overall success is the conjunction of all checks
         is_success = status_ok and score_ok
 
         return TestResult(
-            is_success=is_success, 
-            status_code=response.status_code, 
-            test_status="SUCCESS" if is_success else "FAILURE",    
-            score=score # present for content tests; otherwise None
+            is_success=is_success,
+            status_code=status_code,
+            test_status="SUCCESS" if is_success else "FAILURE",
+            score=score, # present for content tests; otherwise None
+            timing=timing,
         )
-    except requests.exceptions.RequestException as e:
+    except (json.JSONDecodeError, CassetteMiss) as e:
+        # Non-JSON bodies and - in replay mode - requests missing from the cassette
+        return error_result(e)
+
+def _run_test_case(cfg: Config, case: CompiledCase, deadline: Optional[float]) -> TestResult:
+    # Deferred imports (a dict lookup after the first call) - importing the runner stays cheap
+    from requests.exceptions import RequestException
+
+    if cfg.retries > 0 or cfg.hedge or deadline is not None:
+        from .resilience import run_resilient
+        return run_resilient(cfg, case, deadline)
+
+    try:
+        return attempt_test_case(cfg, case)
+    except RequestException as e:
         # Handle Network/HTTP-layer failures (timeout, connection refused, DNS issues, etc.)
-        return TestResult(
-            is_success=False,
-            status_code=0, # 0 => no HTTP response received
-            test_status=f"ERROR: {type(e).__name__}",
-            score=None
-        )    
+        return error_result(e)
+
+def run_test_case(cfg: Config, test_case: Case, deadline: Optional[float] = None) -> TestResult:
+    """
+    Runs ONE HTTP GET test case against the API and evaluates:
+
+    - Request: a CompiledCase is sent as is (pre-encoded URL, see plan.py); a plain TestCase
+      is compiled first, so this stays generic for any TestParams shape.
+    - Always checks the expected HTTP status code.
+    - Optionally checks sentiment (score sign) when test_case.expected_score is set ("positive"/"negative").
+
+    Returns a TestResult including status_code, SUCCESS/FAILURE, the request timing
+    breakdown and (if parsed) the score.
+
+    With RETRIES / HEDGE / a suite deadline (time.monotonic() value) configured, the attempt
+    runs through the resilience layer instead (see resilience.py).
+    With METRICS_PORT set, every case is counted live (in flight, status, latency, retries - see metrics.py).
+    """
+    case = ensure_compiled(cfg, test_case)
+    metrics = cfg.metrics
+    if metrics is None:
+        return _run_test_case(cfg, case, deadline)
 
+    metrics.request_started()
+    try:
+        test_result = _run_test_case(cfg, case, deadline)
+    except BaseException as e:
+        metrics.request_finished(case, error_result(e))  # keeps the in-flight gauge right
+        raise
+    metrics.request_finished(case, test_result)
+    return test_result
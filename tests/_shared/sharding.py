@@ -0,0 +1,223 @@
+# tests/_shared/sharding.py
+"""
+Deterministic test-case sharding + merged reports
+-------------------------------------------------
+Spreads ONE suite (built-in cases or a streamed corpus) over several processes,
+containers or machines - and still yields one report.
+
+Partitioning (SHARD_INDEX / SHARD_COUNT):
+- Every shard walks the SAME case stream and numbers it globally (test no. 1, 2, 3, ...).
+- A case belongs to shard `hash(endpoint + sorted params) % SHARD_COUNT` - stable across
+  processes, hosts and Python versions (blake2b, not the salted built-in hash()), and
+  independent of the case's position: inserting a case doesn't move the others.
+
+Partial results:
+- Each shard writes its results to SHARD_DIR/<RUN_ID>/<suite>.<index>-of-<count>.jsonl
+  (a header record, one record per result - see results.py - and an end record).
+  The file is published atomically when the shard finishes, so a crashed shard leaves
+  no (half) file behind and is reported as missing.
+- Sharded runs print their own results to stdout, but leave the shared log (LOG=1)
+  and RESULTS_PATH to the merge step - otherwise every result would be written twice.
+
+Merge:
+- k-way merges the shards' files by test no. (streaming - one record per shard in memory),
+  re-renders every result with log_result(...) and the suite summary with
+  log_suite_finished(...) => the same log an unsharded run produces.
+- Exits 0 only if every shard of every suite is present, complete and successful.
+
+Usage:
+    SHARD_INDEX=0 SHARD_COUNT=4 RUN_ID=r1 python3 -m tests.content.test_content   # ... one per shard
+    RUN_ID=r1 LOG=1 python3 -m tests._shared.sharding merge
+"""
+from __future__ import annotations # Keep type hints as strings (lazy evaluation) to avoid forward-ref/circular-import issues.
+
+import argparse
+import dataclasses
+import hashlib
+import heapq
+import json
+import os
+import re
+from typing import IO, Any, Iterable, Iterator, Optional
+
+from .config import Config, load_config
+from .logging import emit, ensure_log_dir, log_result, log_suite_finished, log_suite_start
+from .params import canonical_query
+from .results import result_record
+from .stats import AttemptOutcomes, EndpointLatencies
+from .types import TestCase, TestResult, Timing
+
+# <suite>.<index>-of-<count>.jsonl (suite = TEST_TYPE, lower case, spaces => "_")
+PARTIAL_FILE_RE = re.compile(r"^(?P<suite>.+)\.(?P<index>\d+)-of-(?P<count>\d+)\.jsonl$")
+
+def shard_of(test_case: TestCase, shard_count: int) -> int:
+    # Stable shard of a case: hash of endpoint + sorted query params
+    digest = hashlib.blake2b(f"{test_case.api_url}?{canonical_query(test_case.params)}".encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % shard_count
+
+def shard_cases(
+    numbered_cases: Iterable[tuple[int, TestCase]], shard_index: int, shard_count: int
+) -> Iterator[tuple[int, TestCase]]:
+    """Keep only this shard's cases - with their GLOBAL test numbers (lazy, streaming)."""
+    for test_no, test_case in numbered_cases:
+        if shard_of(test_case, shard_count) == shard_index:
+            yield test_no, test_case
+
+def partial_dir(cfg: Config, run_id: Optional[str] = None) -> str:
+    return os.path.join(cfg.shard_dir, run_id or cfg.run_id)
+
+def partial_path(cfg: Config, suite_name: str) -> str:
+    suite_slug = suite_name.lower().replace(" ", "_")
+    return os.path.join(partial_dir(cfg), f"{suite_slug}.{cfg.shard_index}-of-{cfg.shard_count}.jsonl")
+
+class PartialResults:
+    """
+    Writer for ONE shard's partial result file. Records go to a temp file which is
+    renamed into place by finish(...) - until then, the shard counts as missing.
+    """
+
+    def __init__(self, cfg: Config, suite_name: str) -> None:
+        self.cfg = cfg
+        self.suite_name = suite_name
+        self.path = partial_path(cfg, suite_name)
+        self.cases = 0
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        self._file: IO[str] = open(self._tmp_path, "w", encoding="utf-8")
+        self._write({
+            "type": "shard",
+            "suite": suite_name,
+            "run_id": cfg.run_id,
+            "shard_index": cfg.shard_index,
+            "shard_count": cfg.shard_count,
+        })
+
+    def _write(self, record: dict[str, Any]) -> None:
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def add(self, test_no: int, test_case: TestCase, test_result: TestResult) -> None:
+        self._write({"type": "result", **result_record(self.cfg.run_id, self.suite_name, test_no, test_case, test_result)})
+        self.cases += 1
+
+    def finish(self, success: bool, aborted: bool = False) -> None:
+        self._write({"type": "end", "success": success, "aborted": aborted, "cases": self.cases})
+        self._file.close()
+        os.replace(self._tmp_path, self.path)  # atomic: the merge never sees half a shard
+
+# ------------------------------------------------------------------------------
+# Merge
+# ------------------------------------------------------------------------------
+class ShardFile:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(path, "rb") as f:
+            self.header = json.loads(f.readline())
+            # The end record is the last line; read it without loading the results
+            f.seek(max(0, os.path.getsize(path) - 4096))
+            self.end = json.loads(f.read().splitlines()[-1])
+        if self.header.get("type") != "shard" or self.end.get("type") != "end":
+            raise ValueError(f"{path}: not a complete shard result file")
+
+    def results(self) -> Iterator[dict[str, Any]]:
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                record = json.loads(line)
+                if record["type"] == "result":
+                    yield record
+
+def _record_to_result(record: dict[str, Any]) -> tuple[TestCase, TestResult]:
+    test_case = TestCase(
+        api_url=record["endpoint"],
+        params=record["params"],
+        expected_code=record["expected_code"],
+        expected_score=record["expected_score"],
+    )
+    timing = None
+    if record["total_ms"] is not None:
+        timing = Timing(record["connect_ms"], record["ttfb_ms"], record["total_ms"], record["size_bytes"])
+    test_result = TestResult(
+        is_success=record["is_success"],
+        status_code=record["status_code"],
+        test_status=record["test_status"],
+        score=record["score"],
+        timing=timing,
+        attempts=record.get("attempts", 1),
+        first_attempt=record.get("first_attempt"),
+        hedged=record.get("hedged", False),
+    )
+    return test_case, test_result
+
+def _load_shard_files(directory: str) -> dict[str, list[ShardFile]]:
+    # suite (TEST_TYPE) => its shard files, by shard index
+    by_suite: dict[str, list[ShardFile]] = {}
+    for name in sorted(os.listdir(directory)):
+        if PARTIAL_FILE_RE.match(name):
+            shard = ShardFile(os.path.join(directory, name))
+            by_suite.setdefault(shard.header["suite"], []).append(shard)
+    for shards in by_suite.values():
+        shards.sort(key=lambda shard: shard.header["shard_index"])
+    return by_suite
+
+def merge_suite(cfg: Config, suite_name: str, shards: list[ShardFile]) -> bool:
+    """Re-render ONE suite from its shard files (ordered by test no.); True on full success."""
+    shard_count = shards[0].header["shard_count"]
+    present = {shard.header["shard_index"] for shard in shards}
+    problems = [f"shard {i + 1}/{shard_count} missing (not run or crashed)" for i in range(shard_count) if i not in present]
+    problems += [
+        f"shard {shard.header['shard_index'] + 1}/{shard_count} aborted (API not ready)"
+        for shard in shards if shard.end["aborted"]
+    ]
+    if any(shard.header["shard_count"] != shard_count for shard in shards):
+        problems.append("shards were run with different SHARD_COUNT values")
+
+    log_suite_start(cfg, suite_name, sum(shard.end["cases"] for shard in shards))
+
+    latencies = EndpointLatencies()
+    outcomes = AttemptOutcomes()
+    all_assertions_met = not problems
+    merged = heapq.merge(*(shard.results() for shard in shards), key=lambda record: record["test_no"])
+    for record in merged:
+        test_case, test_result = _record_to_result(record)
+        log_result(cfg, suite_name, record["test_no"], test_case, test_result)
+        latencies.add(test_case, test_result)
+        outcomes.add(test_result)
+        all_assertions_met = all_assertions_met and test_result.is_success
+
+    if problems:
+        emit(cfg, "\n".join(f">>> {suite_name}: {problem}" for problem in problems))
+    log_suite_finished(cfg, suite_name, all_assertions_met, latencies, outcomes)
+    return all_assertions_met
+
+def merge(cfg: Config, run_id: str) -> bool:
+    # Suites are reported alphabetically (= the pipeline's declaration order for the built-in suites)
+    directory = partial_dir(cfg, run_id)
+    if not os.path.isdir(directory):
+        print(f"# No shard results for run {run_id} in {directory}")
+        return False
+    by_suite = _load_shard_files(directory)
+    if not by_suite:
+        print(f"# No shard results for run {run_id} in {directory}")
+        return False
+    results = [merge_suite(cfg, suite_name, shards) for suite_name, shards in sorted(by_suite.items())]
+    return all(results)
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Merge sharded suite results into one report.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_merge = sub.add_parser("merge", help="merge all shard results of a run (exit 1 unless all passed)")
+    p_merge.add_argument("--run", default=os.environ.get("RUN_ID"), help="run id the shards were started with")
+    args = parser.parse_args(argv)
+
+    if not args.run:
+        parser.error("--run (or RUN_ID) is required: shards of one run share its RUN_ID")
+
+    # The merge step writes the shared log + RESULTS_PATH (as a single unsharded run would) -
+    # under the merged run's id, whatever RUN_ID the environment has
+    cfg = dataclasses.replace(load_config(), run_id=args.run)
+    if cfg.shard_count > 1:
+        parser.error("run the merge step without SHARD_COUNT (it reads all shards)")
+    ensure_log_dir(cfg)
+    return 0 if merge(cfg, args.run) else 1
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,420 @@
+# tests/_shared/soak.py
+"""
+Long-running soak mode
+----------------------
+Replays the suites' test cases (CORPUS_PATH: their corpus records) in a loop at a steady (open-loop) rate for hours and watches
+the API degrade over time - slow leaks, growing queues or state that only breaks after
+sustained traffic, which single-pass suites never reach.
+
+Every --window seconds, one line with rolling statistics for that window (throughput,
+error rate, latency percentiles, statuses) plus alerts:
+
+- p99 drift:      window p99 > baseline p99 * (1 + P99_DRIFT_RATIO), DRIFT_CONSECUTIVE windows
+                  in a row (one GC pause is not drift); the p99 trend (ms/hour) over the
+                  last TREND_WINDOWS windows is reported alongside
+- error rate:     window error rate > baseline rate + ERROR_RATE_INCREASE, same persistence rule
+- status flips:   a test case that was answered with its expected code now gets a different
+                  non-5xx one (e.g. an authorization 403 turning into 200 under load) - alerted
+                  at once; flips into 5xx are reported per window and count as errors
+- no responses:   a window without a single completed request
+
+Baseline = the BASELINE_WINDOWS windows after the first (warm-up) window.
+
+Memory stays constant however long it runs: latencies go into fixed-size histograms
+(see histogram.py), per-case state is one int per test case, trend/alert history is
+bounded, and requests in flight are capped (--max-in-flight) - when the API stalls, the
+scheduler waits instead of queueing unboundedly (reported as scheduler lag).
+
+Stops after --duration seconds (0 => until Ctrl-C / SIGTERM, then prints the summary).
+Exit code 1 if any alert was raised.
+
+Usage:
+    API_ADDRESS=localhost API_PORT=8000 \
+    python3 -m tests._shared.soak --suite all --rps 20 --duration 14400 [--window 60]
+"""
+from __future__ import annotations # Keep type hints as strings (lazy evaluation) to avoid forward-ref/circular-import issues.
+
+import argparse
+import asyncio
+import contextlib
+import math
+import resource
+import signal
+import time
+from array import array
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator, NamedTuple, Optional
+
+from .config import Config, load_config, open_loop_config
+from .histogram import LatencyHistogram
+from .logging import ensure_log_dir, log_api_not_ready, log_soak_report, log_soak_start, log_soak_window
+from .plan import CompiledCase, compile_plan
+from .profiling import profiling
+from .readiness import wait_for_api
+from .runner import run_test_case
+from .stats import LatencySummary
+from .suites import SUITE_MODULES, replay_cases
+from .types import TestCase, TestResult
+
+DEFAULT_WINDOW_S = 60.0
+DEFAULT_MAX_IN_FLIGHT = 64
+# The first window (connection set-up, API warm-up) never counts towards the baseline ...
+WARMUP_WINDOWS = 1
+# ... the next BASELINE_WINDOWS windows do
+BASELINE_WINDOWS = 3
+# Drift/error alerts need the condition in this many consecutive windows
+DRIFT_CONSECUTIVE = 2
+P99_DRIFT_RATIO = 0.5
+ERROR_RATE_INCREASE = 0.01
+# Windows kept for the p99 trend - and alerts kept for the final report (bounded memory)
+TREND_WINDOWS = 30
+MAX_REPORTED_ALERTS = 50
+
+class SoakWindow(NamedTuple):
+    index: int                        # 1-based
+    end_s: float                      # seconds since the soak started
+    baseline: bool                    # part of the warm-up/baseline phase (no drift alerts yet)
+    completed: int
+    throughput_rps: float
+    error_rate: float                 # expectations not met / completed
+    latency: LatencySummary
+    status_counts: dict[str, int]
+    flips: dict[str, int]             # "endpoint from->to" => count
+    p99_trend_ms_per_h: Optional[float]
+    max_lag_ms: float                 # how far the scheduler fell behind its plan in this window
+    max_rss_mb: float                 # peak RSS of this process so far (should stay flat)
+    alerts: list[str]
+
+class SoakReport(NamedTuple):
+    suite_names: list[str]
+    target_rps: float
+    elapsed_s: float
+    windows: int
+    sent: int
+    completed: int
+    failed: int
+    latency: LatencySummary
+    alert_windows: int
+    alerts: list[str]                 # the last MAX_REPORTED_ALERTS alerts, "[window] text"
+
+def _status_key(test_result: TestResult) -> str:
+    return str(test_result.status_code) if test_result.status_code else test_result.test_status
+
+def _max_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def _slope_per_hour(points: list[tuple[float, float]]) -> Optional[float]:
+    # Least-squares slope of (seconds, value) points, scaled to value per hour
+    points = [(x, y) for x, y in points if not math.isnan(y)]
+    if len(points) < 3:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    var_x = sum((x - mean_x) ** 2 for x, _ in points)
+    if var_x == 0:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / var_x * 3600
+
+class _WindowCounts:
+    def __init__(self) -> None:
+        self.latency = LatencyHistogram()
+        self.completed = 0
+        self.failed = 0
+        self.status_counts: Counter[str] = Counter()
+        self.flips: Counter[str] = Counter()
+        self.broken_flips: Counter[str] = Counter()  # away from the expected code (non-5xx)
+        self.max_lag_s = 0.0
+
+    def merge(self, other: _WindowCounts) -> None:
+        self.latency.merge(other.latency)
+        self.completed += other.completed
+        self.failed += other.failed
+
+    @property
+    def error_rate(self) -> float:
+        return self.failed / self.completed if self.completed else 0.0
+
+class SoakMonitor:
+    """
+    Rolling-window statistics + drift/error/flip detection for a soak run.
+    Fed from the event loop thread only (add/lag/close_window) - no locking needed.
+    """
+
+    def __init__(self, cases: list[CompiledCase], baseline_windows: int = BASELINE_WINDOWS) -> None:
+        self.cases = cases
+        self.baseline_windows = baseline_windows
+        self._last_status = array("i", [-1]) * len(cases)  # last HTTP status per test case
+        self._window = _WindowCounts()
+        self._window_start_s = 0.0
+        self._baseline = _WindowCounts()
+        self._total = _WindowCounts()
+        self._p99_history: deque[tuple[float, float]] = deque(maxlen=TREND_WINDOWS)
+        self._p99_strikes = 0
+        self._error_strikes = 0
+        self.windows = 0
+        self.sent = 0
+        self.alert_windows = 0
+        self.alerts: deque[str] = deque(maxlen=MAX_REPORTED_ALERTS)
+
+    def lag(self, lag_s: float) -> None:
+        self._window.max_lag_s = max(self._window.max_lag_s, lag_s)
+
+    def add(self, case_index: int, elapsed_ms: float, test_result: TestResult) -> None:
+        window = self._window
+        window.latency.record(elapsed_ms)
+        window.completed += 1
+        window.status_counts[_status_key(test_result)] += 1
+        if not test_result.is_success:
+            window.failed += 1
+
+        # Status flips: only between real HTTP answers (network errors show up in the error rate)
+        status = test_result.status_code
+        if not status:
+            return
+        previous = self._last_status[case_index]
+        self._last_status[case_index] = status
+        if previous not in (-1, status):
+            test_case = self.cases[case_index]
+            flip = f"{test_case.api_url} {previous}->{status}"
+            window.flips[flip] += 1
+            # 5xx are an error-rate matter (persistence rule); a different non-5xx answer is not
+            if previous == test_case.expected_code and status < 500:
+                window.broken_flips[flip] += 1
+
+    def close_window(self, end_s: float) -> SoakWindow:
+        window, self._window = self._window, _WindowCounts()
+        span_s = end_s - self._window_start_s
+        self._window_start_s = end_s
+        self.windows += 1
+        self._total.merge(window)
+
+        latency = window.latency.summary()
+        self._p99_history.append((end_s, latency.p99_ms))
+        in_baseline = self.windows <= WARMUP_WINDOWS + self.baseline_windows
+        alerts: list[str] = []
+
+        if in_baseline:
+            if self.windows > WARMUP_WINDOWS:
+                self._baseline.merge(window)
+        else:
+            baseline_p99 = self._baseline.latency.summary().p99_ms
+            drifted = baseline_p99 > 0 and latency.p99_ms > baseline_p99 * (1 + P99_DRIFT_RATIO)
+            self._p99_strikes = self._p99_strikes + 1 if drifted else 0
+            if self._p99_strikes >= DRIFT_CONSECUTIVE:
+                alerts.append(
+                    f"p99 drift: {latency.p99_ms:.1f}ms vs baseline {baseline_p99:.1f}ms "
+                    f"(+{latency.p99_ms / baseline_p99 - 1:.0%}, {self._p99_strikes} windows)"
+                )
+            baseline_rate = self._baseline.error_rate
+            erroring = window.completed > 0 and window.error_rate > baseline_rate + ERROR_RATE_INCREASE
+            self._error_strikes = self._error_strikes + 1 if erroring else 0
+            if self._error_strikes >= DRIFT_CONSECUTIVE:
+                alerts.append(
+                    f"error rate: {window.error_rate:.2%} vs baseline {baseline_rate:.2%} "
+                    f"({self._error_strikes} windows)"
+                )
+
+        # Flips away from the expected code and silent windows are alerted at once (also while warming up)
+        alerts.extend(f"status flip: {flip} x{n}" for flip, n in sorted(window.broken_flips.items()))
+        if window.completed == 0:
+            alerts.append("no completed requests")
+
+        if alerts:
+            self.alert_windows += 1
+            self.alerts.extend(f"[window {self.windows}] {alert}" for alert in alerts)
+
+        return SoakWindow(
+            index=self.windows,
+            end_s=end_s,
+            baseline=in_baseline,
+            completed=window.completed,
+            throughput_rps=window.completed / span_s if span_s > 0 else 0.0,
+            error_rate=window.error_rate,
+            latency=latency,
+            status_counts=dict(window.status_counts),
+            flips=dict(window.flips),
+            p99_trend_ms_per_h=_slope_per_hour(list(self._p99_history)),
+            max_lag_ms=window.max_lag_s * 1000,
+            max_rss_mb=_max_rss_mb(),
+            alerts=alerts,
+        )
+
+    def has_open_window(self) -> bool:
+        return self._window.completed > 0
+
+    def report(self, suite_names: list[str], target_rps: float, elapsed_s: float) -> SoakReport:
+        return SoakReport(
+            suite_names=suite_names,
+            target_rps=target_rps,
+            elapsed_s=elapsed_s,
+            windows=self.windows,
+            sent=self.sent,
+            completed=self._total.completed,
+            failed=self._total.failed,
+            latency=self._total.latency.summary(),
+            alert_windows=self.alert_windows,
+            alerts=list(self.alerts),
+        )
+
+@contextlib.contextmanager
+def _stop_on_signals(loop: asyncio.AbstractEventLoop, callback: Callable[[], None]) -> Iterator[None]:
+    # SIGINT/SIGTERM => callback (graceful stop) while the soak runs; afterwards the previous
+    # handlers are back - remove_signal_handler alone resets them to the default, which would
+    # drop e.g. the log sink's flush-on-SIGTERM handler (log_sink.py)
+    installed = {}
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        previous = signal.getsignal(sig)
+        try:
+            loop.add_signal_handler(sig, callback)
+        except (NotImplementedError, RuntimeError):  # not supported here (e.g. not the main thread)
+            continue
+        installed[sig] = previous
+    try:
+        yield
+    finally:
+        for sig, previous in installed.items():
+            loop.remove_signal_handler(sig)
+            if previous is not None:  # None => installed outside Python, can't be reinstated
+                signal.signal(sig, previous)
+
+async def _run_soak_async(
+    cfg: Config,
+    monitor: SoakMonitor,
+    rps: float,
+    duration_s: float,
+    window_s: float,
+    max_in_flight: int,
+    on_window: Callable[[SoakWindow], None],
+) -> float:
+    # Returns the elapsed time; stops after duration_s (0 => until SIGINT/SIGTERM)
+    loop = asyncio.get_running_loop()
+    stopping = False
+
+    def _stop() -> None:
+        nonlocal stopping
+        stopping = True
+
+    with _stop_on_signals(loop, _stop):
+        cases = monitor.cases
+        interval = 1.0 / rps
+        slots = asyncio.Semaphore(max_in_flight)
+        in_flight: set[asyncio.Task[None]] = set()
+
+        with ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="soak") as pool:
+            start = time.perf_counter()
+
+            async def _send(case_index: int, scheduled_at: float) -> None:
+                try:
+                    test_result = await loop.run_in_executor(pool, run_test_case, cfg, cases[case_index])
+                    monitor.add(case_index, (time.perf_counter() - scheduled_at) * 1000, test_result)
+                finally:
+                    slots.release()
+
+            async def _report_windows() -> None:
+                n = 1
+                while True:
+                    await asyncio.sleep(max(0.0, start + n * window_s - time.perf_counter()))
+                    on_window(monitor.close_window(n * window_s))
+                    n += 1
+
+            reporter = asyncio.create_task(_report_windows())
+            i = 0
+            while not stopping and (duration_s <= 0 or i * interval < duration_s):
+                scheduled_at = start + i * interval
+                delay = scheduled_at - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                    if stopping:
+                        break
+                # Bounded in-flight requests => constant memory; a stalled API shows up as lag
+                await slots.acquire()
+                monitor.lag(time.perf_counter() - scheduled_at)
+
+                task = asyncio.create_task(_send(i % len(cases), scheduled_at))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+                monitor.sent += 1
+                i += 1
+
+            # Drain (each request is bounded by cfg.timeout), then report the last, partial window
+            if in_flight:
+                await asyncio.gather(*in_flight)
+            reporter.cancel()
+            elapsed_s = time.perf_counter() - start
+            if monitor.has_open_window():
+                on_window(monitor.close_window(elapsed_s))
+
+        return elapsed_s
+
+def run_soak(
+    cfg: Config,
+    suite_names: list[str],
+    test_cases: list[TestCase],
+    rps: float,
+    duration_s: float,
+    window_s: float = DEFAULT_WINDOW_S,
+    max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+    baseline_windows: int = BASELINE_WINDOWS,
+    on_window: Optional[Callable[[SoakWindow], None]] = None,
+) -> SoakReport:
+    """
+    Sends the test cases round-robin at `rps` for `duration_s` seconds (0 => until interrupted),
+    passing one SoakWindow every `window_s` seconds to on_window (default: log it), and returns
+    the overall SoakReport.
+    """
+    if rps <= 0 or window_s <= 0 or duration_s < 0:
+        raise ValueError("rps and window must be > 0, duration >= 0")
+    if not test_cases:
+        raise ValueError("No test cases to soak")
+    # Pool sized for max_in_flight (like load mode): queueing for a connection is not API latency
+    soak_cfg = open_loop_config(cfg, max_in_flight)
+    # Compiled once, resent for hours (see plan.py)
+    monitor = SoakMonitor(compile_plan(soak_cfg, test_cases), baseline_windows)
+    elapsed_s = asyncio.run(
+        _run_soak_async(
+            soak_cfg, monitor, rps, duration_s, window_s, max_in_flight,
+            on_window or (lambda window: log_soak_window(cfg, window)),
+        )
+    )
+    return monitor.report(suite_names, rps, elapsed_s)
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Long-running soak: steady load with drift/error/flip detection.")
+    parser.add_argument("--suite", action="append", choices=[*sorted(SUITE_MODULES), "all"], help="repeatable (default: all)")
+    parser.add_argument("--rps", type=float, required=True, help="target requests per second")
+    parser.add_argument("--duration", type=float, default=0, help="seconds (0 => until Ctrl-C / SIGTERM)")
+    parser.add_argument("--window", type=float, default=DEFAULT_WINDOW_S, help="rolling window length in seconds")
+    parser.add_argument("--baseline-windows", type=int, default=BASELINE_WINDOWS, help="windows after warm-up forming the baseline")
+    parser.add_argument("--max-in-flight", type=int, default=DEFAULT_MAX_IN_FLIGHT)
+    args = parser.parse_args(argv)
+
+    suite_names = sorted(SUITE_MODULES) if not args.suite or "all" in args.suite else list(dict.fromkeys(args.suite))
+
+    cfg = load_config()
+    ensure_log_dir(cfg)
+    # Built-in cases - or each suite's CORPUS_PATH records (see suites.replay_cases)
+    test_cases = [tc for name in suite_names for tc in replay_cases(cfg, name)]
+    title = "SOAK " + "+".join(name.upper() for name in suite_names)
+    log_soak_start(cfg, title, len(test_cases), args.rps, args.duration, args.window)
+    if not wait_for_api(cfg):
+        log_api_not_ready(cfg, title)
+        return 1
+
+    with profiling(cfg, "soak"):
+        report = run_soak(
+            cfg,
+            suite_names,
+            test_cases,
+            rps=args.rps,
+            duration_s=args.duration,
+            window_s=args.window,
+            max_in_flight=args.max_in_flight,
+            baseline_windows=args.baseline_windows,
+        )
+    log_soak_report(cfg, title, report)
+    return 1 if report.alert_windows else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,67 @@
+# tests/_shared/startup.py
+"""
+Startup-time profile of an entry point (container cold start)
+--------------------------------------------------------------
+Splits the time from process start until the first test response into phases, so it is
+visible where a suite container spends its start-up:
+
+- interpreter:   process start -> first harness import (Python boot, site, stdlib)
+- imports:       -> the entry point's main() is called (module imports)
+- http client:   -> shared HTTP client created (config + deferred `requests` import)
+- readiness:     -> readiness gate passed (GET /status polling)
+- first request: -> first test response received (incl. deferred asyncio import)
+
+Checkpoints are recorded once per process (the first call wins), in whatever order
+they happen. Entry points import this module FIRST, so its import time marks the end of
+interpreter start-up. The process start time is read from /proc (Linux only; clock-tick
+resolution, typically 10ms) - elsewhere the interpreter phase is reported as n/a.
+
+Enabled with STARTUP_PROFILE=1 (see logging.log_startup_profile).
+"""
+from __future__ import annotations # Keep type hints as strings (lazy evaluation) to avoid forward-ref/circular-import issues.
+
+import os
+import threading
+import time
+from typing import NamedTuple, Optional
+
+class Phase(NamedTuple):
+    name: str
+    duration_ms: Optional[float]  # None => not measurable on this platform
+
+def _process_start() -> Optional[float]:
+    # Process start as a perf_counter() value: age of the process (from /proc) subtracted from now
+    try:
+        with open("/proc/self/stat", encoding="ascii") as f:
+            stat = f.read()
+        # Fields after the ")" of the command name start with field 3 (state); field 22 = starttime
+        start_ticks = int(stat.rpartition(")")[2].split()[19])
+        age_s = time.clock_gettime(time.CLOCK_BOOTTIME) - start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+    return time.perf_counter() - max(0.0, age_s)
+
+_process_started = _process_start()
+_checkpoints: list[tuple[str, float]] = [("interpreter", time.perf_counter())]
+_lock = threading.Lock()
+
+def mark(name: str) -> None:
+    """Record checkpoint `name` (end of that phase) - only its first occurrence counts."""
+    # No-op once recorded (hot paths guard the call themselves, see runner.fetch)
+    if any(recorded == name for recorded, _ in _checkpoints):
+        return
+    now = time.perf_counter()
+    with _lock:
+        if not any(recorded == name for recorded, _ in _checkpoints):
+            _checkpoints.append((name, now))
+
+def phases() -> list[Phase]:
+    """Phase durations between consecutive checkpoints (the first one starts at process start)."""
+    with _lock:
+        checkpoints = sorted(_checkpoints, key=lambda checkpoint: checkpoint[1])
+    result = []
+    previous = _process_started
+    for name, at in checkpoints:
+        result.append(Phase(name, None if previous is None else (at - previous) * 1000))
+        previous = at
+    return result
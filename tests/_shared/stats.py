@@ -0,0 +1,100 @@
+# tests/_shared/stats.py
+from __future__ import annotations # Keep type hints as strings (lazy evaluation) to avoid forward-ref/circular-import issues.
+
+import math
+from typing import TYPE_CHECKING, Iterable, NamedTuple, Sequence
+
+from .types import TestCase, TestResult
+
+if TYPE_CHECKING:
+    from .histogram import LatencyHistogram
+
+class LatencySummary(NamedTuple):
+    count: int
+    mean_ms: float
+    p50_ms: float
+    p90_ms: float
+    p99_ms: float
+    max_ms: float
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """
+    Nearest-rank percentile (q in 0..100) of an already SORTED sequence.
+
+    Nearest-rank always returns an observed value (no interpolation), which is what
+    latency reports usually mean by "p99 = 120 ms".
+    """
+    if not sorted_values:
+        return math.nan
+    rank = math.ceil(q / 100 * len(sorted_values))
+    return sorted_values[min(len(sorted_values), max(1, rank)) - 1]
+
+def summarize(latencies_ms: Iterable[float]) -> LatencySummary:
+    values = sorted(latencies_ms)
+    if not values:
+        return LatencySummary(0, math.nan, math.nan, math.nan, math.nan, math.nan)
+    return LatencySummary(
+        count=len(values),
+        mean_ms=sum(values) / len(values),
+        p50_ms=percentile(values, 50),
+        p90_ms=percentile(values, 90),
+        p99_ms=percentile(values, 99),
+        max_ms=values[-1],
+    )
+
+def format_summary(summary: LatencySummary) -> str:
+    # One compact line, stable column order for easy scanning/grepping
+    return (
+        f"n={summary.count} mean={summary.mean_ms:.1f}ms p50={summary.p50_ms:.1f}ms "
+        f"p90={summary.p90_ms:.1f}ms p99={summary.p99_ms:.1f}ms max={summary.max_ms:.1f}ms"
+    )
+
+class EndpointLatencies:
+    """
+    Collects total request latency per endpoint (api_url) during a functional suite run,
+    so every run also yields a latency baseline (/v1/sentiment and /v2/sentiment stay separate).
+
+    One fixed-size LatencyHistogram per endpoint (histogram.py): memory doesn't grow with the
+    number of cases (streamed corpora, the shard merge); percentiles are bucket midpoints.
+    """
+
+    def __init__(self) -> None:
+        self._by_endpoint: dict[str, LatencyHistogram] = {}
+
+    def add(self, test_case: TestCase, test_result: TestResult) -> None:
+        # Results without an HTTP response (timeouts, refused, ...) carry no timing
+        if test_result.timing is None:
+            return
+        histogram = self._by_endpoint.get(test_case.api_url)
+        if histogram is None:
+            from .histogram import LatencyHistogram  # deferred: histogram.py imports this module
+
+            histogram = self._by_endpoint[test_case.api_url] = LatencyHistogram()
+        histogram.record(test_result.timing.total_ms)
+
+    def summaries(self) -> dict[str, LatencySummary]:
+        return {endpoint: histogram.summary() for endpoint, histogram in sorted(self._by_endpoint.items())}
+
+class AttemptOutcomes:
+    """
+    First-attempt vs. final outcomes of a suite run (only for results of the resilience layer,
+    see resilience.py): "passed after a retry" means slow/flaky, "failed finally" means broken.
+    """
+
+    def __init__(self) -> None:
+        self.total = 0
+        self.first_passed = 0
+        self.final_passed = 0
+        self.retried = 0
+        self.hedged = 0
+        self.deadline_exceeded = 0
+
+    def add(self, test_result: TestResult) -> None:
+        if test_result.first_attempt is None:  # resilience layer disabled
+            return
+        self.total += 1
+        self.first_passed += test_result.first_attempt.startswith("SUCCESS")
+        self.final_passed += test_result.is_success
+        self.retried += test_result.attempts > 1
+        self.hedged += test_result.hedged
+        self.deadline_exceeded += test_result.attempts == 0
@@ -0,0 +1,122 @@
+# tests/_shared/suite_runner.py
+from __future__ import annotations # Keep type hints as strings (lazy evaluation) to avoid forward-ref/circular-import issues.
+
+import time
+from collections.abc import Iterator, Sized
+from typing import Iterable, Optional
+
+from .async_runner import run_numbered_test_cases
+from .config import Config
+from .logging import (
+    log_api_not_ready, log_fail_fast, log_incremental_plan, log_result, log_suite_finished, log_suite_start,
+)
+from .readiness import wait_for_api
+from .sharding import PartialResults, shard_cases
+from .stats import AttemptOutcomes, EndpointLatencies
+from .traffic import count_traffic
+from .types import TestCase, TestResult
+
+class _NumberedCases:
+    # (test_no, test_case) pairs - a fresh pass over `test_cases` per iter(), so a re-iterable
+    # source (list, corpus file) stays re-iterable for the incremental plan (see case_cache.py)
+    def __init__(self, cfg: Config, test_cases: Iterable[TestCase]) -> None:
+        self.cfg = cfg
+        self.test_cases = test_cases
+
+    def __iter__(self) -> Iterator[tuple[int, TestCase]]:
+        numbered = enumerate(self.test_cases, start=1)
+        if self.cfg.shard_count > 1:
+            return shard_cases(numbered, self.cfg.shard_index, self.cfg.shard_count)
+        return numbered
+
+def run_suite(
+    cfg: Config,
+    suite_name: str,
+    test_cases: Iterable[TestCase],
+    check_readiness: bool = True,
+) -> bool:
+    """
+    Runs ONE suite end-to-end and returns True only if every test case passed:
+    - prints the suite header
+    - ensures the API is ready (readiness gate) - unless the caller already did
+      (e.g. the pipeline orchestrator checks readiness ONCE for all suites)
+    - executes all test cases (concurrently, reported in test-number order);
+      `test_cases` may be a generator (streamed corpus) - it is consumed lazily
+    - prints the suite summary (status + per-endpoint latency percentiles
+      + first-attempt vs. final outcomes when retries/hedging/a deadline are enabled)
+
+    With SHARD_COUNT > 1, only this shard's cases run (keeping their global test numbers)
+    and the results also go to the shard's partial result file (see sharding.py).
+
+    INCREMENTAL=1: cases that passed against the same API build are skipped, previously
+    failed ones run first (see case_cache.py). FAIL_FAST=1: stop at the first failure.
+    """
+    numbered_cases: Iterable[tuple[int, TestCase]] = _NumberedCases(cfg, test_cases)
+    if isinstance(test_cases, Iterator):  # one-shot source (e.g. a generator): one pass only
+        numbered_cases = iter(numbered_cases)
+    num_cases = len(test_cases) if isinstance(test_cases, Sized) else None
+    title = suite_name
+    partial: Optional[PartialResults] = None
+    if cfg.shard_count > 1:
+        if num_cases is not None:  # built-in cases: cheap to count this shard's share upfront
+            numbered_cases = list(numbered_cases)
+            num_cases = len(numbered_cases)
+        title = f"{suite_name} [SHARD {cfg.shard_index + 1}/{cfg.shard_count}]"
+        partial = PartialResults(cfg, suite_name)
+
+    # Suite header + metadata (also written to shared log if LOG=1)
+    # (streamed cases, e.g. from a corpus file, have no length upfront)
+    log_suite_start(cfg, title, num_cases)
+
+    # API-Readiness gate: don't run tests until /status reports the API is healthy.
+    # If the API never becomes ready within the timeout, abort the suite early.
+    if check_readiness and not wait_for_api(cfg):
+        log_api_not_ready(cfg, title)
+        if partial is not None:
+            partial.finish(success=False, aborted=True)
+        return False
+
+    # Incremental run: decided once the API is ready (the cache fingerprints the running build).
+    # Shards keep test-number order: the merge step expects each shard's results in order.
+    # The plan streams - how many cases it skipped is reported after the run
+    case_cache = cfg.case_cache
+    plan = None
+    if case_cache is not None:
+        plan = case_cache.plan(numbered_cases, failed_first=cfg.shard_count == 1)
+        numbered_cases = plan.cases
+        num_cases = None
+
+    latencies = EndpointLatencies()
+    outcomes = AttemptOutcomes()
+    metrics = cfg.metrics
+    cases_run = 0
+    # SUITE_DEADLINE: time budget for all test cases (starts once the API is ready)
+    deadline = time.monotonic() + cfg.suite_deadline if cfg.suite_deadline > 0 else None
+
+    def on_result(test_no: int, test_case: TestCase, test_result: TestResult) -> None:
+        nonlocal cases_run
+        cases_run += 1
+        log_result(cfg, title, test_no, test_case, test_result)
+        latencies.add(test_case, test_result)
+        outcomes.add(test_result)
+        if metrics is not None:
+            metrics.case_finished(suite_name, test_result)
+        if partial is not None:
+            partial.add(test_no, test_case, test_result)
+        if case_cache is not None:
+            case_cache.record(test_case, test_result)
+
+    # Aggregate success across all test cases (one failing case fails the whole suite)
+    # Connections / replicas used by THIS suite's requests (the pipeline shares one client)
+    with count_traffic() as traffic:
+        all_assertions_met = run_numbered_test_cases(cfg, numbered_cases, on_result, deadline, cfg.fail_fast)
+    if cfg.fail_fast and not all_assertions_met:
+        log_fail_fast(cfg, title, cases_run, num_cases)
+    if plan is not None:
+        log_incremental_plan(cfg, title, plan, case_cache.build)
+
+    # Suite footer + overall status + per-endpoint latency percentiles (also written to shared log if LOG=1)
+    log_suite_finished(cfg, title, all_assertions_met, latencies, outcomes, traffic)
+    if partial is not None:
+        partial.finish(success=all_assertions_met)
+    return all_assertions_met
@@ -0,0 +1,49 @@
+# tests/_shared/suites.py
+from __future__ import annotations # Keep type hints as strings (lazy evaluation) to avoid forward-ref/circular-import issues.
+
+import importlib
+import itertools
+from types import ModuleType
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .config import Config
+    from .types import TestCase
+
+# Open-loop modes (load, soak) cycle through an in-memory case list: at most this many corpus records
+MAX_REPLAY_CASES = 100_000
+
+# Suite name => module path (the same modules the suite containers run via `python -m ...`)
+SUITE_MODULES = {
+    "authentication": "tests.authentication.test_authentication",
+    "authorization": "tests.authorization.test_authorization",
+    "content": "tests.content.test_content",
+}
+
+def load_suite(name: str) -> ModuleType:
+    """
+    Import a suite module by its short name (e.g. "content") WITHOUT running it.
+
+    Shared tooling (load mode, orchestrators, ...) reuses the suites' `build_test_cases()`
+    definitions this way - importing a suite has no side effects (config is only loaded
+    by its main()) and suites only auto-run under `if __name__ == "__main__"`.
+    """
+    try:
+        module_path = SUITE_MODULES[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown suite: {name!r} (expected one of: {', '.join(SUITE_MODULES)})"
+        ) from None
+    return importlib.import_module(module_path)
+
+def replay_cases(cfg: Config, name: str, max_cases: int = MAX_REPLAY_CASES) -> list[TestCase]:
+    """
+    The cases load/soak mode replays for suite `name`: the same ones the suite itself runs -
+    its built-in cases or, with CORPUS_PATH set, its corpus records (see corpus.py), of
+    which the first `max_cases` are kept (the modes resend them round-robin from memory).
+    """
+    from .corpus import suite_test_cases
+
+    suite = load_suite(name)
+    cases = suite_test_cases(cfg, suite.build_test_cases(), suite.TestParams, suite.TEST_TYPE)
+    return list(itertools.islice(cases, max_cases))
@@ -0,0 +1,88 @@
+# tests/_shared/traffic.py
+"""
+Per-suite request counters
+--------------------------
+The pipeline's suites share ONE HTTP client and ONE ReplicaSet, whose counters are
+process-wide running totals - suites running in parallel (authorization + content) would
+count each other's requests. run_suite opens a SuiteTraffic for its context
+(count_traffic()); fetch() adds every request sent from that context to it, so the suite
+footer's connection and per-replica lines cover that suite only.
+
+Worker threads don't inherit context variables: work is submitted to thread pools via
+contextvars.copy_context().run (async_runner.py, resilience.py).
+"""
+from __future__ import annotations # Keep type hints as strings (lazy evaluation) to avoid forward-ref/circular-import issues.
+
+import contextlib
+import threading
+import time
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from .replicas import Replica, ReplicaSummary, ReplicaTotals, summarize_replicas
+from .transport import ConnectionStats
+from .types import Timing
+
+class SuiteTraffic:
+    """
+    Requests sent by one suite: connections opened vs. reused, and (API_TARGETS) the
+    per-replica counters of replicas.py. Thread-safe: the suite's worker threads add to it.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.opened = 0
+        self._replicas: dict[str, Replica] = {}
+        # Window of the recorded requests: first sent .. last answered (perf_counter)
+        self._first_at: Optional[float] = None
+        self._last_at: Optional[float] = None
+
+    def add(self, base_url: Optional[str], status: str, timing: Optional[Timing]) -> None:
+        # base_url: the replica (None without API_TARGETS); status/timing as for ReplicaSet.release
+        now = time.perf_counter()
+        with self._lock:
+            self.requests += 1
+            if timing is not None and timing.connect_ms > 0:  # transports time NEW connections only
+                self.opened += 1
+            if base_url is not None:
+                replica = self._replicas.get(base_url)
+                if replica is None:
+                    replica = self._replicas[base_url] = Replica(base_url)
+                replica.requests += 1
+                replica.status_counts[status] += 1
+                if timing is None or status.startswith("5"):
+                    replica.errors += 1
+                if timing is not None:
+                    replica.latency.record(timing.total_ms)
+            started = now if timing is None else now - timing.total_ms / 1000
+            if self._first_at is None or started < self._first_at:
+                self._first_at = started
+            self._last_at = now
+
+    def connection_stats(self) -> ConnectionStats:
+        with self._lock:
+            return ConnectionStats(opened=self.opened, reused=max(0, self.requests - self.opened), requests=self.requests)
+
+    def replica_summaries(self) -> list[ReplicaSummary]:
+        # In the order the replicas were first used ([] without API_TARGETS)
+        with self._lock:
+            totals = [
+                ReplicaTotals(r.base_url, r.requests, r.errors, r.status_counts.copy(), r.latency)
+                for r in self._replicas.values()
+            ]
+            elapsed_s = 0.0 if self._first_at is None or self._last_at is None else self._last_at - self._first_at
+        return summarize_replicas(totals, elapsed_s)
+
+# The current suite's counters (None => not counted, e.g. load/soak mode, readiness polling)
+suite_traffic: ContextVar[Optional[SuiteTraffic]] = ContextVar("suite_traffic", default=None)
+
+@contextlib.contextmanager
+def count_traffic() -> Iterator[SuiteTraffic]:
+    """Count the requests fetch() sends from this context (and work submitted from it)."""
+    traffic = SuiteTraffic()
+    token = suite_traffic.set(traffic)
+    try:
+        yield traffic
+    finally:
+        suite_traffic.reset(token)
@@ -0,0 +1,179 @@
+# tests/_shared/transport.py
+"""
+Pluggable HTTP transports
+-------------------------
+Everything that talks HTTP (runner, readiness check) goes through `cfg.http`, a Transport.
+HTTP_TRANSPORT picks the backend:
+
+- requests (default)  requests.Session over a sized urllib3 pool (http_client.py) - the
+                      reference implementation, the most per-request Python work
+- urllib3             the same connection pool, without the requests layer (no Session,
+                      PreparedRequest, hooks, cookie jar, ...)
+- asyncio             lean HTTP/1.1 client on asyncio streams (aio_transport.py): keep-alive,
+                      and with HTTP_PIPELINE=N up to N requests in flight per connection
+
+All backends return the same things (status code, body bytes, Timing) and raise the same
+requests.exceptions types (ConnectTimeout, ReadTimeout, ConnectionError, ...), so results,
+retries and logs don't depend on the backend. How much of a measured latency is client
+overhead per backend: tests/benchmarks/bench_transports.py.
+"""
+from __future__ import annotations # Keep type hints as strings (lazy evaluation) to avoid forward-ref/circular-import issues.
+
+import threading
+import time
+from typing import NamedTuple, Optional, Protocol
+
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from .types import Timing
+
+TRANSPORTS = ("requests", "urllib3", "asyncio")
+
+# Number of distinct host pools kept around (one per API host:port).
+# Evicting a pool would drop its connections (and its counters), so keep this generous.
+MAX_HOST_POOLS = 16
+
+class ConnectionStats(NamedTuple):
+    opened: int    # new TCP connections established
+    reused: int    # requests served over an already open (keep-alive) connection
+    requests: int  # total requests sent
+
+class TransportResponse(NamedTuple):
+    # The part of a response the harness uses (same attribute names as requests.Response)
+    status_code: int
+    content: bytes
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+class Transport(Protocol):
+    def get(self, url: str, timeout: Optional[float] = None) -> TransportResponse: ...
+    def timed_get(self, url: str, timeout: Optional[float] = None) -> tuple[TransportResponse, Timing]: ...
+    def connection_stats(self) -> ConnectionStats: ...
+    def close(self) -> None: ...
+
+# ------------------------------------------------------------------------------
+# urllib3 connection classes that record their connect time (requests + urllib3 backends)
+# ------------------------------------------------------------------------------
+# Per-thread connect time of the CURRENT request (each worker thread sends one request at a time)
+_connect_timing = threading.local()
+
+class _TimedHTTPConnection(HTTPConnection):
+    # Measures TCP connect time; only called when a NEW connection is opened
+    def connect(self) -> None:
+        started = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _connect_timing.seconds = getattr(_connect_timing, "seconds", 0.0) + time.perf_counter() - started
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    def connect(self) -> None:
+        started = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _connect_timing.seconds = getattr(_connect_timing, "seconds", 0.0) + time.perf_counter() - started
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+TIMED_POOL_CLASSES = {"http": _TimedHTTPConnectionPool, "https": _TimedHTTPSConnectionPool}
+
+def pool_stats(pools: object) -> ConnectionStats:
+    # urllib3 tracks per host pool: connections created vs requests sent
+    opened = sent = 0
+    for key in list(pools.keys()):  # type: ignore[attr-defined]
+        pool = pools.get(key)  # type: ignore[attr-defined]
+        if pool is None:  # evicted meanwhile
+            continue
+        opened += pool.num_connections
+        sent += pool.num_requests
+    return ConnectionStats(opened=opened, reused=max(0, sent - opened), requests=sent)
+
+# ------------------------------------------------------------------------------
+# urllib3 backend
+# ------------------------------------------------------------------------------
+def requests_error(e: Exception) -> Exception:
+    """urllib3 exception => the requests.exceptions type requests itself would have raised."""
+    from requests import exceptions as rex
+    from urllib3 import exceptions as u3
+
+    if isinstance(e, u3.MaxRetryError) and e.reason is not None:
+        e = e.reason  # type: ignore[assignment]
+    if isinstance(e, u3.NewConnectionError):  # (a ConnectTimeoutError subclass - check first)
+        return rex.ConnectionError(e)
+    if isinstance(e, u3.ConnectTimeoutError):
+        return rex.ConnectTimeout(e)
+    if isinstance(e, u3.ReadTimeoutError):
+        return rex.ReadTimeout(e)
+    if isinstance(e, u3.LocationParseError):
+        return rex.InvalidURL(e)
+    return rex.ConnectionError(e)
+
+class Urllib3Transport:
+    """
+    urllib3.PoolManager with a blocking, sized pool per host (same pooling as HttpClient),
+    called directly. Thread-safe for concurrent GETs.
+    """
+
+    def __init__(self, timeout: float, pool_size: int, keep_alive: bool = True) -> None:
+        import urllib3
+
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.keep_alive = keep_alive
+        # retries=False: failures surface immediately (retrying is the resilience layer's job)
+        self._manager = urllib3.PoolManager(num_pools=MAX_HOST_POOLS, maxsize=pool_size, block=True, retries=False)
+        self._manager.pool_classes_by_scheme = TIMED_POOL_CLASSES
+        # Ask the server to close after each response => one connection per request
+        self._headers = {} if keep_alive else {"Connection": "close"}
+        self._errors = (urllib3.exceptions.HTTPError,)
+
+    def get(self, url: str, timeout: Optional[float] = None) -> TransportResponse:
+        return self.timed_get(url, timeout)[0]
+
+    def timed_get(self, url: str, timeout: Optional[float] = None) -> tuple[TransportResponse, Timing]:
+        _connect_timing.seconds = 0.0
+        started = time.perf_counter()
+        try:
+            response = self._manager.urlopen(
+                "GET", url, headers=self._headers, timeout=timeout or self.timeout,
+                redirect=False, preload_content=False,
+            )
+            headers_at = time.perf_counter()
+            body = response.read()
+            response.release_conn()
+        except self._errors as e:
+            raise requests_error(e) from e
+        finished = time.perf_counter()
+
+        return TransportResponse(response.status, body), Timing(
+            connect_ms=_connect_timing.seconds * 1000,
+            ttfb_ms=(headers_at - started) * 1000,
+            total_ms=(finished - started) * 1000,
+            size_bytes=len(body),
+        )
+
+    def connection_stats(self) -> ConnectionStats:
+        return pool_stats(self._manager.pools)
+
+    def close(self) -> None:
+        self._manager.clear()
+
+def open_transport(name: str, timeout: float, pool_size: int, keep_alive: bool = True, pipeline: int = 1) -> Transport:
+    # HTTP_TRANSPORT => backend instance (imported on first use: only the chosen one is loaded)
+    if name == "requests":
+        from .http_client import HttpClient
+        return HttpClient(timeout=timeout, pool_size=pool_size, keep_alive=keep_alive)
+    if name == "urllib3":
+        return Urllib3Transport(timeout=timeout, pool_size=pool_size, keep_alive=keep_alive)
+    if name == "asyncio":
+        from .aio_transport import AsyncioTransport
+        return AsyncioTransport(timeout=timeout, pool_size=pool_size, keep_alive=keep_alive, pipeline=pipeline)
+    raise ValueError(f"Unknown HTTP_TRANSPORT: {name!r} (expected one of: {', '.join(TRANSPORTS)})")
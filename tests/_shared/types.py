@@ -8,8 +8,19 @@ class TestCase(NamedTuple):
     # Only used by CONTENT suite: check sign of returned score
     expected_score: Optional[str] = None  # "positive" | "negative" | None
 
+class Timing(NamedTuple):
+    connect_ms: float  # TCP connect time (0.0 => pooled keep-alive connection was reused)
+    ttfb_ms: float     # request start -> response headers received (time-to-first-byte)
+    total_ms: float    # request start -> response body fully read
+    size_bytes: int    # response body size
+
 class TestResult(NamedTuple):
     is_success: bool
     status_code: int
     test_status: str
     score: Optional[float] = None  # e.g. 0.75 | -0.66 | None
+    timing: Optional[Timing] = None  # None => no HTTP response received
+    # Opt-in resilience layer (RETRIES / HEDGE / SUITE_DEADLINE, see resilience.py):
+    attempts: int = 1                    # attempts made (0 => suite deadline already exceeded)
+    first_attempt: Optional[str] = None  # outcome of the FIRST attempt; None => layer disabled
+    hedged: bool = False                 # a hedge request was sent for this test case
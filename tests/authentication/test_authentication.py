@@ -20,25 +20,17 @@ Usage:
     API_ADDRESS=localhost API_PORT=8000 LOG=1 LOG_PATH=./shared/api_test.log \
     python3 tests/authentication/test_authentication.py
 """
+# First import: timestamps the end of interpreter start-up (see tests/_shared/startup.py)
+from tests._shared import startup
+
 from dataclasses import dataclass
 
 from tests._shared.types import TestCase
-from tests._shared.config import load_config
-from tests._shared.readiness import wait_for_api
-from tests._shared.logging import (
-    ensure_log_dir,
-    log_suite_start,
-    log_suite_finished,
-    log_api_not_ready,
-    log_result,
-)
-from tests._shared.runner import run_test_case
-
-# ------------------------------------------------------------------------------
-# Config (shared across all suites)
-# ------------------------------------------------------------------------------
-cfg = load_config()
-ensure_log_dir(cfg)
+from tests._shared.config import Config, load_config
+from tests._shared.corpus import suite_test_cases
+from tests._shared.logging import ensure_log_dir, log_startup_profile
+from tests._shared.profiling import profiling
+from tests._shared.suite_runner import run_suite
 
 TEST_TYPE = "AUTHENTICATION"
 
@@ -57,57 +49,52 @@ class TestParams:
 # - params: suite-specific TestParams
 # - expected_code: expected HTTP status
 # ------------------------------------------------------------------------------
-test_cases = [
-    TestCase(
-        api_url="/permissions",
-        params=TestParams(username="alice", password="wonderland"),
-        expected_code=200,
-    ),
-    TestCase(
-        api_url="/permissions",
-        params=TestParams(username="bob", password="builder"),
-        expected_code=200,
-    ),
-    TestCase(
-        api_url="/permissions",
-        params=TestParams(username="clementine", password="mandarine"),
-        expected_code=403,
-    ),
-]
+def build_test_cases() -> list[TestCase]:
+    """Built on demand, so importing this module has no side effects (no config, no I/O)."""
+    return [
+        TestCase(
+            api_url="/permissions",
+            params=TestParams(username="alice", password="wonderland"),
+            expected_code=200,
+        ),
+        TestCase(
+            api_url="/permissions",
+            params=TestParams(username="bob", password="builder"),
+            expected_code=200,
+        ),
+        TestCase(
+            api_url="/permissions",
+            params=TestParams(username="clementine", password="mandarine"),
+            expected_code=403,
+        ),
+    ]
+
+def run(cfg: Config, check_readiness: bool = True) -> bool:
+    """
+    Runs the suite against an already loaded Config and returns True on full success.
+    (Also used by the pipeline orchestrator, which runs several suites in one process.)
+    """
+    # Built-in test cases - or, with CORPUS_PATH set, the streamed corpus records for this suite's endpoints
+    cases = suite_test_cases(cfg, build_test_cases(), TestParams, TEST_TYPE)
+    return run_suite(cfg, TEST_TYPE, cases, check_readiness=check_readiness)
 
 def main() -> int:
     """
-    Orchestrates the full test-suite run:
+    Orchestrates the full test-suite run (see tests/_shared/suite_runner.py):
     - prints the suite header
     - ensures the API is ready (readiness gate)
-    - executes all test cases sequentially
+    - executes all test cases (concurrently, reported in order)
     - prints the suite summary
     - returns an exit code (0=success, 1=failure) for CI/pipeline use
-    """    
-    # Suite header + metadata (also written to shared log if LOG=1)
-    log_suite_start(cfg, TEST_TYPE, len(test_cases))
-
-    # API-Readiness gate: don't run tests until /status reports the API is healthy.
-    # If the API never becomes ready within the timeout, abort the suite early.
-    if not wait_for_api(cfg):
-        log_api_not_ready(cfg, TEST_TYPE)
-        return 1
-
-     # Aggregate success across all test cases (one failing case fails the whole suite)
-    all_assertions_met = True
-
-    # Run each test case and log a human-readable report entry
-    for test_no, test_case in enumerate(test_cases, start=1):
-        test_result = run_test_case(cfg, test_case)
-        log_result(cfg, TEST_TYPE, test_no, test_case, test_result)
-
-        # Track global suite status (keep running to produce a full report)
-        if not test_result.is_success:
-            all_assertions_met = False
+    """
+    startup.mark("imports")
+    # Config is loaded here (not at import time): importing the suite stays side-effect free
+    cfg = load_config()
+    ensure_log_dir(cfg)
+    with profiling(cfg, "authentication"):
+        all_assertions_met = run(cfg)
+    log_startup_profile(cfg, TEST_TYPE)
 
-    # Suite footer + overall status (also written to shared log if LOG=1)
-    log_suite_finished(cfg, TEST_TYPE, all_assertions_met)
-    
     # Exit code is used by Docker / CI pipelines:
     # 0 => everything passed, 1 => at least one test failed (or suite aborted)
     return 0 if all_assertions_met else 1
@@ -0,0 +1,191 @@
+"""
+API Cold-Start + Warm-Up Benchmark
+----------------------------------
+How long does the `api` service take to become usable after a (re)deploy, and how much
+slower are its first requests? Autoscaling needs both numbers; steady-state percentiles
+must not be distorted by them.
+
+1. Cold start (with --restart CMD, e.g. `docker compose -p docker-exam restart api`):
+   runs CMD, then polls /status every --poll-interval until it returns "1"
+   => time until ready, measured from issuing CMD and from CMD returning (container start)
+2. First calls: the first --first calls per endpoint, sent one at a time, alternating
+   /v1/sentiment and /v2/sentiment (each model's first call pays for its own loading)
+3. Warm-up: --warmup more calls per endpoint - sent, but kept out of all statistics
+4. Steady state: --steady calls per endpoint => the reference percentiles
+
+Per endpoint it reports the individual first calls, how they compare with steady-state
+p50, and from which call on it is warm (none of the later first calls is slower than
+SETTLE_FACTOR x steady p50).
+Requests go one at a time so latencies are not mixed with queueing.
+
+Without --restart, the first calls are measured against the API as it currently runs.
+
+Module-run convention (recommended):
+    API_ADDRESS=localhost API_PORT=8000 \
+    python3 -m tests.benchmarks.bench_cold_start --restart "docker compose -p docker-exam restart api" [--first 20] [--warmup 50] [--steady 200]
+"""
+from __future__ import annotations # Keep type hints as strings (lazy evaluation) to avoid forward-ref/circular-import issues.
+
+import argparse
+import subprocess
+import time
+from collections import Counter
+from typing import NamedTuple, Optional
+
+from tests._shared.config import Config, load_config
+from tests._shared.logging import emit, ensure_log_dir, log_api_not_ready
+from tests._shared.readiness import poll_status, wait_for_api
+from tests._shared.runner import run_test_case
+from tests._shared.stats import LatencySummary, summarize
+from tests._shared.types import TestCase, TestResult
+
+TEST_TYPE = "API COLD-START + WARM-UP BENCHMARK"
+
+ENDPOINTS = ("/v1/sentiment", "/v2/sentiment")
+# Sentences cycled through by all phases (a running number keeps every request distinct)
+SENTENCES = (
+    "life is beautiful",
+    "that sucks",
+    "the staff was friendly and helpful",
+    "the delivery was late and the product broke after two days",
+)
+# A first call counts as "still cold" while it is slower than this multiple of steady-state p50
+SETTLE_FACTOR = 2.0
+# First calls listed one by one in the report
+LISTED_CALLS = 10
+
+class ColdStart(NamedTuple):
+    command_s: float          # running the restart command
+    ready_s: Optional[float]  # command issued => /status "1" (None => not ready in time)
+    polls: int
+
+class EndpointPhases(NamedTuple):
+    endpoint: str
+    first_ms: list[float]     # first calls in order (NaN-free: only answered calls)
+    first_errors: Counter[str]
+    warmup_errors: Counter[str]
+    steady: LatencySummary
+    steady_errors: Counter[str]
+
+def make_case(endpoint: str, n: int) -> TestCase:
+    sentence = f"{SENTENCES[n % len(SENTENCES)]} {n}"
+    return TestCase(endpoint, {"username": "alice", "password": "wonderland", "sentence": sentence}, expected_code=200)
+
+def outcome_key(test_result: TestResult) -> str:
+    return str(test_result.status_code) if test_result.status_code else test_result.test_status
+
+def run_phase(cfg: Config, calls: int, offset: int) -> dict[str, tuple[list[float], Counter[str]]]:
+    # `calls` per endpoint, one request at a time, alternating endpoints
+    results: dict[str, tuple[list[float], Counter[str]]] = {endpoint: ([], Counter()) for endpoint in ENDPOINTS}
+    for n in range(offset, offset + calls):
+        for endpoint in ENDPOINTS:
+            latencies_ms, errors = results[endpoint]
+            test_result = run_test_case(cfg, make_case(endpoint, n))
+            if test_result.status_code != 200:
+                errors[outcome_key(test_result)] += 1
+            if test_result.timing is not None:
+                latencies_ms.append(test_result.timing.total_ms)
+    return results
+
+def restart_api(cfg: Config, command: str, timeout_s: float, interval_s: float) -> ColdStart:
+    cfg.http  # created (incl. its imports) before the clock starts: the first poll measures the API
+    started = time.perf_counter()
+    subprocess.run(command, shell=True, check=True)
+    command_s = time.perf_counter() - started
+    readiness = poll_status(cfg, timeout_s, interval_s)
+    return ColdStart(command_s, time.perf_counter() - started if readiness.ready else None, readiness.polls)
+
+def warm_after(first_ms: list[float], steady_p50_ms: float) -> int:
+    # Number of the last first call still slower than SETTLE_FACTOR x steady p50 (0 => warm from the start)
+    slow = [i for i, latency_ms in enumerate(first_ms, start=1) if latency_ms > SETTLE_FACTOR * steady_p50_ms]
+    return slow[-1] if slow else 0
+
+def format_errors(errors: Counter[str]) -> str:
+    return ", ".join(f"{key}={count}" for key, count in sorted(errors.items())) or "none"
+
+def format_endpoint(phases: EndpointPhases, warmup: int) -> str:
+    steady = phases.steady
+    first = phases.first_ms
+    if not first or not steady.count:
+        return f"| {phases.endpoint}: no answered calls (first: {format_errors(phases.first_errors)}, steady: {format_errors(phases.steady_errors)})"
+    listed = " ".join(f"{latency_ms:.1f}" for latency_ms in first[:LISTED_CALLS])
+    first_summary = summarize(first)
+    settled = warm_after(first, steady.p50_ms)
+    warm = (
+        f"call #{settled + 1} (call #{settled} was the last one slower than {SETTLE_FACTOR:g}x steady p50)"
+        if settled else f"from the first call (none slower than {SETTLE_FACTOR:g}x steady p50)"
+    )
+    first_label = f"first {len(first)} calls:"
+    return f"""| {phases.endpoint}
+|   first call:     {first[0]:.1f}ms = {first[0] / steady.p50_ms:.1f}x steady p50
+|   {first_label:<16} {listed}{" ..." if len(first) > LISTED_CALLS else ""} (ms)
+|                   p50={first_summary.p50_ms:.1f}ms max={first_summary.max_ms:.1f}ms, errors: {format_errors(phases.first_errors)}
+|   warm:           {warm}
+|   warm-up:        {warmup} calls excluded, errors: {format_errors(phases.warmup_errors)}
+|   steady state:   n={steady.count} p50={steady.p50_ms:.1f}ms p90={steady.p90_ms:.1f}ms p99={steady.p99_ms:.1f}ms max={steady.max_ms:.1f}ms, errors: {format_errors(phases.steady_errors)}"""
+
+def format_cold_start(cold_start: Optional[ColdStart]) -> str:
+    if cold_start is None:
+        return "| Cold start: not measured (no --restart) - first calls against the running API"
+    if cold_start.ready_s is None:
+        return f"| Cold start: API NOT ready in time (restart command took {cold_start.command_s:.2f}s, {cold_start.polls} polls)"
+    return (
+        f"| Cold start: ready {cold_start.ready_s:.2f}s after the restart command, "
+        f"{cold_start.ready_s - cold_start.command_s:.2f}s after it returned (container start; {cold_start.polls} polls)"
+    )
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="API cold start, first-call latency and steady state (warm-up excluded).")
+    parser.add_argument("--restart", default=None, help="shell command that (re)starts the API, e.g. 'docker compose restart api'")
+    parser.add_argument("--ready-timeout", type=float, default=180.0, help="max. seconds until /status returns 1 after --restart")
+    parser.add_argument("--poll-interval", type=float, default=0.05, help="seconds between /status polls after --restart")
+    parser.add_argument("--first", type=int, default=20, help="first calls per endpoint (reported individually)")
+    parser.add_argument("--warmup", type=int, default=50, help="calls per endpoint excluded from all statistics")
+    parser.add_argument("--steady", type=int, default=200, help="steady-state calls per endpoint")
+    args = parser.parse_args(argv)
+    if args.first < 1 or args.warmup < 0 or args.steady < 1 or args.poll_interval <= 0:
+        parser.error("expected --first >= 1, --warmup >= 0, --steady >= 1 and --poll-interval > 0")
+
+    cfg = load_config()
+    ensure_log_dir(cfg)
+    cold_start = None
+    if args.restart:
+        print(f"# Restarting the API: {args.restart}")
+        cold_start = restart_api(cfg, args.restart, args.ready_timeout, args.poll_interval)
+        if cold_start.ready_s is None:
+            emit(cfg, format_cold_start(cold_start), prepend_lb=True)
+            log_api_not_ready(cfg, TEST_TYPE)
+            return 1
+    elif not wait_for_api(cfg):
+        log_api_not_ready(cfg, TEST_TYPE)
+        return 1
+
+    first = run_phase(cfg, args.first, 0)
+    warmup = run_phase(cfg, args.warmup, args.first)
+    steady = run_phase(cfg, args.steady, args.first + args.warmup)
+    reports = [
+        format_endpoint(
+            EndpointPhases(
+                endpoint,
+                first[endpoint][0], first[endpoint][1],
+                warmup[endpoint][1],
+                summarize(steady[endpoint][0]), steady[endpoint][1],
+            ),
+            args.warmup,
+        )
+        for endpoint in ENDPOINTS
+    ]
+
+    output = "\n".join([
+        "===============================================================",
+        f">>> {TEST_TYPE}",
+        f">>> {args.first} first + {args.warmup} warm-up + {args.steady} steady calls per endpoint, one at a time",
+        "===============================================================",
+        format_cold_start(cold_start),
+        *reports,
+    ])
+    emit(cfg, output, prepend_lb=True)
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,266 @@
+"""
+Input-Size Scaling Benchmark
+----------------------------
+The suites only send short sentences - production traffic includes long reviews. This
+benchmark generates sentences over a geometric sweep of lengths (short phrases up to
+near URL-length limits) and sends them to /v1/sentiment and /v2/sentiment:
+
+- Per size step: characters, tokens (words) and the resulting URL length in bytes,
+  latency percentiles and the status codes / errors seen
+- Fit: latency = intercept + slope * chars (ms per 1k chars), plus the power-law exponent
+  in log-log space (~0 => fixed overhead dominates, ~1 => linear in input size)
+- Bend: the best two-segment log-log fit - where the scaling curve changes slope
+- Limits: the first size at which requests stop being answered with 200, split into
+  server limits (e.g. 414 URI Too Long, 431, 400) and client/transport errors
+  (no HTTP response, e.g. ConnectionError when the server drops an oversized request line)
+
+Sentences are deterministic (seeded) mixes of lexicon words, so runs are comparable.
+Each size gets --repeat DIFFERENT sentences; all requests of an endpoint are sent in a
+shuffled order, so drift during the run (warm-up, GC, ...) doesn't correlate with size.
+
+Requires numpy (`pip install numpy`) in addition to requests.
+
+Module-run convention (recommended):
+    API_ADDRESS=localhost API_PORT=8000 CONCURRENCY=4 \
+    python3 -m tests.benchmarks.bench_input_scaling [--min-chars 16] [--max-chars 32768] [--repeat 20]
+"""
+from __future__ import annotations # Keep type hints as strings (lazy evaluation) to avoid forward-ref/circular-import issues.
+
+import argparse
+import math
+import random
+from collections import Counter
+from typing import NamedTuple, Optional
+from urllib.parse import urlencode
+
+import numpy as np
+
+from tests._shared.async_runner import run_test_cases
+from tests._shared.config import Config, load_config
+from tests._shared.logging import emit, ensure_log_dir, log_api_not_ready
+from tests._shared.params import params_dict
+from tests._shared.readiness import wait_for_api
+from tests._shared.types import TestCase, TestResult
+
+from .bench_sentiment_compare import ENDPOINTS, BenchParams
+
+TEST_TYPE = "SENTIMENT INPUT-SIZE SCALING BENCHMARK"
+
+# Sentence vocabulary: lexicon words (so the model has something to score) + neutral filler
+WORDS = (
+    "the", "service", "was", "really", "and", "staff", "food", "room", "delivery", "product",
+    "we", "it", "very", "quite", "not", "at", "all", "after", "days", "experience",
+    "great", "good", "wonderful", "friendly", "helpful", "reliable", "comfortable", "amazing",
+    "bad", "terrible", "awful", "rude", "late", "broke", "noisy", "disappointed", "waste",
+)
+# Geometric sweep: this many size steps per doubling of the sentence length
+STEPS_PER_DOUBLING = 2
+# A size step counts for the fit only if at least this share of its requests got a 200
+MIN_OK_SHARE = 0.9
+# A bend is reported when the two-segment fit halves the residual error of a single line ...
+BEND_MIN_SSE_GAIN = 0.5
+# ... and the exponents of both segments differ by at least this much
+BEND_MIN_SLOPE_CHANGE = 0.25
+
+class SizeStep(NamedTuple):
+    chars: int       # sentence length (characters)
+    tokens: int      # words
+    url_bytes: int   # full request target: path + "?" + URL-encoded query
+
+class StepResult(NamedTuple):
+    step: SizeStep
+    latencies_ms: np.ndarray   # float64, answered requests only (any status)
+    ok: int                    # 200 responses
+    outcomes: Counter[str]     # status code / error name => count
+
+class Fit(NamedTuple):
+    intercept_ms: float
+    ms_per_1k_chars: float
+    exponent: float                 # log-log slope over the whole sweep
+    bend_chars: Optional[float]     # None => one power law fits
+    exponent_before: float
+    exponent_after: float
+
+def make_sentence(rng: random.Random, target_chars: int) -> str:
+    # Whole words only, as long as possible without exceeding target_chars (at least one word)
+    words = [rng.choice(WORDS)]
+    length = len(words[0])
+    while True:
+        word = rng.choice(WORDS)
+        if length + 1 + len(word) > target_chars:
+            return " ".join(words)
+        words.append(word)
+        length += 1 + len(word)
+
+def size_sweep(min_chars: int, max_chars: int) -> list[int]:
+    # min_chars * 2^(i / STEPS_PER_DOUBLING) up to max_chars (inclusive, deduplicated)
+    steps = int(math.floor(math.log2(max_chars / min_chars) * STEPS_PER_DOUBLING + 1e-9))
+    return sorted({round(min_chars * 2 ** (i / STEPS_PER_DOUBLING)) for i in range(steps + 1)} | {max_chars})
+
+def build_cases(endpoint: str, sizes: list[int], repeat: int, seed: int) -> tuple[list[TestCase], list[int], list[SizeStep]]:
+    """
+    All requests for ONE endpoint in shuffled order => (cases, size index per case, size steps).
+    Sentences depend only on (seed, size, repetition) - both endpoints get the same ones.
+    """
+    cases: list[TestCase] = []
+    step_of: list[int] = []
+    steps: list[SizeStep] = []
+    for index, target in enumerate(sizes):
+        rng = random.Random(f"{seed}:{target}")
+        sentences = [make_sentence(rng, target) for _ in range(repeat)]
+        # Step stats from the first sentence (all repetitions have about the same length)
+        params = BenchParams(sentence=sentences[0])
+        steps.append(SizeStep(
+            chars=len(sentences[0]),
+            tokens=len(sentences[0].split()),
+            url_bytes=len(endpoint) + 1 + len(urlencode(params_dict(params))),
+        ))
+        for sentence in sentences:
+            cases.append(TestCase(api_url=endpoint, params=BenchParams(sentence=sentence), expected_code=200))
+            step_of.append(index)
+
+    order = list(range(len(cases)))
+    random.Random(seed).shuffle(order)
+    return [cases[i] for i in order], [step_of[i] for i in order], steps
+
+def outcome_key(test_result: TestResult) -> str:
+    # HTTP status code - or the error name when no HTTP response was received
+    return str(test_result.status_code) if test_result.status_code else test_result.test_status.removeprefix("ERROR: ")
+
+def run_endpoint(cfg: Config, endpoint: str, sizes: list[int], repeat: int, seed: int) -> list[StepResult]:
+    cases, step_of, steps = build_cases(endpoint, sizes, repeat, seed)
+    latencies: list[list[float]] = [[] for _ in steps]
+    ok = [0] * len(steps)
+    outcomes: list[Counter[str]] = [Counter() for _ in steps]
+
+    def on_result(test_no: int, test_case: TestCase, test_result: TestResult) -> None:
+        index = step_of[test_no - 1]
+        outcomes[index][outcome_key(test_result)] += 1
+        if test_result.timing is not None:
+            latencies[index].append(test_result.timing.total_ms)
+        if test_result.status_code == 200:
+            ok[index] += 1
+
+    run_test_cases(cfg, cases, on_result)
+    return [
+        StepResult(step, np.asarray(latencies[i], dtype=np.float64), ok[i], outcomes[i])
+        for i, step in enumerate(steps)
+    ]
+
+def _line_sse(x: np.ndarray, y: np.ndarray) -> tuple[float, float]:
+    # Least-squares line through (x, y) => (slope, sum of squared residuals)
+    slope, intercept = np.polyfit(x, y, 1)
+    return float(slope), float(np.sum((y - (slope * x + intercept)) ** 2))
+
+def fit_scaling(results: list[StepResult]) -> Optional[Fit]:
+    """
+    Fits median latency against input size over the size steps that were (mostly) answered:
+    a linear fit in chars, and the power-law exponent + best breakpoint in log-log space.
+    """
+    usable = [r for r in results if r.latencies_ms.size and r.ok >= MIN_OK_SHARE * sum(r.outcomes.values())]
+    if len(usable) < 3:
+        return None
+    chars = np.array([r.step.chars for r in usable], dtype=np.float64)
+    medians = np.array([np.median(r.latencies_ms) for r in usable])
+
+    ms_per_char, intercept_ms = np.polyfit(chars, medians, 1)
+    log_x, log_y = np.log(chars), np.log(medians)
+    exponent, sse_single = _line_sse(log_x, log_y)
+
+    # Two segments sharing the breakpoint; each needs >= 3 points to have a meaningful slope
+    best: Optional[tuple[float, int, float, float]] = None
+    for k in range(2, len(usable) - 2):
+        slope_before, sse_before = _line_sse(log_x[: k + 1], log_y[: k + 1])
+        slope_after, sse_after = _line_sse(log_x[k:], log_y[k:])
+        if best is None or sse_before + sse_after < best[0]:
+            best = (sse_before + sse_after, k, slope_before, slope_after)
+
+    bend_chars = None
+    exponent_before = exponent_after = exponent
+    if best is not None:
+        sse_split, k, slope_before, slope_after = best
+        if sse_split <= (1 - BEND_MIN_SSE_GAIN) * sse_single and abs(slope_after - slope_before) >= BEND_MIN_SLOPE_CHANGE:
+            bend_chars, exponent_before, exponent_after = float(chars[k]), slope_before, slope_after
+
+    return Fit(float(intercept_ms), float(ms_per_char) * 1000, exponent, bend_chars, exponent_before, exponent_after)
+
+def format_limit(results: list[StepResult]) -> str:
+    # First size step where not every request got a 200 - and what it got instead
+    for r in results:
+        failures = {key: n for key, n in r.outcomes.items() if key != "200"}
+        if not failures:
+            continue
+        kind = "client/transport" if any(not key.isdigit() for key in failures) else "server"
+        seen = ", ".join(f"{key}={n}" for key, n in sorted(failures.items()))
+        return (
+            f"Limit:    first non-200 at {r.step.chars} chars / {r.step.tokens} tokens "
+            f"(URL {r.step.url_bytes} bytes) - {kind}: {seen}"
+        )
+    return f"Limit:    none up to {results[-1].step.chars} chars (URL {results[-1].step.url_bytes} bytes)"
+
+def format_endpoint_report(endpoint: str, results: list[StepResult]) -> str:
+    rows = []
+    for r in results:
+        if r.latencies_ms.size:
+            p50, p90 = np.percentile(r.latencies_ms, [50, 90])
+            latency = f"{p50:>8.1f} {p90:>8.1f}"
+        else:
+            latency = f"{'n/a':>8} {'n/a':>8}"
+        statuses = " ".join(f"{key}={n}" for key, n in sorted(r.outcomes.items()))
+        rows.append(f"|   {r.step.chars:>7} {r.step.tokens:>7} {r.step.url_bytes:>9} {latency}   {statuses}")
+
+    fit = fit_scaling(results)
+    if fit is None:
+        fit_lines = "Fit:      n/a (fewer than 3 answered size steps)"
+    else:
+        bend = (
+            f"bend at ~{fit.bend_chars:.0f} chars: exponent {fit.exponent_before:.2f} -> {fit.exponent_after:.2f}"
+            if fit.bend_chars is not None
+            else "no bend (one power law fits the sweep)"
+        )
+        fit_lines = (
+            f"Fit:      p50 = {fit.intercept_ms:.2f}ms + {fit.ms_per_1k_chars:.3f}ms per 1k chars; "
+            f"log-log exponent {fit.exponent:.2f}\n"
+            f"Bend:     {bend}"
+        )
+
+    return f"""------------------------------------------
+    {endpoint}
+------------------------------------------
+|     chars  tokens  url_bytes  p50(ms)  p90(ms)   statuses
+""" + "\n".join(rows) + f"""
+{fit_lines}
+{format_limit(results)}"""
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Latency of /v1 and /v2 sentiment vs. sentence length.")
+    parser.add_argument("--min-chars", type=int, default=16, help="shortest sentence (characters)")
+    parser.add_argument("--max-chars", type=int, default=32768, help="longest sentence (characters)")
+    parser.add_argument("--repeat", type=int, default=20, help="different sentences per size step")
+    parser.add_argument("--seed", type=int, default=1, help="sentence generator + send order seed")
+    args = parser.parse_args(argv)
+    if not 1 <= args.min_chars < args.max_chars or args.repeat < 1:
+        parser.error("expected 1 <= --min-chars < --max-chars and --repeat >= 1")
+
+    cfg = load_config()
+    ensure_log_dir(cfg)
+    if not wait_for_api(cfg):
+        log_api_not_ready(cfg, TEST_TYPE)
+        return 1
+
+    sizes = size_sweep(args.min_chars, args.max_chars)
+    reports = [format_endpoint_report(endpoint, run_endpoint(cfg, endpoint, sizes, args.repeat, args.seed)) for endpoint in ENDPOINTS]
+
+    output = "\n".join([
+        "===============================================================",
+        f">>> {TEST_TYPE}",
+        f">>> Sweep: {len(sizes)} sizes from {sizes[0]} to {sizes[-1]} chars, {args.repeat} sentences each "
+        f"(concurrency: {cfg.concurrency})",
+        "===============================================================",
+        *reports,
+    ])
+    emit(cfg, output, prepend_lb=True)
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
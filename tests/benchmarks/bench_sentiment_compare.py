@@ -0,0 +1,189 @@
+"""
+v1 vs v2 Sentiment Benchmark
+----------------------------
+Sends the SAME labeled corpus to /v1/sentiment and /v2/sentiment and compares both models:
+
+- Speed:    throughput (requests/s) and latency percentiles per endpoint
+- Quality:  accuracy, confusion matrix (actual label vs. predicted sign) and score distribution
+- Agreement: how often v1 and v2 predict the same sign for the same sentence
+
+The corpus is streamed (see tests/_shared/corpus.py) - one JSONL/CSV record per sentence:
+    {"sentence": "life is beautiful", "expected_sentiment": "positive"}
+(username/password are optional and default to alice, who may call both endpoints).
+
+Endpoints are benchmarked one after another (not interleaved), so each throughput number
+reflects that endpoint alone. All statistics are computed on NumPy arrays.
+
+Requires numpy (`pip install numpy`) in addition to requests.
+
+Module-run convention (recommended):
+    API_ADDRESS=localhost API_PORT=8000 CONCURRENCY=16 \
+    python3 -m tests.benchmarks.bench_sentiment_compare [--corpus path/to/labeled.jsonl]
+"""
+from __future__ import annotations # Keep type hints as strings (lazy evaluation) to avoid forward-ref/circular-import issues.
+
+import argparse
+import math
+import os
+import time
+from array import array
+from dataclasses import dataclass
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from tests._shared.async_runner import run_test_cases
+from tests._shared.config import Config, load_config
+from tests._shared.corpus import iter_corpus
+from tests._shared.logging import emit, ensure_log_dir, log_api_not_ready
+from tests._shared.readiness import wait_for_api
+from tests._shared.types import TestCase, TestResult
+
+TEST_TYPE = "SENTIMENT V1 VS V2 BENCHMARK"
+
+ENDPOINTS = ("/v1/sentiment", "/v2/sentiment")
+DEFAULT_CORPUS = os.path.join(os.path.dirname(__file__), "data", "labeled_sentences.jsonl")
+
+# Label encoding shared by labels and predictions: +1 positive, -1 negative, 0 none/neutral
+LABELS = {"positive": 1, "negative": -1}
+# Score histogram bins (API scores are in [-1, 1]; values outside are clipped into the edge bins)
+SCORE_BINS = np.linspace(-1.0, 1.0, 11)
+
+@dataclass(frozen=True)
+class BenchParams:
+    sentence: str
+    username: str = "alice"       # alice is allowed to call both v1 and v2
+    password: str = "wonderland"
+
+class EndpointRun(NamedTuple):
+    endpoint: str
+    elapsed_s: float
+    labels: np.ndarray        # int8, +1 / -1 (0 => unlabeled record)
+    scores: np.ndarray        # float64, NaN => no/invalid score
+    latencies_ms: np.ndarray  # float64, NaN => no HTTP response
+    status_codes: np.ndarray  # int32, 0 => no HTTP response
+
+def run_endpoint(cfg: Config, corpus_path: str, endpoint: str) -> EndpointRun:
+    # Compact typed buffers while streaming (no per-result Python objects kept around)
+    labels, scores, latencies, codes = array("b"), array("d"), array("d"), array("i")
+
+    def on_result(test_no: int, test_case: TestCase, test_result: TestResult) -> None:
+        labels.append(LABELS.get(test_case.expected_score or "", 0))
+        scores.append(math.nan if test_result.score is None else test_result.score)
+        latencies.append(math.nan if test_result.timing is None else test_result.timing.total_ms)
+        codes.append(test_result.status_code)
+
+    # Same corpus for every endpoint: force the endpoint, keep params + label
+    cases = (
+        test_case._replace(api_url=endpoint, expected_code=200)
+        for test_case in iter_corpus(corpus_path, BenchParams, default_endpoint=endpoint)
+    )
+    started = time.perf_counter()
+    run_test_cases(cfg, cases, on_result)
+    elapsed_s = time.perf_counter() - started
+
+    return EndpointRun(
+        endpoint=endpoint,
+        elapsed_s=elapsed_s,
+        labels=np.frombuffer(labels, dtype=np.int8),
+        scores=np.frombuffer(scores, dtype=np.float64),
+        latencies_ms=np.frombuffer(latencies, dtype=np.float64),
+        status_codes=np.frombuffer(codes, dtype=np.int32),
+    )
+
+def predicted_signs(run: EndpointRun) -> np.ndarray:
+    # Sign of the score: +1 / -1, and 0 for a neutral (0.0) or missing score
+    return np.sign(np.nan_to_num(run.scores, nan=0.0)).astype(np.int8)
+
+def confusion_matrix(labels: np.ndarray, predicted: np.ndarray) -> np.ndarray:
+    """
+    2x3 matrix: rows = actual (positive, negative), cols = predicted (positive, negative, none).
+    Built in one np.bincount over a combined (row, col) index.
+    """
+    labeled = labels != 0
+    rows = np.where(labels[labeled] > 0, 0, 1)
+    cols = np.select([predicted[labeled] > 0, predicted[labeled] < 0], [0, 1], default=2)
+    return np.bincount(rows * 3 + cols, minlength=6).reshape(2, 3)
+
+def format_endpoint_report(run: EndpointRun) -> str:
+    answered = ~np.isnan(run.latencies_ms)
+    latencies = run.latencies_ms[answered]
+    if latencies.size:
+        p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+        latency_line = (
+            f"mean={latencies.mean():.1f}ms p50={p50:.1f}ms p90={p90:.1f}ms "
+            f"p99={p99:.1f}ms max={latencies.max():.1f}ms"
+        )
+    else:
+        latency_line = "n/a (no responses)"
+
+    total = run.status_codes.size
+    errors = int(np.count_nonzero(run.status_codes != 200))
+    predicted = predicted_signs(run)
+    labeled = run.labels != 0
+    accuracy = float(np.mean(predicted[labeled] == run.labels[labeled])) if labeled.any() else math.nan
+    confusion = confusion_matrix(run.labels, predicted)
+
+    valid_scores = run.scores[~np.isnan(run.scores)]
+    if valid_scores.size:
+        counts, _ = np.histogram(np.clip(valid_scores, -1.0, 1.0), bins=SCORE_BINS)
+        q10, q50, q90 = np.quantile(valid_scores, [0.1, 0.5, 0.9])
+        score_line = (
+            f"mean={valid_scores.mean():+.3f} std={valid_scores.std():.3f} "
+            f"q10={q10:+.3f} median={q50:+.3f} q90={q90:+.3f}"
+        )
+        histogram = "\n".join(
+            f"|   [{lo:+.1f}, {hi:+.1f}{']' if i == len(counts) - 1 else ')'} {count:>7} {'#' * int(round(40 * count / counts.max()))}".rstrip()
+            for i, (lo, hi, count) in enumerate(zip(SCORE_BINS[:-1], SCORE_BINS[1:], counts))
+        )
+    else:
+        score_line, histogram = "n/a (no scores)", "|   n/a"
+
+    return f"""------------------------------------------
+    {run.endpoint}
+------------------------------------------
+Requests: {total} in {run.elapsed_s:.2f}s => {total / run.elapsed_s if run.elapsed_s > 0 else 0:.1f} req/s (non-200: {errors})
+Latency:  {latency_line}
+Accuracy: {accuracy:.1%} over {int(labeled.sum())} labeled sentences
+Confusion matrix (rows = actual, cols = predicted):
+|              positive  negative      none
+|   positive  {confusion[0, 0]:>9} {confusion[0, 1]:>9} {confusion[0, 2]:>9}
+|   negative  {confusion[1, 0]:>9} {confusion[1, 1]:>9} {confusion[1, 2]:>9}
+Score distribution: {score_line}
+{histogram}"""
+
+def format_agreement(v1: EndpointRun, v2: EndpointRun) -> str:
+    # Results are reported in corpus order for both runs => arrays are aligned by index
+    both = (v1.status_codes == 200) & (v2.status_codes == 200)
+    if not both.any():
+        return "v1/v2 agreement: n/a (no sentence answered by both)"
+    same = predicted_signs(v1)[both] == predicted_signs(v2)[both]
+    return f"v1/v2 agreement: {same.mean():.1%} same sign over {int(both.sum())} sentences"
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare /v1/sentiment and /v2/sentiment on a labeled corpus.")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="labeled JSONL/CSV corpus (sentence + expected_sentiment)")
+    args = parser.parse_args(argv)
+
+    cfg = load_config()
+    ensure_log_dir(cfg)
+    if not wait_for_api(cfg):
+        log_api_not_ready(cfg, TEST_TYPE)
+        return 1
+
+    runs = [run_endpoint(cfg, args.corpus, endpoint) for endpoint in ENDPOINTS]
+
+    output = "\n".join([
+        "===============================================================",
+        f">>> {TEST_TYPE}",
+        f">>> Corpus: {args.corpus} (concurrency: {cfg.concurrency})",
+        "===============================================================",
+        *(format_endpoint_report(run) for run in runs),
+        "------------------------------------------",
+        format_agreement(*runs),
+    ])
+    emit(cfg, output, prepend_lb=True)
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
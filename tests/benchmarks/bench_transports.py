@@ -0,0 +1,249 @@
+"""
+HTTP Transport Overhead Micro-Benchmark
+---------------------------------------
+How much of a measured latency is the HTTP client itself? Sends the same GET request
+through every transport backend (tests/_shared/transport.py) against a local server:
+
+- Floor: a raw-socket keep-alive client (pre-built request bytes, minimal response
+  parsing) - server + kernel round trip with next to no client work
+- Per backend, sequentially over one keep-alive connection: latency percentiles,
+  overhead = p50 - floor p50, and client CPU time per request (process CPU time, so the
+  asyncio backend's loop thread counts too)
+- Per backend, concurrently (--concurrency threads, like the runner): throughput and
+  client CPU per request; the asyncio backend additionally with pipelining
+  (--pipeline requests per connection over concurrency / pipeline connections)
+
+By default the server is a stand-in (tests/standin/server.py, zero latency) started as a
+SEPARATE process, so its CPU time doesn't count as client time. --target api measures
+against API_ADDRESS/API_PORT instead (server time then varies more - use more --requests).
+
+Module-run convention (recommended):
+    python3 -m tests.benchmarks.bench_transports [--requests 2000] [--concurrency 16] [--pipeline 8]
+"""
+from __future__ import annotations # Keep type hints as strings (lazy evaluation) to avoid forward-ref/circular-import issues.
+
+import argparse
+import math
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple, Optional
+from urllib.parse import urlsplit
+
+from tests._shared.config import load_config
+from tests._shared.logging import emit, ensure_log_dir, log_api_not_ready
+from tests._shared.readiness import wait_for_api
+from tests._shared.stats import LatencySummary, summarize
+from tests._shared.transport import TRANSPORTS, Transport, open_transport
+
+TEST_TYPE = "HTTP TRANSPORT OVERHEAD BENCHMARK"
+
+# A realistic request of the suites (authorized v1 sentiment call)
+DEFAULT_PATH = "/v1/sentiment?username=alice&password=wonderland&sentence=the+service+was+great"
+# Requests sent (and discarded) before measuring: connections, imports, caches
+WARMUP_REQUESTS = 200
+# How long to wait for the stand-in subprocess to accept connections
+STANDIN_START_TIMEOUT_S = 10.0
+
+class SequentialResult(NamedTuple):
+    latency: LatencySummary
+    cpu_us: float  # client CPU time per request
+
+class ConcurrentResult(NamedTuple):
+    rps: float
+    cpu_us: float
+    errors: int
+    connections: int
+
+# ------------------------------------------------------------------------------
+# Local server + raw-socket floor
+# ------------------------------------------------------------------------------
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_standin_process(latency: str = "fixed:0") -> tuple[subprocess.Popen[bytes], str]:
+    # Stand-in as a SEPARATE process (its CPU time doesn't count as client time) => (process, base URL)
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "tests.standin.server", "--port", str(port), "--latency", latency],
+        stdout=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + STANDIN_START_TIMEOUT_S
+    while True:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return process, f"http://127.0.0.1:{port}"
+        except OSError:
+            if process.poll() is not None or time.monotonic() > deadline:
+                process.kill()
+                raise RuntimeError(f"stand-in did not start on port {port}")
+            time.sleep(0.05)
+
+def _read_raw_response(sock: socket.socket, buffer: bytes) -> bytes:
+    # Reads ONE Content-Length delimited response; returns what was read beyond it
+    while b"\r\n\r\n" not in buffer:
+        chunk = sock.recv(65536)
+        if not chunk:
+            raise ConnectionError("connection closed")
+        buffer += chunk
+    head, _, buffer = buffer.partition(b"\r\n\r\n")
+    length = None
+    for line in head.split(b"\r\n")[1:]:
+        name, _, value = line.partition(b":")
+        if name.strip().lower() == b"content-length":
+            length = int(value)
+    if length is None:
+        raise ValueError("response without Content-Length")
+    while len(buffer) < length:
+        chunk = sock.recv(65536)
+        if not chunk:
+            raise ConnectionError("connection closed")
+        buffer += chunk
+    return buffer[length:]
+
+def measure_floor(url: str, requests: int) -> Optional[LatencySummary]:
+    # None => the server doesn't answer with Content-Length (the floor client can't parse it)
+    parts = urlsplit(url)
+    target = f"{parts.path}?{parts.query}" if parts.query else parts.path or "/"
+    request = f"GET {target} HTTP/1.1\r\nHost: {parts.netloc}\r\n\r\n".encode("latin-1")
+    latencies_ms = []
+    try:
+        with socket.create_connection((parts.hostname, parts.port or 80), timeout=5) as sock:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            buffer = b""
+            for i in range(WARMUP_REQUESTS + requests):
+                started = time.perf_counter()
+                sock.sendall(request)
+                buffer = _read_raw_response(sock, buffer)
+                if i >= WARMUP_REQUESTS:
+                    latencies_ms.append((time.perf_counter() - started) * 1000)
+    except (OSError, ValueError):
+        return None
+    return summarize(latencies_ms)
+
+# ------------------------------------------------------------------------------
+# Backends
+# ------------------------------------------------------------------------------
+def measure_sequential(transport: Transport, url: str, requests: int) -> SequentialResult:
+    for _ in range(WARMUP_REQUESTS):
+        transport.get(url)
+    latencies_ms = []
+    cpu_started = time.process_time()
+    for _ in range(requests):
+        started = time.perf_counter()
+        transport.get(url)
+        latencies_ms.append((time.perf_counter() - started) * 1000)
+    cpu_s = time.process_time() - cpu_started
+    return SequentialResult(summarize(latencies_ms), cpu_s / requests * 1e6)
+
+def measure_concurrent(transport: Transport, url: str, requests: int, concurrency: int) -> ConcurrentResult:
+    def send(_: int) -> bool:
+        try:
+            return transport.get(url).status_code == 200
+        except Exception:
+            return False
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(send, range(WARMUP_REQUESTS)))
+        cpu_started = time.process_time()
+        started = time.perf_counter()
+        ok = sum(executor.map(send, range(requests)))
+        elapsed_s = time.perf_counter() - started
+        cpu_s = time.process_time() - cpu_started
+    return ConcurrentResult(requests / elapsed_s, cpu_s / requests * 1e6, requests - ok, transport.connection_stats().opened)
+
+def run_backend(
+    name: str, url: str, requests: int, concurrency: int, pipeline: int
+) -> tuple[SequentialResult, ConcurrentResult]:
+    transport = open_transport(name, timeout=5, pool_size=1)
+    try:
+        sequential = measure_sequential(transport, url, requests)
+    finally:
+        transport.close()
+    # Same number of requests in flight for every backend: pool_size * pipeline = concurrency
+    transport = open_transport(name, timeout=5, pool_size=math.ceil(concurrency / pipeline), pipeline=pipeline)
+    try:
+        concurrent = measure_concurrent(transport, url, requests, concurrency)
+    finally:
+        transport.close()
+    return sequential, concurrent
+
+# ------------------------------------------------------------------------------
+# Report
+# ------------------------------------------------------------------------------
+def format_report(
+    floor: Optional[LatencySummary], results: list[tuple[str, SequentialResult, ConcurrentResult]], concurrency: int
+) -> str:
+    floor_p50 = floor.p50_ms if floor is not None else math.nan
+    rows = []
+    for label, sequential, concurrent in results:
+        latency = sequential.latency
+        rows.append(
+            f"| {label:<18} {latency.p50_ms * 1000:>8.0f} {latency.p90_ms * 1000:>8.0f} {latency.p99_ms * 1000:>8.0f} "
+            f"{(latency.p50_ms - floor_p50) * 1000:>9.0f} {sequential.cpu_us:>8.0f}   "
+            f"{concurrent.rps:>8.0f} {concurrent.cpu_us:>8.0f} {concurrent.connections:>6} {concurrent.errors:>6}"
+        )
+    floor_line = (
+        f"| Floor (raw socket): p50={floor.p50_ms * 1000:.0f}us p90={floor.p90_ms * 1000:.0f}us p99={floor.p99_ms * 1000:.0f}us"
+        if floor is not None else "| Floor (raw socket): n/a (server response without Content-Length)"
+    )
+    return f"""{floor_line}
+|                    ---- sequential, 1 connection (us) ----   ---- {concurrency} concurrent ----
+| backend                 p50      p90      p99  overhead  cpu/req        rps  cpu/req  conns errors
+""" + "\n".join(rows)
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Client overhead per request of each HTTP transport backend.")
+    parser.add_argument("--requests", type=int, default=2000, help="measured requests per backend and phase")
+    parser.add_argument("--concurrency", type=int, default=16, help="threads in the concurrent phase")
+    parser.add_argument("--pipeline", type=int, default=8, help="requests per connection for the pipelined asyncio run (1 => skip)")
+    parser.add_argument("--path", default=DEFAULT_PATH, help="request target (path + query)")
+    parser.add_argument("--target", choices=("standin", "api"), default="standin",
+                        help="standin => local zero-latency stand-in process; api => API_ADDRESS/API_PORT")
+    parser.add_argument("--transport", action="append", choices=TRANSPORTS, help="backend to measure (repeatable, default: all)")
+    args = parser.parse_args(argv)
+    if args.requests < 1 or args.concurrency < 1 or args.pipeline < 1:
+        parser.error("expected --requests, --concurrency and --pipeline >= 1")
+
+    cfg = load_config()
+    ensure_log_dir(cfg)
+    standin: Optional[subprocess.Popen[bytes]] = None
+    if args.target == "standin":
+        standin, base_url = start_standin_process()
+    else:
+        if not wait_for_api(cfg):
+            log_api_not_ready(cfg, TEST_TYPE)
+            return 1
+        base_url = cfg.base_url
+    url = base_url + args.path
+
+    runs: list[tuple[str, str, int]] = [(name, name, 1) for name in args.transport or TRANSPORTS]
+    if args.pipeline > 1 and "asyncio" in (args.transport or TRANSPORTS):
+        runs.append((f"asyncio pipeline={args.pipeline}", "asyncio", args.pipeline))
+    try:
+        floor = measure_floor(url, args.requests)
+        results = [
+            (label, *run_backend(name, url, args.requests, args.concurrency, pipeline))
+            for label, name, pipeline in runs
+        ]
+    finally:
+        if standin is not None:
+            standin.terminate()
+            standin.wait()
+
+    output = "\n".join([
+        "===============================================================",
+        f">>> {TEST_TYPE}",
+        f">>> Target: {base_url} ({args.target}), {args.requests} requests per backend and phase",
+        "===============================================================",
+        format_report(floor, results, args.concurrency),
+    ])
+    emit(cfg, output, prepend_lb=True)
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
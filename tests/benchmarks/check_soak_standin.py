@@ -0,0 +1,105 @@
+"""
+Soak Self-Check against a Constant-Latency Stand-in
+---------------------------------------------------
+Soak alerts (p99 drift, trend) are only meaningful if the harness itself adds no latency
+that grows over time. Against a stand-in that answers every request after exactly
+--latency-ms, a sound soak run must show:
+
+- every window after the warm-up window: p99 within P99_TOLERANCE of the server latency,
+  and the windows' p99s within P99_SPREAD of each other (flat - no client-side queueing)
+- the target rate reached (>= MIN_RATE_RATIO x --rps)
+- no alerts
+
+The stand-in (tests/standin/server.py, --latency fixed:<ms>) runs as a separate process on
+a free port. Exit code 1 if any check fails.
+
+Module-run convention (recommended):
+    python3 -m tests.benchmarks.check_soak_standin [--rps 80] [--latency-ms 200] [--window 2] [--windows 4]
+"""
+from __future__ import annotations # Keep type hints as strings (lazy evaluation) to avoid forward-ref/circular-import issues.
+
+import argparse
+import dataclasses
+from typing import Optional
+from urllib.parse import urlsplit
+
+from tests._shared.config import load_config
+from tests._shared.logging import emit, ensure_log_dir
+from tests._shared.soak import WARMUP_WINDOWS, SoakWindow, run_soak
+from tests._shared.stats import format_summary
+from tests._shared.suites import SUITE_MODULES, load_suite
+from tests.benchmarks.bench_transports import start_standin_process
+
+TEST_TYPE = "SOAK SELF-CHECK (CONSTANT-LATENCY STAND-IN)"
+
+# Window p99 may exceed the server latency by this share (scheduling, GIL, loopback) ...
+P99_TOLERANCE = 0.25
+# ... and the measured windows' p99s may differ by this share of the server latency
+P99_SPREAD = 0.1
+# Completed requests per second in the measured windows vs. --rps
+MIN_RATE_RATIO = 0.9
+
+def check_windows(windows: list[SoakWindow], full_windows: int, latency_ms: float, rps: float) -> list[str]:
+    # => failed checks (empty => flat); a trailing partial window (drain) isn't checked
+    measured = [window for window in windows if WARMUP_WINDOWS < window.index <= full_windows]
+    if not measured:
+        return ["no window after the warm-up window (increase --windows)"]
+    failures = []
+    for window in measured:
+        if window.latency.p99_ms > latency_ms * (1 + P99_TOLERANCE):
+            failures.append(f"window {window.index}: p99 {window.latency.p99_ms:.1f}ms > {latency_ms * (1 + P99_TOLERANCE):.1f}ms")
+        if window.throughput_rps < rps * MIN_RATE_RATIO:
+            failures.append(f"window {window.index}: {window.throughput_rps:.1f} rps < {rps * MIN_RATE_RATIO:.1f} rps")
+        failures.extend(f"window {window.index}: alert: {alert}" for alert in window.alerts)
+    p99s = [window.latency.p99_ms for window in measured]
+    if max(p99s) - min(p99s) > latency_ms * P99_SPREAD:
+        failures.append(f"p99 not flat: {min(p99s):.1f}ms .. {max(p99s):.1f}ms (allowed spread {latency_ms * P99_SPREAD:.1f}ms)")
+    return failures
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Soak mode against a constant-latency stand-in: p99 must stay flat.")
+    parser.add_argument("--rps", type=float, default=80.0)
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="fixed server-side latency of the stand-in")
+    parser.add_argument("--window", type=float, default=2.0, help="soak window length in seconds")
+    parser.add_argument("--windows", type=int, default=4, help="windows in total (the first one is the warm-up)")
+    args = parser.parse_args(argv)
+    if args.rps <= 0 or args.latency_ms < 0 or args.window <= 0 or args.windows <= WARMUP_WINDOWS:
+        parser.error(f"expected --rps > 0, --latency-ms >= 0, --window > 0 and --windows > {WARMUP_WINDOWS}")
+
+    standin, base_url = start_standin_process(f"fixed:{args.latency_ms:g}")
+    try:
+        target = urlsplit(base_url)
+        cfg = dataclasses.replace(load_config(), api_address=target.hostname, api_port=target.port, api_targets=())
+        ensure_log_dir(cfg)
+        suite_names = sorted(SUITE_MODULES)
+        test_cases = [tc for name in suite_names for tc in load_suite(name).build_test_cases()]
+        windows: list[SoakWindow] = []
+        report = run_soak(
+            cfg, suite_names, test_cases, rps=args.rps, duration_s=args.window * args.windows,
+            window_s=args.window, baseline_windows=args.windows - WARMUP_WINDOWS - 1, on_window=windows.append,
+        )
+    finally:
+        standin.terminate()
+        standin.wait()
+
+    failures = check_windows(windows, args.windows, args.latency_ms, args.rps)
+    rows = [
+        f"| window {window.index}{' (warm-up)' if window.index <= WARMUP_WINDOWS else ' (drain)' if window.index > args.windows else ''}: "
+        f"{window.throughput_rps:.1f} rps, {format_summary(window.latency)}"
+        for window in windows
+    ]
+    output = "\n".join([
+        "===============================================================",
+        f">>> {TEST_TYPE}",
+        f">>> Stand-in fixed:{args.latency_ms:g}ms, {args.rps:g} rps, {args.windows} x {args.window:g}s windows",
+        "===============================================================",
+        *rows,
+        f"| overall: {format_summary(report.latency)}",
+        *(f"| FAILED: {failure}" for failure in failures),
+        f"==> CHECK STATUS: {'FAILURE' if failures else 'SUCCESS'}",
+    ])
+    emit(cfg, output, prepend_lb=True)
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
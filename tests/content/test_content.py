@@ -25,25 +25,17 @@ Module-run convention (recommended):
     python3 -m tests.content.test_content
 """
 
+# First import: timestamps the end of interpreter start-up (see tests/_shared/startup.py)
+from tests._shared import startup
+
 from dataclasses import dataclass
 
 from tests._shared.types import TestCase
-from tests._shared.config import load_config
-from tests._shared.readiness import wait_for_api
-from tests._shared.logging import (
-    ensure_log_dir,
-    log_suite_start,
-    log_suite_finished,
-    log_api_not_ready,
-    log_result,
-)
-from tests._shared.runner import run_test_case
-
-# ------------------------------------------------------------------------------
-# Config (shared across all suites)
-# ------------------------------------------------------------------------------
-cfg = load_config()
-ensure_log_dir(cfg)
+from tests._shared.config import Config, load_config
+from tests._shared.corpus import suite_test_cases
+from tests._shared.logging import ensure_log_dir, log_startup_profile
+from tests._shared.profiling import profiling
+from tests._shared.suite_runner import run_suite
 
 TEST_TYPE = "CONTENT"
 
@@ -65,52 +57,50 @@ class TestParams:
 # - expected_code: expected HTTP status
 # - expected_score: expected sentiment sign ("positive" | "negative") for content validation
 # ------------------------------------------------------------------------------
-test_cases = [
-    TestCase(
-        api_url="/v1/sentiment",
-        params=TestParams(username="alice", password="wonderland", sentence="life is beautiful"),
-        expected_code=200,
-        expected_score="positive",
-    ),
-    TestCase(
-        api_url="/v1/sentiment",
-        params=TestParams(username="alice", password="wonderland", sentence="that sucks"),
-        expected_code=200,
-        expected_score="negative",
-    ),
-    TestCase(
-        api_url="/v2/sentiment",
-        params=TestParams(username="alice", password="wonderland", sentence="life is beautiful"),
-        expected_code=200,
-        expected_score="positive",
-    ),
-    TestCase(
-        api_url="/v2/sentiment",
-        params=TestParams(username="alice", password="wonderland", sentence="that sucks"),
-        expected_code=200,
-        expected_score="negative",
-    ),
-]
+def build_test_cases() -> list[TestCase]:
+    """Built on demand, so importing this module has no side effects (no config, no I/O)."""
+    return [
+        TestCase(
+            api_url="/v1/sentiment",
+            params=TestParams(username="alice", password="wonderland", sentence="life is beautiful"),
+            expected_code=200,
+            expected_score="positive",
+        ),
+        TestCase(
+            api_url="/v1/sentiment",
+            params=TestParams(username="alice", password="wonderland", sentence="that sucks"),
+            expected_code=200,
+            expected_score="negative",
+        ),
+        TestCase(
+            api_url="/v2/sentiment",
+            params=TestParams(username="alice", password="wonderland", sentence="life is beautiful"),
+            expected_code=200,
+            expected_score="positive",
+        ),
+        TestCase(
+            api_url="/v2/sentiment",
+            params=TestParams(username="alice", password="wonderland", sentence="that sucks"),
+            expected_code=200,
+            expected_score="negative",
+        ),
+    ]
+
+def run(cfg: Config, check_readiness: bool = True) -> bool:
+    """Run the CONTENT suite with the given Config; True on full success (also used by the pipeline orchestrator)."""
+    # Built-in test cases - or, with CORPUS_PATH set, the streamed corpus records for this suite's endpoints
+    cases = suite_test_cases(cfg, build_test_cases(), TestParams, TEST_TYPE)
+    return run_suite(cfg, TEST_TYPE, cases, check_readiness=check_readiness)
 
 def main() -> int:
     """Run the CONTENT suite end-to-end and return a process exit code (0/1)."""
-    log_suite_start(cfg, TEST_TYPE, len(test_cases))
-
-    # Readiness gate: fail fast with a clear log if the API never becomes healthy.
-    if not wait_for_api(cfg):
-        log_api_not_ready(cfg, TEST_TYPE)
-        return 1
-
-    all_assertions_met = True
-
-    for test_no, test_case in enumerate(test_cases, start=1):
-        test_result = run_test_case(cfg, test_case)
-        log_result(cfg, TEST_TYPE, test_no, test_case, test_result)
-
-        if not test_result.is_success:
-            all_assertions_met = False
-
-    log_suite_finished(cfg, TEST_TYPE, all_assertions_met)
+    startup.mark("imports")
+    # Config is loaded here (not at import time): importing the suite stays side-effect free
+    cfg = load_config()
+    ensure_log_dir(cfg)
+    with profiling(cfg, "content"):
+        all_assertions_met = run(cfg)
+    log_startup_profile(cfg, TEST_TYPE)
     return 0 if all_assertions_met else 1
 
 # Only run the test suite when this file is executed directly (or via `python -m ...`).
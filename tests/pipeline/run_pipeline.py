@@ -0,0 +1,165 @@
+"""
+Single-process Test Pipeline (all suites)
+-----------------------------------------
+Runs the AUTHENTICATION, AUTHORIZATION and CONTENT suites in ONE Python process
+instead of three containers started one after another.
+
+How it works:
+- The suites are imported as modules (tests.authentication, tests.authorization, tests.content)
+  and run via their `run(cfg, check_readiness=False)` function.
+- Their dependencies are declared as a DAG (SUITE_DEPENDENCIES): a suite starts as soon as
+  all of its dependencies finished successfully - suites that don't depend on each other run
+  in parallel. If a dependency fails, its dependents are SKIPPED (like compose's
+  `service_completed_successfully`).
+- ONE readiness check (polling GET /status) gates the whole pipeline.
+- ONE Config => one shared HTTP connection pool and one buffered log sink.
+- Each suite's log blocks are captured (spooled to a temp file once they grow, see
+  logging.CapturedOutput) and written contiguously, in DAG declaration order, so the shared
+  log reads the same as with sequential containers.
+
+Exits with 0 if every suite passed, 1 otherwise.
+
+Module-run convention (recommended):
+    API_ADDRESS=localhost API_PORT=8000 LOG=1 LOG_PATH=./shared/api_test.log \
+    python3 -m tests.pipeline.run_pipeline [--suites authentication content]
+"""
+from __future__ import annotations # Keep type hints as strings (lazy evaluation) to avoid forward-ref/circular-import issues.
+
+# First import: timestamps the end of interpreter start-up (see tests/_shared/startup.py)
+from tests._shared import startup
+
+import argparse
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Optional
+
+from tests._shared.config import Config, load_config
+from tests._shared.logging import (
+    CapturedOutput,
+    capture_output,
+    ensure_log_dir,
+    log_api_not_ready,
+    log_pipeline_finished,
+    log_startup_profile,
+    log_suite_skipped,
+    replay_output,
+)
+from tests._shared.profiling import profiling
+from tests._shared.readiness import wait_for_api
+from tests._shared.suites import load_suite
+
+# ------------------------------------------------------------------------------
+# Suite dependency DAG (suite => suites that must have PASSED before it starts)
+# - Declaration order = report order in stdout / the shared log.
+# - Authorization + content both need working credentials (authentication),
+#   but not each other => they run in parallel.
+# ------------------------------------------------------------------------------
+SUITE_DEPENDENCIES: dict[str, list[str]] = {
+    "authentication": [],
+    "authorization": ["authentication"],
+    "content": ["authentication"],
+}
+
+def _run_captured(cfg: Config, suite_name: str) -> tuple[bool, CapturedOutput]:
+    # Runs in a worker thread: collect the suite's log blocks instead of printing them
+    suite = load_suite(suite_name)
+    with capture_output() as blocks:
+        success = suite.run(cfg, check_readiness=False)
+    return success, blocks
+
+def run_pipeline(cfg: Config, dependencies: dict[str, list[str]]) -> dict[str, str]:
+    """
+    Runs all suites of the DAG (max. parallelism) and returns {suite TEST_TYPE: SUCCESS|FAILED|SKIPPED}
+    in declaration order. Log output is replayed in declaration order as soon as possible.
+    """
+    unknown = {dep for deps in dependencies.values() for dep in deps} - dependencies.keys()
+    if unknown:
+        raise ValueError(f"Unknown suite dependencies: {', '.join(sorted(unknown))}")
+
+    order = list(dependencies)
+    status: dict[str, str] = {}                                 # suite => SUCCESS | FAILED | SKIPPED
+    outputs: dict[str, CapturedOutput] = {}                     # suite => captured log blocks
+    running: dict[Future[tuple[bool, CapturedOutput]], str] = {}
+    next_to_report = 0
+
+    with ThreadPoolExecutor(max_workers=len(order), thread_name_prefix="suite") as pool:
+        while len(status) < len(order):
+            # 1) Start / skip every suite whose dependencies are all settled
+            for name in order:
+                if name in status or name in running.values():
+                    continue
+                deps = dependencies[name]
+                if any(dep not in status for dep in deps):
+                    continue
+                failed_deps = [dep for dep in deps if status[dep] != "SUCCESS"]
+                if failed_deps:
+                    status[name] = "SKIPPED"
+                    with capture_output() as blocks:
+                        log_suite_skipped(
+                            cfg, load_suite(name).TEST_TYPE, [load_suite(dep).TEST_TYPE for dep in failed_deps]
+                        )
+                    outputs[name] = blocks
+                else:
+                    running[pool.submit(_run_captured, cfg, name)] = name
+
+            # 2) Report finished suites strictly in declaration order
+            while next_to_report < len(order) and order[next_to_report] in outputs:
+                replay_output(cfg, outputs.pop(order[next_to_report]))
+                next_to_report += 1
+
+            if not running:
+                if len(status) < len(order):  # nothing runnable, nothing running => cycle
+                    pending = [name for name in order if name not in status]
+                    raise ValueError(f"Dependency cycle between suites: {', '.join(pending)}")
+                break
+
+            # 3) Wait for at least one running suite to finish
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                success, blocks = future.result()
+                status[name] = "SUCCESS" if success else "FAILED"
+                outputs[name] = blocks
+
+        # Flush remaining reports (suites skipped/finished in the last round)
+        while next_to_report < len(order):
+            replay_output(cfg, outputs.pop(order[next_to_report]))
+            next_to_report += 1
+
+    return {load_suite(name).TEST_TYPE: status[name] for name in order}
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run all test suites in one process (dependency DAG).")
+    parser.add_argument(
+        "--suites", nargs="+", choices=list(SUITE_DEPENDENCIES), default=None,
+        help="only run these suites (their dependencies are NOT added automatically)",
+    )
+    args = parser.parse_args(argv)
+
+    dependencies = SUITE_DEPENDENCIES
+    if args.suites:
+        selected = set(args.suites)
+        dependencies = {
+            name: [dep for dep in deps if dep in selected]
+            for name, deps in SUITE_DEPENDENCIES.items() if name in selected
+        }
+
+    startup.mark("imports")
+    cfg = load_config()
+    ensure_log_dir(cfg)
+    started = time.perf_counter()
+
+    # ONE readiness gate for all suites
+    if not wait_for_api(cfg):
+        log_api_not_ready(cfg, "PIPELINE")
+        return 1
+
+    with profiling(cfg, "pipeline"):
+        suite_status = run_pipeline(cfg, dependencies)
+    log_pipeline_finished(cfg, suite_status, time.perf_counter() - started)
+    log_startup_profile(cfg, "PIPELINE")
+    return 0 if all(status == "SUCCESS" for status in suite_status.values()) else 1
+
+# Only run the pipeline when this file is executed directly (or via `python -m ...`).
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,266 @@
+"""
+Local Stand-in for the Sentiment API
+------------------------------------
+A small, dependency-free (stdlib only) imitation of `datascientest/fastapi:1.0.0` so the
+client side (run_test_case, logging, concurrency, load modes) can be measured on its own -
+offline and without Docker.
+
+Endpoints + permission rules (same as the real API as far as the suites can tell):
+- GET /status                 => 1
+- GET /permissions            => 200 for alice/wonderland + bob/builder, 403 otherwise
+- GET /v1/sentiment           => 200 for alice + bob, 403 otherwise
+- GET /v2/sentiment           => 200 for alice only, 403 otherwise
+  (scores come from a tiny word lexicon in [-1, 1]; v2 additionally handles negation)
+
+Knobs for benchmarking the harness:
+- --latency PROFILE           server-side delay per request (see LatencyProfile.parse)
+- --route-latency PATH=PROFILE   per-endpoint override (repeatable)
+- --error-rate R / --error-status CODE   inject HTTP errors for a share R of requests
+- --drop-rate R               close the connection without any response for a share R
+- --max-concurrency N         at most N requests are processed at once; others queue
+  (or get 503 with --reject-when-busy)
+
+Module-run convention (recommended):
+    python3 -m tests.standin.server --port 8001 --latency lognormal:20:0.5 --max-concurrency 32
+    # then, in another shell:
+    API_ADDRESS=127.0.0.1 API_PORT=8001 python3 -m tests.content.test_content
+"""
+from __future__ import annotations # Keep type hints as strings (lazy evaluation) to avoid forward-ref/circular-import issues.
+
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlsplit
+
+# ------------------------------------------------------------------------------
+# Users + permissions (mirrors what the suites expect from the real API)
+# ------------------------------------------------------------------------------
+USERS = {
+    "alice": ("wonderland", ("v1", "v2")),
+    "bob": ("builder", ("v1",)),
+    # clementine's credentials are NOT accepted by the API (the suites expect 403)
+}
+
+POSITIVE_WORDS = {
+    "beautiful", "love", "great", "good", "wonderful", "happy", "best", "excellent", "amazing",
+    "fantastic", "brilliant", "delicious", "enjoyed", "lovely", "proud", "helpful", "friendly",
+    "perfectly", "reliable", "pleasure", "genius", "supportive", "useful", "comfortable", "fresh",
+}
+NEGATIVE_WORDS = {
+    "sucks", "hate", "worst", "bad", "terrible", "awful", "disappointed", "boring", "broke",
+    "late", "damaged", "rude", "miserable", "horrible", "sad", "angry", "useless", "regret",
+    "dirty", "noisy", "crashing", "waste", "confusing", "cold", "tasteless", "mess",
+}
+NEGATIONS = {"not", "no", "never", "don't", "isn't", "wasn't", "doesn't"}
+WORD_RE = re.compile(r"[a-z']+")
+
+def sentiment_score(sentence: str, version: str) -> float:
+    # Lexicon score in [-1, 1]; v2 flips the polarity of a word right after a negation
+    words = WORD_RE.findall(sentence.lower())
+    total = 0
+    for i, word in enumerate(words):
+        polarity = (word in POSITIVE_WORDS) - (word in NEGATIVE_WORDS)
+        if version == "v2" and polarity and i > 0 and words[i - 1] in NEGATIONS:
+            polarity = -polarity
+        total += polarity
+    return round(math.tanh(total / 2), 4)
+
+# ------------------------------------------------------------------------------
+# Server-side behavior
+# ------------------------------------------------------------------------------
+@dataclass(frozen=True)
+class LatencyProfile:
+    kind: str = "none"   # none | fixed | uniform | normal | lognormal
+    a: float = 0.0       # ms (fixed/uniform low/normal mean/lognormal median)
+    b: float = 0.0       # ms (uniform high/normal stddev) or sigma (lognormal)
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyProfile":
+        """
+        "none" | "fixed:MS" | "uniform:LOW_MS:HIGH_MS" | "normal:MEAN_MS:STD_MS" | "lognormal:MEDIAN_MS:SIGMA"
+        """
+        kind, *args = spec.split(":")
+        expected = {"none": 0, "fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2}
+        if kind not in expected or len(args) != expected[kind]:
+            raise ValueError(f"Invalid latency profile: {spec!r}")
+        values = [float(v) for v in args] + [0.0, 0.0]
+        return cls(kind, values[0], values[1])
+
+    def sample_s(self, rng: random.Random) -> float:
+        if self.kind == "fixed":
+            ms = self.a
+        elif self.kind == "uniform":
+            ms = rng.uniform(self.a, self.b)
+        elif self.kind == "normal":
+            ms = rng.gauss(self.a, self.b)
+        elif self.kind == "lognormal":
+            ms = self.a * math.exp(rng.gauss(0.0, self.b))
+        else:
+            ms = 0.0
+        return max(0.0, ms) / 1000
+
+@dataclass(frozen=True)
+class StandinSettings:
+    latency: LatencyProfile = LatencyProfile()
+    route_latency: dict[str, LatencyProfile] = field(default_factory=dict)
+    error_rate: float = 0.0
+    error_status: int = 500
+    drop_rate: float = 0.0
+    max_concurrency: int = 0          # 0 => unlimited
+    reject_when_busy: bool = False    # True => 503 instead of queueing
+    seed: Optional[int] = None
+
+class StandinServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # A deep accept queue, so the harness (not the kernel) is what we measure under load
+    request_queue_size = 1024
+
+    def __init__(self, address: tuple[str, int], settings: StandinSettings) -> None:
+        super().__init__(address, StandinHandler)
+        self.settings = settings
+        self.rng = random.Random(settings.seed)
+        self.rng_lock = threading.Lock()
+        self.slots = threading.BoundedSemaphore(settings.max_concurrency) if settings.max_concurrency > 0 else None
+
+    def random(self) -> float:
+        with self.rng_lock:
+            return self.rng.random()
+
+    def delay_s(self, path: str) -> float:
+        profile = self.settings.route_latency.get(path, self.settings.latency)
+        with self.rng_lock:
+            return profile.sample_s(self.rng)
+
+class StandinHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like uvicorn
+    server: StandinServer
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass  # no per-request access log (it would dominate the server's own overhead)
+
+    def do_GET(self) -> None:
+        settings = self.server.settings
+        slots = self.server.slots
+
+        if slots is not None:
+            if settings.reject_when_busy:
+                if not slots.acquire(blocking=False):
+                    return self._send(503, {"detail": "Service busy"})
+            else:
+                slots.acquire()
+        try:
+            self._handle()
+        finally:
+            if slots is not None:
+                slots.release()
+
+    def _handle(self) -> None:
+        settings = self.server.settings
+        url = urlsplit(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query, keep_blank_values=True).items()}
+
+        delay = self.server.delay_s(url.path)
+        if delay:
+            time.sleep(delay)
+
+        if settings.drop_rate and self.server.random() < settings.drop_rate:
+            self.close_connection = True
+            return  # no response at all => client sees a connection error
+        if settings.error_rate and self.server.random() < settings.error_rate:
+            return self._send(settings.error_status, {"detail": "Injected error"})
+
+        if url.path == "/status":
+            return self._send(200, 1)
+
+        user = USERS.get(query.get("username", ""))
+        if user is None or user[0] != query.get("password"):
+            return self._send(403, {"detail": "Authentication failed"})
+        permissions = user[1]
+
+        if url.path == "/permissions":
+            return self._send(200, {"username": query["username"], "permissions": list(permissions)})
+
+        for version in ("v1", "v2"):
+            if url.path == f"/{version}/sentiment":
+                if version not in permissions:
+                    return self._send(403, {"detail": "This user doesn't have the right permissions"})
+                sentence = query.get("sentence", "")
+                return self._send(200, {
+                    "username": query["username"],
+                    "version": version,
+                    "sentence": sentence,
+                    "score": sentiment_score(sentence, version),
+                })
+
+        self._send(404, {"detail": "Not Found"})
+
+    def _send(self, status: int, payload: object) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        # Status line + headers + body in ONE write: avoids Nagle/delayed-ACK stalls that a
+        # separate header/body write would add to every response on a keep-alive connection
+        head = (
+            f"HTTP/1.1 {status} {self.responses.get(status, ('',))[0]}\r\n"
+            "content-type: application/json\r\n"
+            f"content-length: {len(body)}\r\n"
+            "\r\n"
+        ).encode("latin-1")
+        self.wfile.write(head + body)
+
+def start_standin(host: str = "127.0.0.1", port: int = 0, settings: Optional[StandinSettings] = None) -> StandinServer:
+    """
+    Start the stand-in in a background (daemon) thread and return the server;
+    port=0 picks a free port (see server.server_address). Stop with server.shutdown().
+    """
+    server = StandinServer((host, port), settings or StandinSettings())
+    threading.Thread(target=server.serve_forever, name="standin", daemon=True).start()
+    return server
+
+def _route_latency(spec: str) -> tuple[str, LatencyProfile]:
+    path, _, profile = spec.partition("=")
+    if not path.startswith("/") or not profile:
+        raise argparse.ArgumentTypeError(f"expected PATH=PROFILE, got {spec!r}")
+    return path, LatencyProfile.parse(profile)
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Local stand-in for the sentiment API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", type=LatencyProfile.parse, default=LatencyProfile(), help="e.g. fixed:20, lognormal:20:0.5")
+    parser.add_argument("--route-latency", type=_route_latency, action="append", default=[], help="PATH=PROFILE (repeatable)")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--drop-rate", type=float, default=0.0)
+    parser.add_argument("--max-concurrency", type=int, default=0, help="0 => unlimited")
+    parser.add_argument("--reject-when-busy", action="store_true", help="503 instead of queueing above --max-concurrency")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    settings = StandinSettings(
+        latency=args.latency,
+        route_latency=dict(args.route_latency),
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        drop_rate=args.drop_rate,
+        max_concurrency=args.max_concurrency,
+        reject_when_busy=args.reject_when_busy,
+        seed=args.seed,
+    )
+    server = StandinServer((args.host, args.port), settings)
+    print(f"# Stand-in API listening on http://{args.host}:{server.server_address[1]} ({settings})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())